@@ -8,6 +8,8 @@
   value: {{ .Values.worker.heartbeatIntervalSeconds | quote}}
 - name: WORKER_KILL_ZOMBIES_INTERVAL_SECONDS
   value: {{ .Values.worker.killZombiesIntervalSeconds | quote}}
+- name: WORKER_LIGHT_JOB_TYPES
+  value: {{ .Values.worker.lightJobTypes | quote }}
 - name: WORKER_MAX_DISK_USAGE_PCT
   value: {{ .Values.worker.maxDiskUsagePct | quote }}
 - name: WORKER_MAX_JOB_DURATION_SECONDS
@@ -18,8 +20,20 @@
   value: {{ .Values.worker.maxMemoryPct | quote }}
 - name: WORKER_MAX_MISSING_HEARTBEATS
   value: {{ .Values.worker.maxMissingHeartbeats | quote }}
+- name: WORKER_MAX_WAIT_SECONDS_FOR_NEW_JOBS
+  value: {{ .Values.worker.maxWaitSecondsForNewJobs | quote }}
+- name: WORKER_NUM_LIGHT_THREADS
+  value: {{ .Values.worker.numLightThreads | quote }}
+- name: WORKER_NUM_PROCESSES
+  value: {{ .Values.worker.numProcesses | quote }}
+- name: WORKER_RECONCILE_STARTED_JOBS_COUNTS_INTERVAL_SECONDS
+  value: {{ .Values.worker.reconcileStartedJobsCountsIntervalSeconds | quote }}
+- name: WORKER_SCHEDULING_POLICY
+  value: {{ .Values.worker.schedulingPolicy | quote }}
 - name: WORKER_SLEEP_SECONDS
   value: {{ .Values.worker.sleepSeconds | quote }}
+- name: WORKER_WAIT_FOR_NEW_JOBS
+  value: {{ .Values.worker.waitForNewJobs | quote }}
 - name: TMPDIR
   value: "/tmp"
   # ^ensure the temporary files are created in /tmp, which is writable
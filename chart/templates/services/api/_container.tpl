@@ -14,6 +14,12 @@
   {{ include "envLog" . | nindent 2 }}
   {{ include "envNumba" . | nindent 2 }}
   # service
+  - name: API_AUTH_CHECK_CACHE_NEGATIVE_TTL_SECONDS
+    value: {{ .Values.api.authCheckCacheNegativeTtlSeconds | quote }}
+  - name: API_AUTH_CHECK_CACHE_TTL_SECONDS
+    value: {{ .Values.api.authCheckCacheTtlSeconds | quote }}
+  - name: API_ENCODED_RESPONSE_CACHE_MAX_BYTES
+    value: {{ .Values.api.encodedResponseCacheMaxBytes | quote }}
   - name: API_HF_AUTH_PATH
     value: {{ .Values.api.hfAuthPath | quote }}
   - name: API_HF_JWT_PUBLIC_KEY_URL
@@ -36,6 +42,43 @@
     value: {{ .Values.api.maxAgeLong | quote }}
   - name: API_MAX_AGE_SHORT
     value: {{ .Values.api.maxAgeShort | quote }}
+  - name: API_MISSING_DATASET_CACHE_NOT_FOUND_TTL_SECONDS
+    value: {{ .Values.api.missingDatasetCacheNotFoundTtlSeconds | quote }}
+  - name: API_MONGO_MAX_WORKERS
+    value: {{ .Values.api.mongoMaxWorkers | quote }}
+  - name: API_SET_REVISION_DEBOUNCE_SECONDS
+    value: {{ .Values.api.setRevisionDebounceSeconds | quote }}
+  # best responses cache
+  - name: BEST_RESPONSE_CACHE_MAX_ENTRIES
+    value: {{ .Values.api.bestResponseCache.maxEntries | quote }}
+  - name: BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS
+    value: {{ .Values.api.bestResponseCache.pollIntervalSeconds | quote }}
+  - name: BEST_RESPONSE_CACHE_TTL_SECONDS
+    value: {{ .Values.api.bestResponseCache.ttlSeconds | quote }}
+  # row groups cache
+  - name: ROW_GROUPS_CACHE_CLEAN_CACHE_PROBA
+    value: {{ .Values.api.rowGroupsCache.cleanCacheProba | quote }}
+  - name: ROW_GROUPS_CACHE_MAX_BYTES
+    value: {{ .Values.api.rowGroupsCache.maxBytes | quote }}
+  - name: ROW_GROUPS_CACHE_STORAGE_DIRECTORY
+    value: {{ .Values.api.rowGroupsCache.storageDirectory | quote }}
+  # rows index cache
+  - name: ROWS_INDEX_CACHE_MAX_BYTES
+    value: {{ .Values.api.rowsIndexCache.maxBytes | quote }}
+  # rows thread pool
+  - name: ROWS_THREAD_POOL_MAX_INDEX_TASKS
+    value: {{ .Values.api.rowsThreadPool.maxIndexTasks | quote }}
+  - name: ROWS_THREAD_POOL_MAX_QUERY_TASKS
+    value: {{ .Values.api.rowsThreadPool.maxQueryTasks | quote }}
+  - name: ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS
+    value: {{ .Values.api.rowsThreadPool.maxTransformTasks | quote }}
+  - name: ROWS_THREAD_POOL_MAX_WORKERS
+    value: {{ .Values.api.rowsThreadPool.maxWorkers | quote }}
+  # rows read-ahead
+  - name: ROWS_READ_AHEAD_MAX_BYTES
+    value: {{ .Values.api.rowsReadAhead.maxBytes | quote }}
+  - name: ROWS_READ_AHEAD_MAX_TASKS
+    value: {{ .Values.api.rowsReadAhead.maxTasks | quote }}
   # prometheus
   - name: PROMETHEUS_MULTIPROC_DIR
     value:  {{ .Values.api.prometheusMultiprocDirectory | quote }}
@@ -44,6 +44,12 @@ from mongodb_migration.migrations._20230516101500_queue_job_add_revision import
 from mongodb_migration.migrations._20230516101600_queue_delete_index_without_revision import (
     MigrationQueueDeleteIndexWithoutRevision,
 )
+from mongodb_migration.migrations._20230601120000_queue_count_started_jobs import (
+    MigrationQueueCountStartedJobs,
+)
+from mongodb_migration.migrations._20230602120000_queue_job_add_cost import (
+    MigrationQueueAddCostToJob,
+)
 from mongodb_migration.renaming_migrations import (
     CacheRenamingMigration,
     QueueRenamingMigration,
@@ -215,4 +221,10 @@ class MigrationsCollector:
                 version="20230524192300",
             ),
             MetricsDeletionMigration(job_type="/config-names", cache_kind="/config-names", version="20230524192400"),
+            MigrationQueueCountStartedJobs(
+                version="20230601120000", description="count the started jobs by namespace and type in the queue"
+            ),
+            MigrationQueueAddCostToJob(
+                version="20230602120000", description="add the cost_adjusted_created_at field to the jobs"
+            ),
         ]
@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import logging
+
+from libcommon.constants import (
+    QUEUE_COLLECTION_STARTED_JOBS_COUNTS,
+    QUEUE_MONGOENGINE_ALIAS,
+)
+from libcommon.queue import Job, Queue
+from libcommon.utils import Status
+from mongoengine.connection import get_db
+
+from mongodb_migration.migration import Migration
+
+
+# connection already occurred in the main.py (caveat: we use globals)
+class MigrationQueueCountStartedJobs(Migration):
+    def up(self) -> None:
+        logging.info("Count the started jobs by namespace and type")
+        Queue().reset_started_jobs_counts()
+
+    def down(self) -> None:
+        logging.info("Delete the counts of started jobs")
+        db = get_db(QUEUE_MONGOENGINE_ALIAS)
+        db[QUEUE_COLLECTION_STARTED_JOBS_COUNTS].drop()
+
+    def validate(self) -> None:
+        logging.info("Ensure that the counts of started jobs match the started jobs")
+        started_jobs_count = sum(Queue().get_started_jobs_count_by_namespace().values())
+        if started_jobs_count != Job.objects(status=Status.STARTED).count():
+            raise ValueError(f"The counts of started jobs ({started_jobs_count}) don't match the started jobs")
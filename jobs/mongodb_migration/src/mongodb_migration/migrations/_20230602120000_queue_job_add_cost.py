@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import logging
+
+from libcommon.constants import QUEUE_COLLECTION_JOBS, QUEUE_MONGOENGINE_ALIAS
+from libcommon.queue import Job
+from mongoengine.connection import get_db
+
+from mongodb_migration.check import check_documents
+from mongodb_migration.migration import Migration
+
+
+# connection already occurred in the main.py (caveat: we use globals)
+class MigrationQueueAddCostToJob(Migration):
+    def up(self) -> None:
+        logging.info("If missing, add the cost_adjusted_created_at field with the value of created_at to the jobs")
+        # The cost of the existing jobs is unknown: they are not delayed by the shortest-expected-first policy.
+        db = get_db(QUEUE_MONGOENGINE_ALIAS)
+        # the update is an aggregation pipeline, to copy the value of another field. The stubs don't support it.
+        db[QUEUE_COLLECTION_JOBS].update_many(
+            {"cost_adjusted_created_at": {"$exists": False}},
+            [{"$set": {"cost_adjusted_created_at": "$created_at"}}],  # type: ignore
+        )
+
+    def down(self) -> None:
+        logging.info("Remove the num_bytes, estimated_cost and cost_adjusted_created_at fields from all the jobs")
+        db = get_db(QUEUE_MONGOENGINE_ALIAS)
+        db[QUEUE_COLLECTION_JOBS].update_many(
+            {}, {"$unset": {"num_bytes": "", "estimated_cost": "", "cost_adjusted_created_at": ""}}
+        )
+
+    def validate(self) -> None:
+        logging.info("Ensure that a random selection of jobs have the 'cost_adjusted_created_at' field set")
+
+        check_documents(DocCls=Job, sample_size=10)
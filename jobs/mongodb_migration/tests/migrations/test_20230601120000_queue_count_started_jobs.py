@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+from libcommon.constants import (
+    QUEUE_COLLECTION_JOBS,
+    QUEUE_COLLECTION_STARTED_JOBS_COUNTS,
+    QUEUE_MONGOENGINE_ALIAS,
+)
+from libcommon.resources import MongoResource
+from mongoengine.connection import get_db
+
+from mongodb_migration.migrations._20230601120000_queue_count_started_jobs import (
+    MigrationQueueCountStartedJobs,
+)
+
+
+def test_queue_count_started_jobs(mongo_host: str) -> None:
+    with MongoResource(database="test_queue_count_started_jobs", host=mongo_host, mongoengine_alias="queue"):
+        db = get_db(QUEUE_MONGOENGINE_ALIAS)
+        db[QUEUE_COLLECTION_JOBS].insert_many(
+            [
+                {"type": "test", "dataset": "namespace/dataset1", "namespace": "namespace", "status": "started"},
+                {"type": "test", "dataset": "namespace/dataset2", "namespace": "namespace", "status": "started"},
+                {"type": "other", "dataset": "namespace/dataset1", "namespace": "namespace", "status": "started"},
+                {"type": "test", "dataset": "dataset", "namespace": "dataset", "status": "waiting"},
+            ]
+        )
+
+        migration = MigrationQueueCountStartedJobs(
+            version="20230601120000", description="count the started jobs by namespace and type in the queue"
+        )
+        migration.up()
+        counts = {
+            (doc["namespace"], doc["type"]): doc["count"] for doc in db[QUEUE_COLLECTION_STARTED_JOBS_COUNTS].find()
+        }
+        assert counts == {("namespace", "test"): 2, ("namespace", "other"): 1}
+        migration.validate()
+
+        migration.down()
+        assert db[QUEUE_COLLECTION_STARTED_JOBS_COUNTS].count_documents({}) == 0
+
+        db[QUEUE_COLLECTION_JOBS].drop()
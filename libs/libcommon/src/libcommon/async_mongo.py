@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional, Set, TypeVar
+
+from libcommon.simple_cache import (
+    BestResponse,
+    BestResponseCache,
+    BestResponseMetadata,
+    get_best_response,
+    get_best_response_metadata,
+    get_valid_datasets,
+    has_some_cache,
+)
+
+ASYNC_MONGO_MAX_WORKERS = 16
+
+T = TypeVar("T")
+
+
+class AsyncMongo:
+    """
+    Access the MongoDB databases (cache and queue) from an event loop.
+
+    The queries are the ones of libcommon, sent through the same mongoengine connections to the same collections, but
+    they run in a dedicated pool of threads and are awaited: a slow query holds one thread of the pool, while the event
+    loop keeps serving the other requests. This is how the async drivers for MongoDB, such as Motor, are built on top
+    of pymongo.
+
+    The number of threads should not exceed the size of the pymongo connection pool (100 by default).
+
+    Args:
+        max_workers (`int`, *optional*, defaults to `ASYNC_MONGO_MAX_WORKERS`): The maximum number of concurrent
+          queries.
+        best_response_cache (`BestResponseCache`, *optional*): The in-process cache of the best responses. If None,
+          the best responses are always read from the database.
+    """
+
+    def __init__(
+        self, max_workers: int = ASYNC_MONGO_MAX_WORKERS, best_response_cache: Optional[BestResponseCache] = None
+    ):
+        self.max_workers = max_workers
+        self.best_response_cache = best_response_cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo")
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Await `func(*args, **kwargs)`, run in the pool of threads."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def get_best_response(
+        self, kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
+    ) -> BestResponse:
+        """See `libcommon.simple_cache.get_best_response`."""
+        return await self.run(
+            get_best_response if self.best_response_cache is None else self.best_response_cache.get_best_response,
+            kinds=kinds,
+            dataset=dataset,
+            config=config,
+            split=split,
+        )
+
+    async def get_best_response_metadata(
+        self, kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
+    ) -> BestResponseMetadata:
+        """See `libcommon.simple_cache.get_best_response_metadata`."""
+        return await self.run(
+            get_best_response_metadata
+            if self.best_response_cache is None
+            else self.best_response_cache.get_best_response_metadata,
+            kinds=kinds,
+            dataset=dataset,
+            config=config,
+            split=split,
+        )
+
+    async def get_valid_datasets(self, kind: str) -> Set[str]:
+        """See `libcommon.simple_cache.get_valid_datasets`."""
+        return await self.run(get_valid_datasets, kind=kind)
+
+    async def has_some_cache(self, dataset: str) -> bool:
+        """See `libcommon.simple_cache.has_some_cache`."""
+        return await self.run(has_some_cache, dataset=dataset)
+
+    def shutdown(self) -> None:
+        """Wait for the running queries, and release the threads."""
+        self.executor.shutdown(wait=True)
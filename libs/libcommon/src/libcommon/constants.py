@@ -6,18 +6,27 @@ CACHE_COLLECTION_RESPONSES = "cachedResponsesBlue"
 CACHE_MONGOENGINE_ALIAS = "cache"
 CACHED_ASSETS_CACHE_APPNAME = "datasets_server_cached_assets"
 PARQUET_METADATA_CACHE_APPNAME = "datasets_server_parquet_metadata"
+ROW_GROUPS_CACHE_APPNAME = "datasets_server_row_groups"
 METRICS_COLLECTION_CACHE_TOTAL_METRIC = "cacheTotalMetric"
 METRICS_COLLECTION_JOB_TOTAL_METRIC = "jobTotalMetric"
 METRICS_MONGOENGINE_ALIAS = "metrics"
+QUEUE_COLLECTION_JOB_DURATION_STATS = "jobDurationStats"
+QUEUE_COLLECTION_JOB_NOTIFICATIONS = "jobNotifications"
 QUEUE_COLLECTION_JOBS = "jobsBlue"
+QUEUE_COLLECTION_STARTED_JOBS_COUNTS = "startedJobsCounts"
+QUEUE_JOB_NOTIFICATIONS_MAX_DOCUMENTS = 10_000
+QUEUE_JOB_NOTIFICATIONS_MAX_SIZE = 10_000_000  # 10 MB
 QUEUE_MONGOENGINE_ALIAS = "queue"
+QUEUE_SHORTEST_EXPECTED_FIRST_COST_FACTOR = 10
+# ^ with the shortest-expected-first policy, every second of estimated cost delays a job by 10 seconds
+QUEUE_SHORTEST_EXPECTED_FIRST_MAX_DELAY_SECONDS = 6 * 60 * 60  # 6 hours
 QUEUE_TTL_SECONDS = 600  # 10 minutes
 
 DEFAULT_INPUT_TYPE = "dataset"
 DEFAULT_JOB_RUNNER_VERSION = 1
 PROCESSING_STEP_DATASET_CONFIG_NAMES_VERSION = 1
 PROCESSING_STEP_CONFIG_PARQUET_VERSION = 4
-PROCESSING_STEP_CONFIG_PARQUET_METADATA_VERSION = 1
+PROCESSING_STEP_CONFIG_PARQUET_METADATA_VERSION = 2
 PROCESSING_STEP_CONFIG_SIZE_VERSION = 2
 PROCESSING_STEP_CONFIG_INFO_VERSION = 2
 PROCESSING_STEP_CONFIG_OPT_IN_OUT_URLS_COUNT_VERSION = 3
@@ -0,0 +1,270 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Mapping, Optional
+
+from mongoengine import Document
+from mongoengine.fields import DateTimeField, ListField, StringField
+from pymongo import CursorType
+from pymongo.cursor import Cursor
+from pymongo.errors import PyMongoError
+
+from libcommon.constants import (
+    QUEUE_COLLECTION_JOB_NOTIFICATIONS,
+    QUEUE_JOB_NOTIFICATIONS_MAX_DOCUMENTS,
+    QUEUE_JOB_NOTIFICATIONS_MAX_SIZE,
+    QUEUE_MONGOENGINE_ALIAS,
+)
+from libcommon.utils import get_datetime
+
+# how long the server holds a request on the notifications when there is no new one, i.e. the precision of the timeout
+JOB_NOTIFICATIONS_MAX_AWAIT_TIME_MS = 5_000
+# how long to wait before retrying, when the notifications cannot be read (e.g. the collection is empty)
+JOB_NOTIFICATIONS_RETRY_SECONDS = 1.0
+
+
+def is_job_type_subscribed(
+    job_type: str, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None
+) -> bool:
+    """Whether a worker with the given job types restrictions processes the jobs of type `job_type`.
+
+    Args:
+        job_type (`str`): The type of the job.
+        job_types_blocked (`list[str]`, optional): if not None, the jobs of the given types are not processed.
+        job_types_only (`list[str]`, optional): if not None, only the jobs of the given types are processed.
+
+    Returns:
+        `bool`: True if the jobs of this type are processed.
+    """
+    if job_types_blocked and job_type in job_types_blocked:
+        return False
+    return not job_types_only or job_type in job_types_only
+
+
+class JobNotificationSubscription(ABC):
+    """A subscription to the notifications of the creation of jobs.
+
+    The notifications published after the subscription has been created are not lost: the ones published while the
+    subscriber is not waiting (e.g. while it processes a job) are returned by the next call to `wait`.
+
+    Args:
+        job_types_blocked (`list[str]`, optional): if not None, the jobs of the given types are ignored.
+        job_types_only (`list[str]`, optional): if not None, only the jobs of the given types are considered.
+    """
+
+    def __init__(self, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None):
+        self.job_types_blocked = job_types_blocked
+        self.job_types_only = job_types_only
+
+    def is_subscribed(self, job_types: Iterable[str]) -> bool:
+        return any(
+            is_job_type_subscribed(
+                job_type=job_type, job_types_blocked=self.job_types_blocked, job_types_only=self.job_types_only
+            )
+            for job_type in job_types
+        )
+
+    @abstractmethod
+    def wait(self, timeout: float) -> bool:
+        """Block until jobs of the subscribed types are created, or until the timeout expires.
+
+        Args:
+            timeout (`float`): The maximum duration of the wait, in seconds.
+
+        Returns:
+            `bool`: True if jobs of the subscribed types have been created, False if the timeout expired.
+        """
+        pass
+
+    def close(self) -> None:
+        """Release the resources of the subscription."""
+        pass
+
+
+class JobNotifier(ABC):
+    """A publish/subscribe channel for the notifications of the creation of jobs.
+
+    The queue publishes a notification every time it creates waiting jobs, and the idle workers block on their
+    subscription instead of polling the queue. The notifications are only a hint, that allows to start the jobs as soon
+    as they are created: the workers must still poll the queue from time to time, in case a notification is lost.
+    """
+
+    @abstractmethod
+    def publish(self, job_types: Iterable[str]) -> None:
+        """Notify the subscribers that jobs of the given types have been created.
+
+        Args:
+            job_types (`Iterable[str]`): The types of the created jobs.
+        """
+        pass
+
+    @abstractmethod
+    def subscribe(
+        self, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None
+    ) -> JobNotificationSubscription:
+        """Subscribe to the notifications of the creation of jobs.
+
+        Args:
+            job_types_blocked (`list[str]`, optional): if not None, the jobs of the given types are ignored.
+            job_types_only (`list[str]`, optional): if not None, only the jobs of the given types are considered.
+
+        Returns:
+            `JobNotificationSubscription`: The subscription.
+        """
+        pass
+
+
+class LocalJobNotificationSubscription(JobNotificationSubscription):
+    def __init__(
+        self,
+        notifier: "LocalJobNotifier",
+        job_types_blocked: Optional[List[str]] = None,
+        job_types_only: Optional[List[str]] = None,
+    ):
+        super().__init__(job_types_blocked=job_types_blocked, job_types_only=job_types_only)
+        self.notifier = notifier
+        self.notified = False
+
+    def wait(self, timeout: float) -> bool:
+        with self.notifier.condition:
+            notified = self.notifier.condition.wait_for(lambda: self.notified, timeout=timeout)
+            self.notified = False
+            return notified
+
+    def close(self) -> None:
+        with self.notifier.condition:
+            if self in self.notifier.subscriptions:
+                self.notifier.subscriptions.remove(self)
+
+
+class LocalJobNotifier(JobNotifier):
+    """A job notifier that does not leave the process: the publisher and the subscribers must share it.
+
+    It's a stand-in for the tests, and for the processes that create and process the jobs themselves.
+    """
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.subscriptions: List[LocalJobNotificationSubscription] = []
+
+    def publish(self, job_types: Iterable[str]) -> None:
+        job_types = list(job_types)
+        with self.condition:
+            for subscription in self.subscriptions:
+                if subscription.is_subscribed(job_types):
+                    subscription.notified = True
+            self.condition.notify_all()
+
+    def subscribe(
+        self, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None
+    ) -> LocalJobNotificationSubscription:
+        subscription = LocalJobNotificationSubscription(
+            notifier=self, job_types_blocked=job_types_blocked, job_types_only=job_types_only
+        )
+        with self.condition:
+            self.subscriptions.append(subscription)
+        return subscription
+
+
+class JobNotification(Document):
+    """A notification of the creation of waiting jobs in the queue.
+
+    The collection is capped: the oldest notifications are removed first, and the subscribers follow the new ones
+    with a tailable cursor.
+
+    Args:
+        types (`List[str]`): The types of the created jobs.
+        created_at (`datetime`): The creation date of the notification.
+    """
+
+    meta = {
+        "collection": QUEUE_COLLECTION_JOB_NOTIFICATIONS,
+        "db_alias": QUEUE_MONGOENGINE_ALIAS,
+        "max_documents": QUEUE_JOB_NOTIFICATIONS_MAX_DOCUMENTS,
+        "max_size": QUEUE_JOB_NOTIFICATIONS_MAX_SIZE,
+    }
+    types = ListField(StringField(), required=True)
+    created_at = DateTimeField(required=True)
+
+
+class MongoJobNotificationSubscription(JobNotificationSubscription):
+    def __init__(self, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None):
+        super().__init__(job_types_blocked=job_types_blocked, job_types_only=job_types_only)
+        self.collection = JobNotification._get_collection()
+        # only the notifications published after the subscription are considered
+        last_notification = self.collection.find_one({}, sort=[("$natural", -1)], projection={"_id": 1})
+        self.last_id: Optional[Any] = None if last_notification is None else last_notification["_id"]
+        # the id of the last seen notification, while the notifications up to it are skipped by a new cursor
+        self.skip_until_id: Optional[Any] = None
+        self.cursor: Optional[Cursor] = None
+
+    def _get_cursor(self) -> Cursor:
+        if self.cursor is None or not self.cursor.alive:
+            # The ObjectIds created by different processes are not ordered by insertion (within a second, they are
+            # ordered by the random bytes of the process), so the cursor cannot resume with {"_id": {"$gt": last_id}}.
+            # Instead, it tails the collection from the start, in insertion order, and skips the notifications up to
+            # the last seen one. If it has been removed from the capped collection meanwhile, nothing is skipped.
+            self.skip_until_id = (
+                self.last_id
+                if self.last_id is not None
+                and self.collection.find_one({"_id": self.last_id}, projection={"_id": 1}) is not None
+                else None
+            )
+            self.cursor = self.collection.find(
+                {}, cursor_type=CursorType.TAILABLE_AWAIT  # type: ignore
+            ).max_await_time_ms(JOB_NOTIFICATIONS_MAX_AWAIT_TIME_MS)
+        return self.cursor
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining_seconds = deadline - time.monotonic()
+            if remaining_seconds <= 0:
+                return False
+            notification: Optional[Mapping[str, Any]] = None
+            try:
+                cursor = self._get_cursor()
+                # blocks until a new notification, or for JOB_NOTIFICATIONS_MAX_AWAIT_TIME_MS
+                notification = next(cursor, None)
+            except PyMongoError:
+                logging.warning("failed to read the job notifications", exc_info=True)
+                self.cursor = None
+            if notification is None:
+                # the end of the collection has been reached: the last seen notification cannot be skipped anymore
+                self.skip_until_id = None
+                if self.cursor is None or not self.cursor.alive:
+                    # the cursor is dead, e.g. because the collection is empty: try again later
+                    time.sleep(min(JOB_NOTIFICATIONS_RETRY_SECONDS, remaining_seconds))
+                continue
+            if self.skip_until_id is not None:
+                # already seen by a previous cursor
+                if notification["_id"] == self.skip_until_id:
+                    self.skip_until_id = None
+                continue
+            self.last_id = notification["_id"]
+            if self.is_subscribed(notification.get("types", [])):
+                return True
+
+    def close(self) -> None:
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+
+
+class MongoJobNotifier(JobNotifier):
+    """A job notifier that stores the notifications in a capped collection of the queue database.
+
+    It works with a standalone MongoDB server, and does not require a replica set, as the change streams do.
+    """
+
+    def publish(self, job_types: Iterable[str]) -> None:
+        JobNotification(types=sorted(set(job_types)), created_at=get_datetime()).save()
+
+    def subscribe(
+        self, job_types_blocked: Optional[List[str]] = None, job_types_only: Optional[List[str]] = None
+    ) -> MongoJobNotificationSubscription:
+        return MongoJobNotificationSubscription(job_types_blocked=job_types_blocked, job_types_only=job_types_only)
@@ -9,6 +9,7 @@ from typing import Any, Optional, Type, TypeVar
 from prometheus_client import (
     REGISTRY,
     CollectorRegistry,
+    Counter,
     Gauge,
     Histogram,
     generate_latest,
@@ -56,6 +57,28 @@ ASSETS_DISK_USAGE = Gauge(
     labelnames=["type"],
     multiprocess_mode="liveall",
 )
+THREAD_POOL_STAGE_TASKS = Gauge(
+    name="thread_pool_stage_tasks",
+    documentation="Number of tasks of a stage waiting for a slot, or running, in a thread pool",
+    labelnames=["stage", "status"],
+    multiprocess_mode="livesum",
+)
+THREAD_POOL_STAGE_MAX_TASKS = Gauge(
+    name="thread_pool_stage_max_tasks",
+    documentation="Maximum number of tasks of a stage running concurrently in a thread pool",
+    labelnames=["stage"],
+    multiprocess_mode="livesum",
+)
+SINGLE_FLIGHT_CALLS_TOTAL = Counter(
+    name="single_flight_calls_total",
+    documentation="Number of calls of a single-flight group, that computed the result (leader) or waited for it",
+    labelnames=["name", "role"],
+)
+READ_AHEAD_TASKS_TOTAL = Counter(
+    name="read_ahead_tasks_total",
+    documentation="Number of read-ahead tasks submitted, or dropped (with the reason)",
+    labelnames=["name", "status"],
+)
 METHOD_STEPS_PROCESSING_TIME = Histogram(
     "method_steps_processing_time_seconds",
     "Histogram of the processing time of specific steps in methods for a given context (in seconds)",
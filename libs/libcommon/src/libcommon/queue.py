@@ -4,27 +4,40 @@
 import contextlib
 import logging
 import types
-from collections import Counter
 from datetime import datetime, timedelta
-from itertools import groupby
-from operator import itemgetter
-from typing import Generic, List, Optional, Type, TypedDict, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypedDict, TypeVar
 
 import pandas as pd
 import pytz
-from mongoengine import Document, DoesNotExist
-from mongoengine.fields import DateTimeField, EnumField, StringField
+from mongoengine import Document, DoesNotExist, NotUniqueError
+from mongoengine.fields import (
+    DateTimeField,
+    EnumField,
+    FloatField,
+    IntField,
+    StringField,
+)
 from mongoengine.queryset.queryset import QuerySet
 
 from libcommon.constants import (
+    QUEUE_COLLECTION_JOB_DURATION_STATS,
     QUEUE_COLLECTION_JOBS,
+    QUEUE_COLLECTION_STARTED_JOBS_COUNTS,
     QUEUE_MONGOENGINE_ALIAS,
+    QUEUE_SHORTEST_EXPECTED_FIRST_COST_FACTOR,
+    QUEUE_SHORTEST_EXPECTED_FIRST_MAX_DELAY_SECONDS,
     QUEUE_TTL_SECONDS,
 )
+from libcommon.job_notifications import JobNotification, JobNotifier, MongoJobNotifier
+from libcommon.simple_cache import (
+    get_num_bytes_original_files,
+    is_cache_database_connected,
+)
 from libcommon.utils import (
     FlatJobInfo,
     JobInfo,
     Priority,
+    SchedulingPolicy,
     Status,
     get_datetime,
     inputs_to_string,
@@ -111,6 +124,12 @@ class Job(Document):
         started_at (`datetime`, optional): When the job has started.
         finished_at (`datetime`, optional): When the job has finished.
         last_heartbeat (`datetime`, optional): Last time the running job got a heartbeat from the worker.
+        num_bytes (`int`, optional): The size of the original files of the dataset, or of the config, when the job was
+          created, if known.
+        estimated_cost (`float`, optional): The expected duration of the job in seconds, when the job was created, if
+          known. See `JobDurationStats`.
+        cost_adjusted_created_at (`datetime`, optional): The creation date, delayed in proportion to the estimated
+          cost. The jobs are ordered by this date with the shortest-expected-first scheduling policy.
     """
 
     meta = {
@@ -127,6 +146,8 @@ class Job(Document):
             ("priority", "status", "created_at", "type", "namespace"),
             ("priority", "status", "type", "created_at", "namespace", "unicity_id"),
             ("priority", "status", "created_at", "namespace", "type", "unicity_id"),
+            ("priority", "status", "cost_adjusted_created_at", "namespace", "unicity_id"),
+            ("priority", "status", "type", "cost_adjusted_created_at", "namespace", "unicity_id"),
             ("status", "type"),
             ("status", "namespace", "priority", "type", "created_at"),
             ("status", "namespace", "unicity_id", "priority", "type", "created_at"),
@@ -147,6 +168,9 @@ class Job(Document):
     started_at = DateTimeField()
     finished_at = DateTimeField()
     last_heartbeat = DateTimeField()
+    num_bytes = IntField()
+    estimated_cost = FloatField()
+    cost_adjusted_created_at = DateTimeField()
 
     def to_dict(self) -> JobDict:
         return {
@@ -198,6 +222,140 @@ class Job(Document):
         )
 
 
+class StartedJobsCount(Document):
+    """The number of started jobs of a type for a namespace, in the mongoDB database.
+
+    The counts are maintained by the queue when the jobs are started and finished, so that the scheduler does not load
+    all the started jobs to select the next job. They are approximate: they can drift if a process dies between the
+    update of a job and the update of its count, or if jobs are deleted or modified out of the queue. They are
+    periodically reconciled with the jobs (see `Queue.reconcile_started_jobs_counts`), and the negative counts are
+    ignored.
+
+    Args:
+        namespace (`str`): The dataset namespace (user or organization) if any, else the dataset name.
+        type (`str`): The type of the jobs.
+        count (`int`): The number of started jobs.
+    """
+
+    meta = {
+        "collection": QUEUE_COLLECTION_STARTED_JOBS_COUNTS,
+        "db_alias": QUEUE_MONGOENGINE_ALIAS,
+        "indexes": [
+            {"fields": ["namespace", "type"], "unique": True},
+            ("count", "type", "namespace"),
+        ],
+    }
+    namespace = StringField(required=True)
+    type = StringField(required=True)
+    count = IntField(required=True, default=0)
+
+    objects = QuerySetManager["StartedJobsCount"]()
+
+
+class JobDurationStats(Document):
+    """Statistics of the durations of the finished jobs of a type, in the mongoDB database.
+
+    They are updated every time a job is finished, and used to estimate the cost of the new jobs. Only sums are
+    stored, so that the updates are atomic increments: the concurrent updates of the workers are not lost.
+
+    Args:
+        type (`str`): The type of the jobs.
+        count (`int`): The number of finished jobs.
+        total_duration_seconds (`float`): The sum of the durations of the jobs, in seconds.
+        count_with_num_bytes (`int`): The number of finished jobs with a known size.
+        total_duration_seconds_with_num_bytes (`float`): The sum of the durations of the jobs with a known size, in
+          seconds.
+        total_num_bytes (`float`): The sum of the sizes of the jobs with a known size, in bytes.
+    """
+
+    meta = {
+        "collection": QUEUE_COLLECTION_JOB_DURATION_STATS,
+        "db_alias": QUEUE_MONGOENGINE_ALIAS,
+        "indexes": [
+            {"fields": ["type"], "unique": True},
+        ],
+    }
+    type = StringField(required=True)
+    count = IntField(required=True, default=0)
+    total_duration_seconds = FloatField(required=True, default=0.0)
+    count_with_num_bytes = IntField(required=True, default=0)
+    total_duration_seconds_with_num_bytes = FloatField(required=True, default=0.0)
+    total_num_bytes = FloatField(required=True, default=0.0)
+
+    objects = QuerySetManager["JobDurationStats"]()
+
+    @property
+    def mean_duration_seconds(self) -> Optional[float]:
+        """The mean duration of the jobs, in seconds. None if no job has been finished."""
+        return self.total_duration_seconds / self.count if self.count > 0 else None
+
+    @property
+    def mean_seconds_per_byte(self) -> Optional[float]:
+        """The duration of the jobs with a known size, divided by their size. None if no job has a known size."""
+        return (
+            self.total_duration_seconds_with_num_bytes / self.total_num_bytes
+            if self.count_with_num_bytes > 0 and self.total_num_bytes > 0
+            else None
+        )
+
+
+def get_new_waiting_job(
+    job_type: str,
+    dataset: str,
+    revision: str,
+    config: Optional[str] = None,
+    split: Optional[str] = None,
+    priority: Priority = Priority.NORMAL,
+) -> Job:
+    """Create a waiting job, without saving it. Its cost is not estimated yet."""
+    return Job(
+        type=job_type,
+        dataset=dataset,
+        revision=revision,
+        config=config,
+        split=split,
+        unicity_id=inputs_to_string(dataset=dataset, config=config, split=split, prefix=job_type),
+        namespace=dataset.split("/")[0],
+        priority=priority,
+        created_at=get_datetime(),
+        status=Status.WAITING,
+    )
+
+
+def estimate_cost(stats: Optional[JobDurationStats], num_bytes: Optional[int]) -> Optional[float]:
+    """Estimate the duration of a job, in seconds.
+
+    Args:
+        stats (`JobDurationStats`, optional): The statistics of the durations of the jobs of the same type.
+        num_bytes (`int`, optional): The size of the original files of the dataset, or of the config, if known.
+
+    Returns:
+        `Optional[float]`: The expected duration: the size multiplied by the mean duration per byte if both are known,
+          else the mean duration. None if no job of the type has been finished.
+    """
+    if stats is None:
+        return None
+    mean_seconds_per_byte = stats.mean_seconds_per_byte
+    if num_bytes is not None and mean_seconds_per_byte is not None:
+        return num_bytes * mean_seconds_per_byte
+    return stats.mean_duration_seconds
+
+
+def get_cost_adjusted_created_at(created_at: datetime, estimated_cost: Optional[float]) -> datetime:
+    """Delay the creation date of a job in proportion to its estimated cost.
+
+    Ordering the jobs by this date runs the shortest expected jobs first, with an aging term: a long job is only
+    overtaken by the shorter jobs created during its delay, which is capped by
+    QUEUE_SHORTEST_EXPECTED_FIRST_MAX_DELAY_SECONDS, so that it's eventually started.
+    """
+    if estimated_cost is None:
+        return created_at
+    delay_seconds = min(
+        estimated_cost * QUEUE_SHORTEST_EXPECTED_FIRST_COST_FACTOR, QUEUE_SHORTEST_EXPECTED_FIRST_MAX_DELAY_SECONDS
+    )
+    return created_at + timedelta(seconds=max(delay_seconds, 0))
+
+
 class Queue:
     """A queue manages jobs.
 
@@ -212,8 +370,95 @@ class Queue:
     - a job has a priority (two levels: NORMAL and LOW)
     - the queue is ordered by priority then by the creation date of the jobs
     - datasets and users that already have started jobs are de-prioritized (using namespace)
+    - with the shortest-expected-first scheduling policy, the jobs of a priority are ordered by their creation date
+      delayed in proportion to their estimated cost, instead of their creation date
+
+    The cost of a job is estimated when it's created, from the size of the dataset or config in the cache
+    ("dataset-size" and "config-size" entries), and from the durations of the previous jobs of the same type (see
+    `JobDurationStats`). The processes that create the jobs (API, orchestrator) don't know the scheduling policy of
+    the workers, so the costs are estimated whatever the policy of this Queue object. The sizes are only read if the
+    process is connected to the cache database: else the costs only depend on the durations.
+
+    Every time waiting jobs are created, a notification is published with their types, so that the idle workers can
+    start them without polling the queue.
+
+    Args:
+        job_notifier (`JobNotifier`, optional): The channel of the notifications of the creation of jobs. Defaults to
+          the notifications collection of the queue database.
+        scheduling_policy (`SchedulingPolicy`, optional): How the jobs of a priority are ordered to select the next
+          job. Defaults to SchedulingPolicy.FIFO.
     """
 
+    def __init__(
+        self,
+        job_notifier: Optional[JobNotifier] = None,
+        scheduling_policy: SchedulingPolicy = SchedulingPolicy.FIFO,
+    ):
+        self.job_notifier = MongoJobNotifier() if job_notifier is None else job_notifier
+        self.scheduling_policy = scheduling_policy
+
+    def _set_estimated_costs(self, jobs: List[Job]) -> None:
+        """Set the size, the estimated cost and the cost-adjusted creation date of new jobs.
+
+        The cost is only a hint for the scheduler: if the sizes cannot be read from the cache database, the costs are
+        estimated without them.
+
+        Args:
+            jobs (`List[Job]`): The new jobs. Their creation date must be set.
+        """
+        num_bytes_original_files: Dict[Tuple[str, Optional[str]], int] = {}
+        if not is_cache_database_connected():
+            logging.debug("not connected to the cache database, the costs of the jobs ignore the sizes")
+        else:
+            try:
+                num_bytes_original_files = get_num_bytes_original_files(datasets=sorted({job.dataset for job in jobs}))
+            except Exception as err:
+                logging.debug(f"failed to get the sizes of the datasets, the costs of the jobs ignore them: {err}")
+        stats_by_type: Dict[str, JobDurationStats] = {}
+        try:
+            stats_by_type = {
+                stats.type: stats for stats in JobDurationStats.objects(type__in=sorted({job.type for job in jobs}))
+            }
+        except Exception as err:
+            logging.debug(f"failed to get the duration statistics, the costs of the jobs are unknown: {err}")
+        for job in jobs:
+            num_bytes = num_bytes_original_files.get((job.dataset, job.config))
+            if num_bytes is None:
+                num_bytes = num_bytes_original_files.get((job.dataset, None))
+            job.num_bytes = num_bytes
+            job.estimated_cost = estimate_cost(stats=stats_by_type.get(job.type), num_bytes=num_bytes)
+            job.cost_adjusted_created_at = get_cost_adjusted_created_at(
+                created_at=job.created_at, estimated_cost=job.estimated_cost
+            )
+
+    def _update_job_duration_stats(self, job: Job, duration_seconds: float) -> None:
+        """Take the duration of a finished job into account in the statistics of its type.
+
+        Args:
+            job (`Job`): The finished job. The type and num_bytes fields must be loaded.
+            duration_seconds (`float`): The duration of the job, in seconds.
+        """
+        increments: Dict[str, Any] = {"inc__count": 1, "inc__total_duration_seconds": duration_seconds}
+        if job.num_bytes:
+            increments.update(
+                inc__count_with_num_bytes=1,
+                inc__total_duration_seconds_with_num_bytes=duration_seconds,
+                inc__total_num_bytes=job.num_bytes,
+            )
+        try:
+            JobDurationStats.objects(type=job.type).update_one(upsert=True, **increments)
+        except NotUniqueError:
+            # the statistics of the type have been created concurrently by another worker
+            JobDurationStats.objects(type=job.type).update_one(**increments)
+
+    def _publish_job_creation(self, job_types: List[str]) -> None:
+        # the notifications are only a hint for the workers, which still poll the queue: failing to publish one must
+        # not fail the creation of the jobs
+        try:
+            self.job_notifier.publish(job_types)
+        except Exception:
+            logging.warning(f"failed to publish the creation of jobs of types {job_types}", exc_info=True)
+
     def _add_job(
         self,
         job_type: str,
@@ -237,18 +482,13 @@ class Queue:
 
         Returns: the job
         """
-        return Job(
-            type=job_type,
-            dataset=dataset,
-            revision=revision,
-            config=config,
-            split=split,
-            unicity_id=inputs_to_string(dataset=dataset, config=config, split=split, prefix=job_type),
-            namespace=dataset.split("/")[0],
-            priority=priority,
-            created_at=get_datetime(),
-            status=Status.WAITING,
-        ).save()
+        job = get_new_waiting_job(
+            job_type=job_type, dataset=dataset, revision=revision, config=config, split=split, priority=priority
+        )
+        self._set_estimated_costs([job])
+        job.save()
+        self._publish_job_creation([job_type])
+        return job
 
     def upsert_job(
         self,
@@ -300,31 +540,41 @@ class Queue:
             `int`: The number of created jobs. 0 if we had an exception.
         """
         try:
-            jobs = [
-                Job(
-                    type=job_info["type"],
-                    dataset=job_info["params"]["dataset"],
-                    revision=job_info["params"]["revision"],
-                    config=job_info["params"]["config"],
-                    split=job_info["params"]["split"],
-                    unicity_id=inputs_to_string(
+            return self._insert_waiting_jobs(
+                [
+                    get_new_waiting_job(
+                        job_type=job_info["type"],
                         dataset=job_info["params"]["dataset"],
+                        revision=job_info["params"]["revision"],
                         config=job_info["params"]["config"],
                         split=job_info["params"]["split"],
-                        prefix=job_info["type"],
-                    ),
-                    namespace=job_info["params"]["dataset"].split("/")[0],
-                    priority=job_info["priority"],
-                    created_at=get_datetime(),
-                    status=Status.WAITING,
-                )
-                for job_info in job_infos
-            ]
-            job_ids = Job.objects.insert(jobs, load_bulk=False)
-            return len(job_ids)
+                        priority=job_info["priority"],
+                    )
+                    for job_info in job_infos
+                ]
+            )
         except Exception:
             return 0
 
+    def _insert_waiting_jobs(self, jobs: List[Job]) -> int:
+        """Insert new waiting jobs in one batch, and notify their creation.
+
+        Their costs are estimated for the whole batch, with one query for the sizes and one for the statistics.
+
+        Args:
+            jobs (`List[Job]`): The new waiting jobs, not saved yet.
+
+        Returns:
+            `int`: The number of inserted jobs.
+        """
+        if not jobs:
+            return 0
+        self._set_estimated_costs(jobs)
+        job_ids = Job.objects.insert(jobs, load_bulk=False)
+        if job_ids:
+            self._publish_job_creation(sorted({job.type for job in jobs}))
+        return len(job_ids)
+
     def cancel_jobs(
         self,
         job_type: str,
@@ -361,7 +611,15 @@ class Queue:
             status__in=statuses_to_cancel,
         )
         job_dicts = [job.to_dict() for job in existing]
-        existing.update(finished_at=get_datetime(), status=Status.CANCELLED)
+        if Status.STARTED in statuses_to_cancel:
+            for job in existing.filter(status=Status.STARTED):
+                self._finish_started_job(job=job, status=Status.CANCELLED)
+        # the started jobs are not cancelled in bulk, not to miss the update of their count
+        other_statuses_to_cancel = [status for status in statuses_to_cancel if status != Status.STARTED]
+        if other_statuses_to_cancel:
+            Job.objects(
+                type=job_type, dataset=dataset, config=config, split=split, status__in=other_statuses_to_cancel
+            ).update(finished_at=get_datetime(), status=Status.CANCELLED)
         return job_dicts
 
     def cancel_jobs_by_job_id(self, job_ids: List[str]) -> int:
@@ -377,16 +635,170 @@ class Queue:
         """
         try:
             existing = Job.objects(pk__in=job_ids)
-            existing.update(finished_at=get_datetime(), status=Status.CANCELLED)
+            for job in existing.filter(status=Status.STARTED):
+                self._finish_started_job(job=job, status=Status.CANCELLED)
+            existing.filter(status__ne=Status.STARTED).update(finished_at=get_datetime(), status=Status.CANCELLED)
             return existing.count()
         except Exception:
             return 0
 
+    def _update_started_jobs_count(self, namespace: str, job_type: str, increment: int) -> None:
+        # the document is created on the first started job of the type for the namespace
+        StartedJobsCount.objects(namespace=namespace, type=job_type).update_one(
+            inc__count=increment, upsert=increment > 0
+        )
+
+    def _finish_started_job(self, job: Job, status: Status) -> bool:
+        """Move a started job to a finished status, and update the count of started jobs of its namespace.
+
+        The update is atomic: if the job has been finished concurrently, it is not finished again.
+
+        Args:
+            job (`Job`): The job. The namespace and type fields must be loaded.
+            status (`Status`): The finished status (SUCCESS, ERROR or CANCELLED).
+
+        Returns:
+            `bool`: whether the job was started
+        """
+        if not Job.objects(pk=job.pk, status=Status.STARTED).update(finished_at=get_datetime(), status=status):
+            return False
+        self._update_started_jobs_count(namespace=job.namespace, job_type=job.type, increment=-1)
+        return True
+
+    def get_started_jobs_count_by_namespace(
+        self, job_types_blocked: Optional[list[str]] = None, job_types_only: Optional[list[str]] = None
+    ) -> Dict[str, int]:
+        """Get the number of started jobs of every namespace that has started jobs.
+
+        The counts are aggregated from the maintained counts, not from the jobs: they are approximate, and the
+        negative counts, which can only come from a drift, are ignored.
+
+        Args:
+            job_types_blocked: if not None, jobs of the given types are not counted.
+            job_types_only: if not None, only jobs of the given types are counted.
+
+        Returns: the number of started jobs by namespace
+        """
+        filters: Dict[str, Any] = {}
+        if job_types_blocked:
+            filters["type__nin"] = job_types_blocked
+        if job_types_only:
+            filters["type__in"] = job_types_only
+        return {
+            result["_id"]: result["count"]
+            for result in StartedJobsCount.objects(count__gt=0, **filters).aggregate(
+                [{"$group": {"_id": "$namespace", "count": {"$sum": "$count"}}}]
+            )
+        }
+
+    def reset_started_jobs_counts(self) -> None:
+        """Recompute the counts of started jobs from the jobs.
+
+        It should only be run when no job is started or finished concurrently, e.g. in a migration.
+        """
+        counts = Job.objects(status=Status.STARTED).aggregate(
+            [{"$group": {"_id": {"namespace": "$namespace", "type": "$type"}, "count": {"$sum": 1}}}]
+        )
+        StartedJobsCount.objects().delete()
+        started_jobs_counts = [
+            StartedJobsCount(namespace=result["_id"]["namespace"], type=result["_id"]["type"], count=result["count"])
+            for result in counts
+        ]
+        if started_jobs_counts:
+            StartedJobsCount.objects.insert(started_jobs_counts, load_bulk=False)
+
+    def reconcile_started_jobs_counts(self) -> int:
+        """Fix the counts of started jobs that differ from the jobs.
+
+        Contrary to `reset_started_jobs_counts`, it can be run while jobs are started and finished: a count is only
+        set if it has not been updated since it was read, else it's left to the next reconciliation. A job started or
+        finished during the reconciliation can still leave its count off by one until then.
+
+        Returns:
+            `int`: The number of fixed counts.
+        """
+        maintained_counts = {
+            (started_jobs_count["namespace"], started_jobs_count["type"]): started_jobs_count["count"]
+            for started_jobs_count in StartedJobsCount.objects().only("namespace", "type", "count").as_pymongo()
+        }
+        actual_counts = {
+            (result["_id"]["namespace"], result["_id"]["type"]): result["count"]
+            for result in Job.objects(status=Status.STARTED).aggregate(
+                [{"$group": {"_id": {"namespace": "$namespace", "type": "$type"}, "count": {"$sum": 1}}}]
+            )
+        }
+        num_fixed_counts = 0
+        for namespace, job_type in set(maintained_counts) | set(actual_counts):
+            maintained_count = maintained_counts.get((namespace, job_type))
+            actual_count = actual_counts.get((namespace, job_type), 0)
+            if maintained_count == actual_count or (maintained_count is None and actual_count == 0):
+                continue
+            logging.debug(
+                f"fixing the count of started jobs of type {job_type} for namespace {namespace}: {maintained_count} ->"
+                f" {actual_count}"
+            )
+            if maintained_count is None:
+                try:
+                    StartedJobsCount(namespace=namespace, type=job_type, count=actual_count).save(force_insert=True)
+                except NotUniqueError:
+                    # the count has been created meanwhile by the start of a job
+                    continue
+                num_fixed_counts += 1
+            else:
+                num_fixed_counts += StartedJobsCount.objects(
+                    namespace=namespace, type=job_type, count=maintained_count
+                ).update_one(set__count=actual_count)
+        return num_fixed_counts
+
+    def _start_first_waiting_job(self, waiting_jobs: QuerySet[Job]) -> Optional[Job]:
+        """Start the first of the waiting jobs, if any.
+
+        The job is found and started in the same atomic operation (find_one_and_update): a job cannot be started by
+        two workers.
+
+        Args:
+            waiting_jobs (`QuerySet[Job]`): The waiting jobs to choose from, in order.
+
+        Returns: the started job, or None if there is no waiting job
+        """
+        # the stubs are wrong: modify returns the document, or None
+        started_job: Optional[Job] = waiting_jobs.modify(  # type: ignore
+            new=True, status=Status.STARTED, started_at=get_datetime()
+        )
+        if started_job is not None:
+            self._update_started_jobs_count(namespace=started_job.namespace, job_type=started_job.type, increment=1)
+        return started_job
+
+    def _get_first_waiting_job(self, waiting_jobs: QuerySet[Job], start: bool = False) -> Optional[Job]:
+        """Get the waiting job with the oldest creation date (or cost-adjusted creation date, depending on the
+        scheduling policy), if any.
+
+        Args:
+            waiting_jobs (`QuerySet[Job]`): The waiting jobs to choose from.
+            start (`bool`, optional): Whether to start the job. The job is found and started in the same atomic
+              operation (find_one_and_update): a job cannot be started by two workers. Defaults to False.
+
+        Returns: the job, or None if there is no waiting job
+        """
+        order_by = (
+            ("+cost_adjusted_created_at", "+created_at")
+            if self.scheduling_policy == SchedulingPolicy.SHORTEST_EXPECTED_FIRST
+            else ("+created_at",)
+        )
+        waiting_jobs = waiting_jobs.order_by(*order_by).only(
+            "type", "dataset", "revision", "config", "split", "priority", "namespace"
+        )
+        if start:
+            return self._start_first_waiting_job(waiting_jobs)
+        # no_cache should generate a query on every iteration, which should solve concurrency issues between workers
+        return waiting_jobs.no_cache().first()
+
     def _get_next_waiting_job_for_priority(
         self,
         priority: Priority,
         job_types_blocked: Optional[list[str]] = None,
         job_types_only: Optional[list[str]] = None,
+        start: bool = False,
     ) -> Job:
         """Get the next job in the queue for a given priority.
 
@@ -395,10 +807,14 @@ class Queue:
         - if none, among the datasets that have the least started jobs:
           - ensuring that the unicity_id field is unique among the started jobs.
 
+        The number of started jobs by namespace is read from the maintained counts (see `StartedJobsCount`): the
+        started jobs themselves are only loaded for the namespaces that are candidates.
+
         Args:
             priority (`Priority`): The priority of the job.
             job_types_blocked: if not None, jobs of the given types are not considered.
             job_types_only: if not None, only jobs of the given types are considered.
+            start (`bool`, optional): Whether to atomically start the job. Defaults to False.
 
         Raises:
             EmptyQueueError: if there is no waiting job in the queue that satisfies the restrictions above.
@@ -414,22 +830,20 @@ class Queue:
             filters["type__nin"] = job_types_blocked
         if job_types_only:
             filters["type__in"] = job_types_only
-        started_jobs = Job.objects(status=Status.STARTED, **filters)
-        logging.debug(f"Number of started jobs: {started_jobs.count()}")
-        started_job_namespaces = [job.namespace for job in started_jobs.only("namespace")]
-        logging.debug(f"Started job namespaces: {started_job_namespaces}")
+        started_jobs_count_by_namespace = self.get_started_jobs_count_by_namespace(
+            job_types_blocked=job_types_blocked, job_types_only=job_types_only
+        )
+        logging.debug(f"Number of started jobs by namespace: {started_jobs_count_by_namespace}")
 
-        next_waiting_job = (
+        next_waiting_job = self._get_first_waiting_job(
             Job.objects(
-                status=Status.WAITING, namespace__nin=set(started_job_namespaces), priority=priority, **filters
-            )
-            .order_by("+created_at")
-            .only("type", "dataset", "revision", "config", "split", "priority")
-            .no_cache()
-            .first()
+                status=Status.WAITING,
+                namespace__nin=list(started_jobs_count_by_namespace.keys()),
+                priority=priority,
+                **filters,
+            ),
+            start=start,
         )
-
-        # ^ no_cache should generate a query on every iteration, which should solve concurrency issues between workers
         if next_waiting_job is not None:
             return next_waiting_job
         logging.debug("No waiting job for namespace without started job")
@@ -440,30 +854,24 @@ class Queue:
         # - exclude the waiting jobs which unicity_id is already in a started job
         # and, among the remaining waiting jobs, let's:
         # - select the oldest waiting job for the namespace with the least number of started jobs
-        started_unicity_ids = {job.unicity_id for job in started_jobs.only("unicity_id")}
-        descending_frequency_namespace_counts = [
-            [namespace, count] for namespace, count in Counter(started_job_namespaces).most_common()
-        ]
-        logging.debug(f"Descending frequency namespace counts: {descending_frequency_namespace_counts}")
-        descending_frequency_namespace_groups = [
-            [item[0] for item in data] for (_, data) in groupby(descending_frequency_namespace_counts, itemgetter(1))
-        ]
-        # maybe we could get rid of this loop
-        while descending_frequency_namespace_groups:
-            least_common_namespaces_group = descending_frequency_namespace_groups.pop()
+        namespaces_by_count: Dict[int, List[str]] = {}
+        for namespace, count in started_jobs_count_by_namespace.items():
+            namespaces_by_count.setdefault(count, []).append(namespace)
+        for count in sorted(namespaces_by_count):
+            least_common_namespaces_group = namespaces_by_count[count]
             logging.debug(f"Least common namespaces group: {least_common_namespaces_group}")
-            next_waiting_job = (
+            started_unicity_ids = Job.objects(
+                status=Status.STARTED, namespace__in=least_common_namespaces_group, **filters
+            ).distinct("unicity_id")
+            next_waiting_job = self._get_first_waiting_job(
                 Job.objects(
                     status=Status.WAITING,
                     namespace__in=least_common_namespaces_group,
                     unicity_id__nin=started_unicity_ids,
                     priority=priority,
                     **filters,
-                )
-                .order_by("+created_at")
-                .only("type", "dataset", "revision", "config", "split", "priority")
-                .no_cache()
-                .first()
+                ),
+                start=start,
             )
             if next_waiting_job is not None:
                 return next_waiting_job
@@ -489,24 +897,28 @@ class Queue:
 
         Returns: the job
         """
+        return self._get_next_waiting_job(job_types_blocked=job_types_blocked, job_types_only=job_types_only)
+
+    def _get_next_waiting_job(
+        self,
+        job_types_blocked: Optional[list[str]] = None,
+        job_types_only: Optional[list[str]] = None,
+        start: bool = False,
+    ) -> Job:
         for priority in [Priority.NORMAL, Priority.LOW]:
             with contextlib.suppress(EmptyQueueError):
                 return self._get_next_waiting_job_for_priority(
-                    priority=priority, job_types_blocked=job_types_blocked, job_types_only=job_types_only
+                    priority=priority, job_types_blocked=job_types_blocked, job_types_only=job_types_only, start=start
                 )
         raise EmptyQueueError("no job available")
 
-    def _start_job(self, job: Job) -> Job:
-        # could be a method of Job
-        job.update(started_at=get_datetime(), status=Status.STARTED)
-        return job
-
     def start_job(
         self, job_types_blocked: Optional[list[str]] = None, job_types_only: Optional[list[str]] = None
     ) -> JobInfo:
         """Start the next job in the queue.
 
-        The job is moved from the waiting state to the started state.
+        The job is moved from the waiting state to the started state. The job is found and moved in the same atomic
+        operation: concurrent calls, e.g. from different workers, never start the same job.
 
         Args:
             job_types_blocked: if not None, jobs of the given types are not considered.
@@ -519,15 +931,14 @@ class Queue:
         Returns: the job id, the type, the input arguments: dataset, revision, config and split
         """
         logging.debug(f"looking for a job to start, blocked types: {job_types_blocked}, only types: {job_types_only}")
-        next_waiting_job = self.get_next_waiting_job(
-            job_types_blocked=job_types_blocked, job_types_only=job_types_only
+        next_waiting_job = self._get_next_waiting_job(
+            job_types_blocked=job_types_blocked, job_types_only=job_types_only, start=True
         )
-        logging.debug(f"job found: {next_waiting_job}")
+        logging.debug(f"job started: {next_waiting_job}")
         # ^ can raise EmptyQueueError
-        self._start_job(next_waiting_job)
         if job_types_blocked and next_waiting_job.type in job_types_blocked:
             raise RuntimeError(
-                f"The job type {next_waiting_job.type} is in the list of blocked job types {job_types_only}"
+                f"The job type {next_waiting_job.type} is in the list of blocked job types {job_types_blocked}"
             )
         if job_types_only and next_waiting_job.type not in job_types_only:
             raise RuntimeError(
@@ -623,7 +1034,13 @@ class Queue:
             logging.error(f"job {job_id} has not the expected format for a started job. Aborting: {e}")
             return False
         finished_status = Status.SUCCESS if is_success else Status.ERROR
-        job.update(finished_at=get_datetime(), status=finished_status)
+        if not self._finish_started_job(job=job, status=finished_status):
+            return False
+        try:
+            duration_seconds = (get_datetime() - pytz.UTC.localize(job.started_at)).total_seconds()
+            self._update_job_duration_stats(job=job, duration_seconds=duration_seconds)
+        except Exception as err:
+            logging.warning(f"failed to update the duration statistics of the jobs of type {job.type}: {err}")
         return True
 
     def is_job_in_process(
@@ -653,13 +1070,55 @@ class Queue:
             > 0
         )
 
+    def requeue_started_job(self, job_id: str) -> bool:
+        """Cancel a started job, and replace it with a waiting job with the same parameters and priority.
+
+        It's used when the job has been stopped without being processed, e.g. when its worker process is killed.
+
+        Args:
+            job_id (`str`): The id of the job.
+
+        Returns:
+            `bool`: whether the job was started, and has been re-queued. A job finished meanwhile is left untouched.
+        """
+        try:
+            job = Job.objects(pk=job_id, status=Status.STARTED).get()
+        except DoesNotExist:
+            return False
+        if not self._finish_started_job(job=job, status=Status.CANCELLED):
+            return False
+        self.upsert_job(
+            job_type=job.type,
+            dataset=job.dataset,
+            revision=job.revision,
+            config=job.config,
+            split=job.split,
+            priority=job.priority,
+        )
+        return True
+
     def cancel_started_jobs(self, job_type: str) -> None:
-        """Cancel all started jobs for a given type."""
+        """Cancel all started jobs for a given type, and replace them with waiting jobs.
+
+        As with `upsert_job`, the waiting jobs with the same parameters are cancelled. The new jobs are inserted in one
+        batch.
+        """
+        new_jobs = []
         for job in Job.objects(type=job_type, status=Status.STARTED.value):
-            job.update(finished_at=get_datetime(), status=Status.CANCELLED)
-            self.upsert_job(
-                job_type=job.type, dataset=job.dataset, revision=job.revision, config=job.config, split=job.split
+            self._finish_started_job(job=job, status=Status.CANCELLED)
+            self.cancel_jobs(
+                job_type=job.type,
+                dataset=job.dataset,
+                config=job.config,
+                split=job.split,
+                statuses_to_cancel=[Status.WAITING],
+            )
+            new_jobs.append(
+                get_new_waiting_job(
+                    job_type=job.type, dataset=job.dataset, revision=job.revision, config=job.config, split=job.split
+                )
             )
+        self._insert_waiting_jobs(new_jobs)
 
     def _get_df(self, jobs: List[FlatJobInfo]) -> pd.DataFrame:
         return pd.DataFrame(
@@ -815,6 +1274,9 @@ class Queue:
 def _clean_queue_database() -> None:
     """Delete all the jobs in the database"""
     Job.drop_collection()  # type: ignore
+    StartedJobsCount.drop_collection()  # type: ignore
+    JobNotification.drop_collection()  # type: ignore
+    JobDurationStats.drop_collection()  # type: ignore
 
 
 # explicit re-export
@@ -1,10 +1,14 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import logging
+import time
 import types
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from http import HTTPStatus
+from threading import Lock
 from typing import (
     Any,
     Dict,
@@ -14,6 +18,7 @@ from typing import (
     NamedTuple,
     Optional,
     Set,
+    Tuple,
     Type,
     TypedDict,
     TypeVar,
@@ -23,6 +28,7 @@ import pandas as pd
 from bson import ObjectId
 from bson.errors import InvalidId
 from mongoengine import Document, DoesNotExist
+from mongoengine.connection import ConnectionFailure, get_connection
 from mongoengine.fields import (
     DateTimeField,
     DictField,
@@ -110,6 +116,7 @@ class CachedResponse(Document):
             ("kind", "http_status", "dataset"),
             ("kind", "http_status", "error_code"),
             ("kind", "id"),
+            "updated_at",
         ],
     }
     objects = QuerySetManager["CachedResponse"]()
@@ -324,34 +331,103 @@ def get_response_with_details(
 CACHED_RESPONSE_NOT_FOUND = "CachedResponseNotFound"
 
 
+def get_missing_error(
+    kind: str, dataset: str, config: Optional[str] = None, split: Optional[str] = None
+) -> CacheEntryWithDetails:
+    return CacheEntryWithDetails(
+        content={
+            "error": f"Cached response not found for kind {kind}, dataset {dataset}, config {config}, split {split}"
+        },
+        http_status=HTTPStatus.NOT_FOUND,
+        error_code=CACHED_RESPONSE_NOT_FOUND,
+        dataset_git_revision=None,
+        job_runner_version=None,
+        progress=None,
+        details={},
+    )
+
+
 def get_response_or_missing_error(
     kind: str, dataset: str, config: Optional[str] = None, split: Optional[str] = None
 ) -> CacheEntryWithDetails:
     try:
         response = get_response_with_details(kind=kind, dataset=dataset, config=config, split=split)
     except DoesNotExist:
-        response = CacheEntryWithDetails(
-            content={
-                "error": (
-                    f"Cached response not found for kind {kind}, dataset {dataset}, config {config}, split {split}"
-                )
-            },
-            http_status=HTTPStatus.NOT_FOUND,
-            error_code=CACHED_RESPONSE_NOT_FOUND,
-            dataset_git_revision=None,
-            job_runner_version=None,
-            progress=None,
-            details={},
-        )
+        response = get_missing_error(kind=kind, dataset=dataset, config=config, split=split)
     return response
 
 
 @dataclass
-class BestResponse:
+class BestResponseMetadata:
+    """The metadata of a best response, see `get_best_response_metadata`.
+
+    Args:
+        kind (`str`): The cache kind of the response.
+        response (`CacheEntryWithoutContent`): The response, without its content.
+        updated_at (`datetime`, optional): When the response has been last updated. None for a cache miss.
+    """
+
     kind: str
+    response: CacheEntryWithoutContent
+    updated_at: Optional[datetime] = None
+
+
+@dataclass
+class BestResponse(BestResponseMetadata):
     response: CacheEntryWithDetails
 
 
+def get_best_response_index(responses: List[CacheEntryWithoutContent]) -> int:
+    max_index = 0
+    max_value = float("-inf")
+    for index, response in enumerate(responses):
+        if response["http_status"] >= HTTPStatus.BAD_REQUEST.value:
+            # only the first error response is considered
+            continue
+        value = 0.0 if response["progress"] is None or response["progress"] < 0.0 else response["progress"]
+        if value > max_value:
+            max_value = value
+            max_index = index
+    return max_index
+
+
+def get_best_response_candidate(
+    kind: str, dataset: str, config: Optional[str] = None, split: Optional[str] = None
+) -> BestResponse:
+    try:
+        response = (
+            CachedResponse.objects(kind=kind, dataset=dataset, config=config, split=split)
+            .only(
+                "content",
+                "http_status",
+                "error_code",
+                "job_runner_version",
+                "dataset_git_revision",
+                "progress",
+                "details",
+                "updated_at",
+            )
+            .get()
+        )
+    except DoesNotExist:
+        return BestResponse(
+            kind=kind, response=get_missing_error(kind=kind, dataset=dataset, config=config, split=split)
+        )
+    return BestResponse(
+        kind=kind,
+        response={
+            "content": response.content,
+            "http_status": response.http_status,
+            "error_code": response.error_code,
+            "job_runner_version": response.job_runner_version,
+            "dataset_git_revision": response.dataset_git_revision,
+            "progress": response.progress,
+            "details": response.details,
+        },
+        updated_at=response.updated_at,
+    )
+
+
 def get_best_response(
     kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
 ) -> BestResponse:
@@ -378,32 +454,249 @@ def get_best_response(
     if not kinds:
         raise ValueError("kinds must be a non-empty list")
     best_response_candidates = [
-        BestResponse(
-            kind=kind, response=get_response_or_missing_error(kind=kind, dataset=dataset, config=config, split=split)
-        )
-        for kind in kinds
+        get_best_response_candidate(kind=kind, dataset=dataset, config=config, split=split) for kind in kinds
+    ]
+    return best_response_candidates[
+        get_best_response_index([candidate.response for candidate in best_response_candidates])
     ]
-    max_index = 0
-    max_value = float("-inf")
-    for index, candidate in enumerate(best_response_candidates):
-        if candidate.response["http_status"] >= HTTPStatus.BAD_REQUEST.value:
-            # only the first error response is considered
-            continue
-        value = (
-            0.0
-            if candidate.response["progress"] is None or candidate.response["progress"] < 0.0
-            else candidate.response["progress"]
-        )
-        if value > max_value:
-            max_value = value
-            max_index = index
-    return best_response_candidates[max_index]
+
+
+def get_entry_without_content(entry: CacheEntryWithoutContent) -> CacheEntryWithoutContent:
+    return {
+        "http_status": entry["http_status"],
+        "error_code": entry["error_code"],
+        "dataset_git_revision": entry["dataset_git_revision"],
+        "job_runner_version": entry["job_runner_version"],
+        "progress": entry["progress"],
+    }
+
+
+def get_best_response_metadata(
+    kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
+) -> BestResponseMetadata:
+    """
+    Same as `get_best_response`, but the content (and the details) of the responses are not loaded from the database.
+
+    It allows to check cheaply if the best response has changed, e.g. with its `updated_at` field.
+
+    Args:
+        kinds (`List[str]`):
+            A non-empty list of cache kinds to look responses for.
+        dataset (`str`):
+            A namespace (user or an organization) and a repo name separated by a `/`.
+        config (`str`, optional):
+            A config name.
+        split (`str`, optional):
+            A split name.
+    Returns:
+        BestResponseMetadata: The metadata of the best response (object with fields: kind, response and updated_at).
+    """
+    if not kinds:
+        raise ValueError("kinds must be a non-empty list")
+    candidates: List[BestResponseMetadata] = []
+    for kind in kinds:
+        try:
+            metadata = get_response_metadata(kind=kind, dataset=dataset, config=config, split=split)
+            candidates.append(
+                BestResponseMetadata(
+                    kind=kind, response=get_entry_without_content(metadata), updated_at=metadata["updated_at"]
+                )
+            )
+        except DoesNotExist:
+            missing_error = get_missing_error(kind=kind, dataset=dataset, config=config, split=split)
+            candidates.append(BestResponseMetadata(kind=kind, response=get_entry_without_content(missing_error)))
+    return candidates[get_best_response_index([candidate.response for candidate in candidates])]
+
+
+BEST_RESPONSE_CACHE_MAX_ENTRIES = 10_000
+BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS = 1.0
+BEST_RESPONSE_CACHE_TTL_SECONDS = 60.0
+# the watermark is moved back by this delay, to tolerate the clock skew between the writers of the responses, and the
+# responses being read while they are updated
+BEST_RESPONSE_CACHE_WATERMARK_DELAY_SECONDS = 5.0
+
+BestResponseCacheKey = Tuple[Tuple[str, ...], str, Optional[str], Optional[str]]
+
+
+class BestResponseCache:
+    """
+    A read-through in-process LRU cache of the best responses (see `get_best_response`), keyed by (kinds, dataset,
+    config, split).
+
+    The entries are invalidated by polling the cache collection: at most every `poll_interval_seconds`, one query lists
+    the datasets of the responses updated since the previous poll (the `updated_at` watermark), and all the entries of
+    these datasets are dropped. The deletions of responses do not change `updated_at`, so the entries also expire after
+    `ttl_seconds`.
+
+    The cache is thread-safe. The cached responses are shared: they must not be modified.
+
+    Args:
+        max_entries (`int`, *optional*, defaults to `BEST_RESPONSE_CACHE_MAX_ENTRIES`): The maximum number of entries.
+          The least recently used entries are evicted first. If 0, the cache is disabled.
+        poll_interval_seconds (`float`, *optional*, defaults to `BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS`): The
+          minimum delay between two polls of the updated responses, in seconds. It bounds the staleness of the entries.
+        ttl_seconds (`float`, *optional*, defaults to `BEST_RESPONSE_CACHE_TTL_SECONDS`): How long an entry is kept,
+          in seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = BEST_RESPONSE_CACHE_MAX_ENTRIES,
+        poll_interval_seconds: float = BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS,
+        ttl_seconds: float = BEST_RESPONSE_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.poll_interval_seconds = poll_interval_seconds
+        self.ttl_seconds = ttl_seconds
+        # the best response, and its expiration time
+        self._entries: "OrderedDict[BestResponseCacheKey, Tuple[BestResponse, float]]" = OrderedDict()
+        self._keys_by_dataset: Dict[str, Set[BestResponseCacheKey]] = {}
+        self._lock = Lock()
+        self._poll_lock = Lock()
+        self._watermark = get_datetime() - timedelta(seconds=BEST_RESPONSE_CACHE_WATERMARK_DELAY_SECONDS)
+        self._polled_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _delete(self, key: BestResponseCacheKey) -> None:
+        del self._entries[key]
+        dataset = key[1]
+        keys = self._keys_by_dataset[dataset]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_dataset[dataset]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_dataset.clear()
+
+    def poll(self) -> None:
+        """Drop the entries of the datasets that have updated responses since the previous poll."""
+        polled_at = time.monotonic()
+        watermark = get_datetime() - timedelta(seconds=BEST_RESPONSE_CACHE_WATERMARK_DELAY_SECONDS)
+        try:
+            datasets = CachedResponse.objects(updated_at__gte=self._watermark).distinct("dataset")
+        except Exception:
+            logging.warning(
+                "Failed to poll the updated responses, the best responses cache is cleared.", exc_info=True
+            )
+            self.clear()
+            return
+        with self._lock:
+            for dataset in datasets:
+                for key in list(self._keys_by_dataset.get(dataset, [])):
+                    self._delete(key)
+        self._watermark = watermark
+        self._polled_at = polled_at
+
+    def _poll_if_due(self) -> None:
+        if time.monotonic() - self._polled_at < self.poll_interval_seconds:
+            return
+        # only one thread polls, the other ones don't wait for it
+        if self._poll_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self._polled_at >= self.poll_interval_seconds:
+                    self.poll()
+            finally:
+                self._poll_lock.release()
+
+    def get_best_response(
+        self, kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
+    ) -> BestResponse:
+        """See `get_best_response`. The response is read from the database only if it is not cached."""
+        if self.max_entries <= 0:
+            return get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+        self._poll_if_due()
+        key = (tuple(kinds), dataset, config, split)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                best_response, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    return best_response
+                self._delete(key)
+        best_response = get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+            self._entries[key] = (best_response, time.monotonic() + self.ttl_seconds)
+            self._keys_by_dataset.setdefault(dataset, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._delete(next(iter(self._entries)))
+        return best_response
+
+    def get_best_response_metadata(
+        self, kinds: List[str], dataset: str, config: Optional[str] = None, split: Optional[str] = None
+    ) -> BestResponseMetadata:
+        """See `get_best_response_metadata`. The cached best response is returned if it is fresh, but the metadata
+        are not cached: a cache miss doesn't load the content."""
+        if self.max_entries > 0:
+            self._poll_if_due()
+            key = (tuple(kinds), dataset, config, split)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() < entry[1]:
+                    best_response = entry[0]
+                    return BestResponseMetadata(
+                        kind=best_response.kind,
+                        response=get_entry_without_content(best_response.response),
+                        updated_at=best_response.updated_at,
+                    )
+        return get_best_response_metadata(kinds=kinds, dataset=dataset, config=config, split=split)
 
 
 def get_valid_datasets(kind: str) -> Set[str]:
     return set(CachedResponse.objects(kind=kind, http_status=HTTPStatus.OK).distinct("dataset"))
 
 
+def is_cache_database_connected() -> bool:
+    """Check if a connection to the cache database has been registered in this process (see CacheMongoResource)."""
+    try:
+        get_connection(alias=CACHE_MONGOENGINE_ALIAS)
+        return True
+    except ConnectionFailure:
+        return False
+
+
+def get_num_bytes_original_files(datasets: List[str]) -> Dict[Tuple[str, Optional[str]], int]:
+    """
+    Get the size of the original files of the datasets, and of their configs, from the successful "dataset-size" and
+    "config-size" cache entries.
+
+    Args:
+        datasets (`List[str]`): The datasets.
+
+    Returns:
+        `Dict[Tuple[str, Optional[str]], int]`: The size in bytes, by (dataset, None) for the datasets, and by
+          (dataset, config) for the configs. The datasets and configs with no size in the cache are missing.
+    """
+    entries = (
+        CachedResponse.objects(
+            kind__in=["dataset-size", "config-size"], dataset__in=datasets, http_status=HTTPStatus.OK
+        )
+        .only(
+            "kind",
+            "dataset",
+            "config",
+            "content__size__dataset__num_bytes_original_files",
+            "content__size__config__num_bytes_original_files",
+        )
+        .as_pymongo()
+    )
+    num_bytes_original_files: Dict[Tuple[str, Optional[str]], int] = {}
+    for entry in entries:
+        level = "dataset" if entry["kind"] == "dataset-size" else "config"
+        num_bytes = entry.get("content", {}).get("size", {}).get(level, {}).get("num_bytes_original_files")
+        if isinstance(num_bytes, int):
+            num_bytes_original_files[
+                (entry["dataset"], None if level == "dataset" else entry.get("config"))
+            ] = num_bytes
+    return num_bytes_original_files
+
+
 def get_validity_by_kind(dataset: str, kinds: Optional[List[str]] = None) -> Mapping[str, bool]:
     # TODO: rework with aggregate
     entries = (
@@ -13,6 +13,7 @@ from libcommon.constants import (
     ASSETS_CACHE_APPNAME,
     CACHED_ASSETS_CACHE_APPNAME,
     PARQUET_METADATA_CACHE_APPNAME,
+    ROW_GROUPS_CACHE_APPNAME,
 )
 
 StrPath = Union[str, PathLike[str]]
@@ -81,6 +82,20 @@ def init_parquet_metadata_dir(directory: Optional[StrPath] = None) -> StrPath:
     return init_dir(directory, appname=PARQUET_METADATA_CACHE_APPNAME)
 
 
+def init_row_groups_cache_dir(directory: Optional[StrPath] = None) -> StrPath:
+    """Initialize the row groups cache directory.
+
+    If directory is None, it will be set to the default cache location on the machine.
+
+    Args:
+        directory (Optional[Union[str, PathLike[str]]], optional): The directory to initialize. Defaults to None.
+
+    Returns:
+        Union[str, PathLike[str]]: The directory.
+    """
+    return init_dir(directory, appname=ROW_GROUPS_CACHE_APPNAME)
+
+
 def exists(path: StrPath) -> bool:
     """Check if a path exists.
 
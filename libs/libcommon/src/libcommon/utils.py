@@ -24,6 +24,11 @@ class Priority(str, enum.Enum):
     LOW = "low"
 
 
+class SchedulingPolicy(str, enum.Enum):
+    FIFO = "fifo"
+    SHORTEST_EXPECTED_FIRST = "shortest-expected-first"
+
+
 class JobParams(TypedDict):
     dataset: str
     revision: str
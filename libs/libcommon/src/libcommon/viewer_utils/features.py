@@ -3,9 +3,10 @@
 
 import json
 from io import BytesIO
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 from zlib import adler32
 
+import pyarrow as pa
 from datasets import (
     Array2D,
     Array3D,
@@ -13,6 +14,7 @@ from datasets import (
     Array5D,
     Audio,
     ClassLabel,
+    Features,
     Image,
     Sequence,
     Translation,
@@ -25,6 +27,18 @@ from PIL import Image as PILImage  # type: ignore
 from libcommon.storage import StrPath
 from libcommon.viewer_utils.asset import create_audio_files, create_image_file
 
+# the cells of these types are returned as is by get_cell_value
+PASSTHROUGH_FEATURE_TYPES = (
+    Value,
+    ClassLabel,
+    Array2D,
+    Array3D,
+    Array4D,
+    Array5D,
+    Translation,
+    TranslationVariableLanguages,
+)
+
 
 def append_hash_suffix(string: str, json_path: Optional[List[Union[str, int]]] = None) -> str:
     """
@@ -261,19 +275,144 @@ def get_cell_value(
             )
             for (key, subCell) in cell.items()
         }
-    elif isinstance(
-        fieldType,
-        (
-            Value,
-            ClassLabel,
-            Array2D,
-            Array3D,
-            Array4D,
-            Array5D,
-            Translation,
-            TranslationVariableLanguages,
-        ),
-    ):
+    elif isinstance(fieldType, PASSTHROUGH_FEATURE_TYPES):
         return cell
     else:
         raise TypeError("could not determine the type of the data cell.")
+
+
+def transform_rows(
+    dataset: str,
+    config: str,
+    split: str,
+    pa_table: pa.Table,
+    features: Features,
+    assets_base_url: str,
+    assets_directory: StrPath,
+    offset: int = 0,
+    overwrite: bool = True,
+) -> List[Mapping[str, Any]]:
+    """
+    Convert the rows of a pyarrow table to python objects, and transform the cells if needed (e.g. save the images or
+    audio to the assets, and return their URL), as get_cell_value does.
+
+    The table is converted column by column, and the type of every column is checked once: the cells of the columns of
+    simple types (see PASSTHROUGH_FEATURE_TYPES) are taken as is from the conversion, and only the cells of the other
+    columns (Image, Audio, nested features) go through get_cell_value.
+
+    Args:
+        dataset (``str``): the dataset name.
+        config (``str``): the config name.
+        split (``str``): the split name.
+        pa_table (``pa.Table``): the rows. The columns that are not in the table are set to None.
+        features (``Features``): the features of the dataset. They define the columns, and their order, in the rows.
+        assets_base_url (``str``): the base URL of the assets.
+        assets_directory (``StrPath``): the directory of the assets.
+        offset (``int``): the index of the first row of the table in the split.
+        overwrite (``bool``): whether to overwrite the existing assets.
+    Returns:
+        the rows, as a list of dicts.
+    """
+    num_rows = pa_table.num_rows
+    columns: Dict[str, List[Any]] = {}
+    for featureName, fieldType in features.items():
+        if featureName not in pa_table.column_names:
+            columns[featureName] = [None] * num_rows
+            continue
+        cells = pa_table.column(featureName).to_pylist()
+        if isinstance(fieldType, PASSTHROUGH_FEATURE_TYPES):
+            columns[featureName] = cells
+        else:
+            columns[featureName] = _transform_cells(
+                dataset=dataset,
+                config=config,
+                split=split,
+                cells=cells,
+                featureName=featureName,
+                fieldType=fieldType,
+                assets_base_url=assets_base_url,
+                assets_directory=assets_directory,
+                offset=offset,
+                overwrite=overwrite,
+            )
+    if not columns:
+        return [{} for _ in range(num_rows)]
+    featureNames = list(columns)
+    return [dict(zip(featureNames, row)) for row in zip(*columns.values())]
+
+
+def transform_table(
+    dataset: str,
+    config: str,
+    split: str,
+    pa_table: pa.Table,
+    features: Features,
+    assets_base_url: str,
+    assets_directory: StrPath,
+    offset: int = 0,
+    overwrite: bool = True,
+) -> pa.Table:
+    """
+    Same as transform_rows, but keep the rows as a pyarrow table.
+
+    The columns of simple types (see PASSTHROUGH_FEATURE_TYPES) are kept as is, without conversion. The other columns
+    are replaced by the transformed cells (e.g. the URL of the images), and the columns that are not in the table are
+    set to null.
+
+    Returns:
+        the rows, as a pyarrow table with one column per feature.
+    """
+    num_rows = pa_table.num_rows
+    arrays: List[Union[pa.Array, pa.ChunkedArray]] = []
+    for featureName, fieldType in features.items():
+        if featureName not in pa_table.column_names:
+            arrays.append(pa.nulls(num_rows))
+        elif isinstance(fieldType, PASSTHROUGH_FEATURE_TYPES):
+            arrays.append(pa_table.column(featureName))
+        else:
+            arrays.append(
+                pa.array(
+                    _transform_cells(
+                        dataset=dataset,
+                        config=config,
+                        split=split,
+                        cells=pa_table.column(featureName).to_pylist(),
+                        featureName=featureName,
+                        fieldType=fieldType,
+                        assets_base_url=assets_base_url,
+                        assets_directory=assets_directory,
+                        offset=offset,
+                        overwrite=overwrite,
+                    )
+                )
+            )
+    return pa.table(arrays, names=list(features))
+
+
+def _transform_cells(
+    dataset: str,
+    config: str,
+    split: str,
+    cells: List[Any],
+    featureName: str,
+    fieldType: Any,
+    assets_base_url: str,
+    assets_directory: StrPath,
+    offset: int,
+    overwrite: bool,
+) -> List[Any]:
+    return [
+        get_cell_value(
+            dataset=dataset,
+            config=config,
+            split=split,
+            row_idx=offset + row_idx,
+            cell=cell,
+            featureName=featureName,
+            fieldType=fieldType,
+            assets_base_url=assets_base_url,
+            assets_directory=assets_directory,
+            overwrite=overwrite,
+        )
+        for row_idx, cell in enumerate(cells)
+    ]
@@ -1,7 +1,10 @@
+import os
 from os import makedirs
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
+import numpy as np
+import numpy.typing as npt
 import pyarrow.parquet as pq
 
 from libcommon.storage import StrPath
@@ -10,6 +13,8 @@ DATASET_SEPARATOR = "--"
 
 PARQUET_METADATA_DIR_MODE = 0o755
 
+ROW_GROUPS_INDEX_SUFFIX = ".row_groups_index.npy"
+
 
 def create_parquet_metadata_dir(dataset: str, config: str, parquet_metadata_directory: StrPath) -> Tuple[Path, str]:
     dir_path = Path(parquet_metadata_directory).resolve() / dataset / DATASET_SEPARATOR / config
@@ -36,3 +41,93 @@ def create_parquet_metadata_file(
         parquet_file_metadata.write_metadata_file(parquet_metadata_file_path)
     parquet_metadata_subpath = f"{parquet_metadata_dir_subpath}/{filename}"
     return parquet_metadata_subpath
+
+
+def get_row_groups_index_dtype(num_columns: int) -> np.dtype:  # type: ignore
+    return np.dtype(
+        [
+            ("first_row", "<i8"),
+            ("num_rows", "<i8"),
+            ("file_id", "<i4"),
+            ("row_group_id", "<i4"),
+            ("column_chunk_offsets", "<i8", (num_columns,)),
+            ("column_chunk_sizes", "<i8", (num_columns,)),
+        ]
+    )
+
+
+def create_row_groups_index(parquet_files_metadata: List[pq.FileMetaData]) -> npt.NDArray[np.void]:
+    """
+    Create the index of the row groups of a split, with one record per row group of the split.
+
+    Every record contains the first row of the row group (in the split), its number of rows, the index of the parquet
+    file (in the list of parquet files of the split, sorted by filename), the index of the row group in the parquet
+    file, and the byte offset and compressed size of the column chunks, for all the columns of the parquet schema.
+
+    Args:
+        parquet_files_metadata (`List[pq.FileMetaData]`): The metadata of the parquet files of the split, sorted by
+          filename.
+
+    Raises:
+        `ValueError`: if the parquet files don't have the same number of columns.
+
+    Returns:
+        `npt.NDArray[np.void]`: The structured array of the row groups.
+    """
+    num_columns_set = {metadata.num_columns for metadata in parquet_files_metadata}
+    if len(num_columns_set) != 1:
+        raise ValueError(f"The parquet files should have the same number of columns, got {num_columns_set}.")
+    num_columns = num_columns_set.pop()
+    records = []
+    first_row = 0
+    for file_id, metadata in enumerate(parquet_files_metadata):
+        for row_group_id in range(metadata.num_row_groups):
+            row_group_metadata = metadata.row_group(row_group_id)
+            column_chunks_metadata = [row_group_metadata.column(i) for i in range(num_columns)]
+            records.append(
+                (
+                    first_row,
+                    row_group_metadata.num_rows,
+                    file_id,
+                    row_group_id,
+                    [
+                        column_chunk_metadata.dictionary_page_offset
+                        if column_chunk_metadata.has_dictionary_page
+                        else column_chunk_metadata.data_page_offset
+                        for column_chunk_metadata in column_chunks_metadata
+                    ],
+                    [column_chunk_metadata.total_compressed_size for column_chunk_metadata in column_chunks_metadata],
+                )
+            )
+            first_row += row_group_metadata.num_rows
+    return np.array(records, dtype=get_row_groups_index_dtype(num_columns))
+
+
+def create_row_groups_index_file(
+    dataset: str,
+    config: str,
+    split: str,
+    parquet_files_metadata: List[pq.FileMetaData],
+    parquet_metadata_directory: StrPath,
+    overwrite: bool = True,
+) -> str:
+    dir_path, parquet_metadata_dir_subpath = create_parquet_metadata_dir(
+        dataset=dataset,
+        config=config,
+        parquet_metadata_directory=parquet_metadata_directory,
+    )
+    filename = f"{split}{ROW_GROUPS_INDEX_SUFFIX}"
+    row_groups_index_file_path = dir_path / filename
+    if overwrite or not row_groups_index_file_path.exists():
+        # the file is memory-mapped by the API: replace it atomically instead of truncating it
+        tmp_file_path = dir_path / f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_file_path, "wb") as f:
+            np.save(f, create_row_groups_index(parquet_files_metadata), allow_pickle=False)
+        os.replace(tmp_file_path, row_groups_index_file_path)
+    return f"{parquet_metadata_dir_subpath}/{filename}"
+
+
+def load_row_groups_index(row_groups_index_file_path: StrPath) -> npt.NDArray[np.void]:
+    """Memory-map the index of the row groups of a split (see `create_row_groups_index`)."""
+    row_groups_index: npt.NDArray[np.void] = np.load(row_groups_index_file_path, mmap_mode="r", allow_pickle=False)
+    return row_groups_index
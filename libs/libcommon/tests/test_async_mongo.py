@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, Set, Tuple
+
+from libcommon.async_mongo import AsyncMongo
+from libcommon.resources import CacheMongoResource
+from libcommon.simple_cache import BestResponse, upsert_response
+
+
+def test_run() -> None:
+    async_mongo = AsyncMongo(max_workers=2)
+
+    async def main() -> Tuple[str, str]:
+        return await async_mongo.run(lambda: threading.current_thread().name), threading.current_thread().name
+
+    query_thread, loop_thread = asyncio.run(main())
+    async_mongo.shutdown()
+    assert query_thread.startswith("mongo")
+    assert query_thread != loop_thread
+
+
+def test_queries(cache_mongo_resource: CacheMongoResource) -> None:
+    kind = "test_kind"
+    dataset = "test_dataset"
+    content: Dict[str, Any] = {"some": "content"}
+    upsert_response(kind=kind, dataset=dataset, content=content, http_status=HTTPStatus.OK)
+    async_mongo = AsyncMongo()
+
+    async def main() -> Tuple[BestResponse, Set[str], bool, bool]:
+        return await asyncio.gather(
+            async_mongo.get_best_response(kinds=[kind], dataset=dataset),
+            async_mongo.get_valid_datasets(kind=kind),
+            async_mongo.has_some_cache(dataset=dataset),
+            async_mongo.has_some_cache(dataset="other_dataset"),
+        )
+
+    best_response, valid_datasets, has_some_cache, other_has_some_cache = asyncio.run(main())
+    async_mongo.shutdown()
+    assert best_response.kind == kind
+    assert best_response.response["content"] == content
+    assert valid_datasets == {dataset}
+    assert has_some_cache
+    assert not other_has_some_cache
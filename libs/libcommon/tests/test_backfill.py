@@ -7,7 +7,7 @@ from typing import List, Optional, Set, Tuple
 import pytest
 
 from libcommon.processing_graph import ProcessingGraph
-from libcommon.queue import Queue
+from libcommon.queue import Job, Queue
 from libcommon.resources import CacheMongoResource, QueueMongoResource
 from libcommon.utils import Priority, Status
 
@@ -772,7 +772,7 @@ def test_delete_jobs(
             job.created_at = created_at
             job.save()
         if status is Status.STARTED:
-            queue._start_job(job)
+            queue._start_first_waiting_job(Job.objects(pk=job.pk, status=Status.WAITING))
 
     dataset_backfill_plan = get_dataset_backfill_plan(processing_graph=processing_graph)
     expected_in_process = [ARTIFACT_DA] if existing_jobs else []
@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+from bson import ObjectId
+
+from libcommon.job_notifications import (
+    JobNotification,
+    LocalJobNotifier,
+    MongoJobNotifier,
+    is_job_type_subscribed,
+)
+from libcommon.resources import QueueMongoResource
+from libcommon.utils import get_datetime
+
+
+@pytest.mark.parametrize(
+    "job_types_blocked,job_types_only,expected",
+    [
+        (None, None, True),
+        (["a"], None, False),
+        (["b"], None, True),
+        (None, ["a"], True),
+        (None, ["b"], False),
+        (["a"], ["a"], False),
+    ],
+)
+def test_is_job_type_subscribed(
+    job_types_blocked: Optional[List[str]], job_types_only: Optional[List[str]], expected: bool
+) -> None:
+    assert (
+        is_job_type_subscribed(job_type="a", job_types_blocked=job_types_blocked, job_types_only=job_types_only)
+        is expected
+    )
+
+
+def test_local_job_notifier() -> None:
+    notifier = LocalJobNotifier()
+    subscription = notifier.subscribe(job_types_only=["a"])
+    other_subscription = notifier.subscribe(job_types_blocked=["a"])
+    # nothing has been published
+    assert not subscription.wait(timeout=0.01)
+    # the notifications published before waiting are not lost, and are consumed by the wait
+    notifier.publish(["a"])
+    assert subscription.wait(timeout=0)
+    assert not subscription.wait(timeout=0.01)
+    assert not other_subscription.wait(timeout=0.01)
+    # the notifications of other types are ignored
+    notifier.publish(["b"])
+    assert not subscription.wait(timeout=0.01)
+    assert other_subscription.wait(timeout=0)
+    # a closed subscription is not notified anymore
+    subscription.close()
+    notifier.publish(["a"])
+    assert not subscription.wait(timeout=0.01)
+
+
+def test_local_job_notifier_wakes_up_the_subscriber() -> None:
+    notifier = LocalJobNotifier()
+    subscription = notifier.subscribe()
+    timer = threading.Timer(0.1, notifier.publish, args=(["a"],))
+    timer.start()
+    started_at = time.monotonic()
+    assert subscription.wait(timeout=10)
+    assert time.monotonic() - started_at < 5
+    timer.join()
+
+
+def test_mongo_job_notifier(queue_mongo_resource: QueueMongoResource) -> None:
+    notifier = MongoJobNotifier()
+    # published before the subscription: ignored
+    notifier.publish(["a"])
+    subscription = notifier.subscribe(job_types_only=["a"])
+    try:
+        assert not subscription.wait(timeout=0.5)
+        notifier.publish(["b"])
+        notifier.publish(["b", "a"])
+        assert subscription.wait(timeout=5)
+        assert not subscription.wait(timeout=0.5)
+    finally:
+        subscription.close()
+
+
+def test_mongo_job_notifier_resumes_after_the_last_seen_notification(queue_mongo_resource: QueueMongoResource) -> None:
+    # two publisher processes: within a second, their ObjectIds are ordered by their random bytes, not by insertion
+    timestamp = f"{int(time.time()):08x}"
+
+    def publish(job_types: List[str], process_bytes: str) -> None:
+        JobNotification(id=ObjectId(timestamp + process_bytes * 8), types=job_types, created_at=get_datetime()).save(
+            force_insert=True
+        )
+
+    subscription = MongoJobNotifier().subscribe(job_types_only=["a"])
+    try:
+        publish(["a"], "ff")
+        assert subscription.wait(timeout=5)
+        # the cursor is re-created, e.g. after a network error: the seen notification is not returned again
+        subscription.close()
+        assert not subscription.wait(timeout=0.5)
+        # a notification inserted later, with a smaller id, is not skipped
+        subscription.close()
+        publish(["a"], "00")
+        assert subscription.wait(timeout=5)
+        assert not subscription.wait(timeout=0.5)
+    finally:
+        subscription.close()
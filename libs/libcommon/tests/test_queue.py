@@ -1,7 +1,9 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from http import HTTPStatus
 from typing import List, Optional
 from unittest.mock import patch
 
@@ -9,9 +11,18 @@ import pytest
 import pytz
 
 from libcommon.constants import QUEUE_TTL_SECONDS
-from libcommon.queue import EmptyQueueError, Job, Queue
-from libcommon.resources import QueueMongoResource
-from libcommon.utils import Priority, Status, get_datetime
+from libcommon.job_notifications import LocalJobNotifier
+from libcommon.queue import (
+    EmptyQueueError,
+    Job,
+    JobDurationStats,
+    Queue,
+    StartedJobsCount,
+    get_cost_adjusted_created_at,
+)
+from libcommon.resources import CacheMongoResource, QueueMongoResource
+from libcommon.simple_cache import upsert_response
+from libcommon.utils import Priority, SchedulingPolicy, Status, get_datetime
 
 
 def get_old_datetime() -> datetime:
@@ -344,6 +355,72 @@ def test_get_dataset_pending_jobs_for_type() -> None:
         assert r["status"] in [Status.WAITING.value, Status.STARTED.value]
 
 
+def test_start_job_is_atomic() -> None:
+    job_type = "test_type"
+    num_jobs = 20
+    queue = Queue()
+    for i in range(num_jobs):
+        queue.upsert_job(job_type=job_type, dataset=f"dataset{i}", revision="revision")
+
+    def start_job() -> Optional[str]:
+        try:
+            return Queue().start_job()["job_id"]
+        except EmptyQueueError:
+            return None
+
+    # more concurrent calls than waiting jobs: every job is started exactly once
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        job_ids = [job_id for job_id in executor.map(lambda _: start_job(), range(2 * num_jobs)) if job_id is not None]
+    assert len(job_ids) == num_jobs
+    assert len(set(job_ids)) == num_jobs
+    assert queue.count_jobs(status=Status.STARTED, job_type=job_type) == num_jobs
+
+
+def test_started_jobs_count_by_namespace() -> None:
+    test_type = "test_type"
+    test_other_type = "test_other_type"
+    test_revision = "test_revision"
+    queue = Queue()
+    for job_type, dataset in [
+        (test_type, "namespace1/dataset1"),
+        (test_type, "namespace1/dataset2"),
+        (test_other_type, "namespace1/dataset1"),
+        (test_type, "namespace2/dataset1"),
+    ]:
+        queue.upsert_job(job_type=job_type, dataset=dataset, revision=test_revision)
+    job_ids = [queue.start_job()["job_id"] for _ in range(4)]
+    assert queue.get_started_jobs_count_by_namespace() == {"namespace1": 3, "namespace2": 1}
+    assert queue.get_started_jobs_count_by_namespace(job_types_only=[test_other_type]) == {"namespace1": 1}
+    assert queue.get_started_jobs_count_by_namespace(job_types_blocked=[test_other_type]) == {
+        "namespace1": 2,
+        "namespace2": 1,
+    }
+
+    # the counts are decremented when the jobs are finished or cancelled, only once
+    assert queue.finish_job(job_id=job_ids[0], is_success=True)
+    assert not queue.finish_job(job_id=job_ids[0], is_success=True)
+    queue.cancel_jobs_by_job_id(job_ids=job_ids[1:3])
+    queue.cancel_started_jobs(job_type=test_type)
+    queue.cancel_started_jobs(job_type=test_other_type)
+    assert queue.get_started_jobs_count_by_namespace() == {}
+
+    # the counts can be recomputed from the jobs
+    queue.start_job()
+    StartedJobsCount.objects().delete()
+    assert queue.get_started_jobs_count_by_namespace() == {}
+    queue.reset_started_jobs_counts()
+    assert sum(queue.get_started_jobs_count_by_namespace().values()) == 1
+
+    # the drifted counts are reconciled with the jobs, and the negative counts are ignored
+    StartedJobsCount.objects().delete()
+    StartedJobsCount(namespace="namespace3", type=test_type, count=-1).save()
+    StartedJobsCount(namespace="namespace4", type=test_type, count=2).save()
+    assert queue.get_started_jobs_count_by_namespace() == {"namespace4": 2}
+    assert queue.reconcile_started_jobs_counts() == 3
+    assert sum(queue.get_started_jobs_count_by_namespace().values()) == 1
+    assert queue.reconcile_started_jobs_counts() == 0
+
+
 def test_queue_heartbeat() -> None:
     job_type = "test_type"
     queue = Queue()
@@ -383,3 +460,126 @@ def test_has_ttl_index_on_finished_at_field() -> None:
     ttl_index_name = ttl_index_names[0]
     assert ttl_index_name == "finished_at_1"
     assert Job._get_collection().index_information()[ttl_index_name]["expireAfterSeconds"] == QUEUE_TTL_SECONDS
+
+
+def test_job_creation_is_published() -> None:
+    job_notifier = LocalJobNotifier()
+    subscription = job_notifier.subscribe(job_types_only=["test_type"])
+    queue = Queue(job_notifier=job_notifier)
+    queue.upsert_job(job_type="other_type", dataset="dataset", revision="revision")
+    assert not subscription.wait(timeout=0)
+    queue.upsert_job(job_type="test_type", dataset="dataset", revision="revision")
+    assert subscription.wait(timeout=0)
+    queue.create_jobs(
+        [
+            {
+                "job_id": "not used",
+                "type": "test_type",
+                "params": {"dataset": "dataset", "revision": "revision", "config": "config", "split": None},
+                "priority": Priority.NORMAL,
+            }
+        ]
+    )
+    assert subscription.wait(timeout=0)
+
+
+def test_get_cost_adjusted_created_at() -> None:
+    created_at = get_datetime()
+    assert get_cost_adjusted_created_at(created_at=created_at, estimated_cost=None) == created_at
+    assert get_cost_adjusted_created_at(created_at=created_at, estimated_cost=1) > created_at
+    # the delay is capped: the long jobs are eventually started
+    assert get_cost_adjusted_created_at(created_at=created_at, estimated_cost=1e9) - created_at <= timedelta(days=1)
+
+
+def test_job_duration_stats() -> None:
+    test_type = "test_type"
+    queue = Queue()
+    queue.upsert_job(job_type=test_type, dataset="dataset", revision="revision")
+    job = Job.objects(type=test_type).get()
+    # not connected to the cache database: the size is unknown
+    assert job.num_bytes is None
+    assert job.estimated_cost is None
+    assert job.cost_adjusted_created_at == job.created_at
+    job_info = queue.start_job()
+    queue.finish_job(job_id=job_info["job_id"], is_success=True)
+    stats = JobDurationStats.objects(type=test_type).get()
+    assert stats.count == 1
+    assert stats.mean_duration_seconds is not None and stats.mean_duration_seconds >= 0
+    assert stats.mean_seconds_per_byte is None
+    # the next jobs of the same type have an estimated cost
+    queue.upsert_job(job_type=test_type, dataset="dataset", revision="revision")
+    assert Job.objects(type=test_type, status=Status.WAITING).get().estimated_cost == stats.mean_duration_seconds
+
+
+def test_job_duration_stats_concurrent_updates() -> None:
+    test_type = "test_type"
+    queue = Queue()
+    job = queue.upsert_job(job_type=test_type, dataset="dataset", revision="revision")
+    job.num_bytes = 1_000
+    # the updates are atomic: no sample is lost, and the first concurrent upserts don't fail
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda _: queue._update_job_duration_stats(job=job, duration_seconds=2), range(20)))
+    stats = JobDurationStats.objects(type=test_type).get()
+    assert stats.count == 20
+    assert stats.count_with_num_bytes == 20
+    assert stats.mean_duration_seconds == pytest.approx(2)
+    assert stats.mean_seconds_per_byte == pytest.approx(0.002)
+
+
+def test_cancel_started_jobs() -> None:
+    test_type = "test_type"
+    queue = Queue()
+    for dataset in ["dataset1", "dataset2"]:
+        queue.upsert_job(job_type=test_type, dataset=dataset, revision="revision")
+    queue.start_job()
+    queue.start_job()
+    # a waiting job with the same parameters as a started one
+    queue.upsert_job(job_type=test_type, dataset="dataset1", revision="revision")
+    queue.cancel_started_jobs(job_type=test_type)
+    assert Job.objects(type=test_type, status=Status.STARTED).count() == 0
+    assert sorted(job.dataset for job in Job.objects(type=test_type, status=Status.WAITING)) == [
+        "dataset1",
+        "dataset2",
+    ]
+
+
+def test_requeue_started_job() -> None:
+    test_type = "test_type"
+    queue = Queue()
+    queue.upsert_job(job_type=test_type, dataset="dataset", revision="revision", priority=Priority.LOW)
+    job_info = queue.start_job()
+    assert queue.requeue_started_job(job_id=job_info["job_id"])
+    assert Job.objects(pk=job_info["job_id"]).get().status == Status.CANCELLED
+    assert Job.objects(type=test_type, status=Status.WAITING).get().priority == Priority.LOW
+    assert queue.get_started_jobs_count_by_namespace() == {}
+    # a job that is not started anymore is left untouched
+    assert not queue.requeue_started_job(job_id=job_info["job_id"])
+    assert Job.objects(type=test_type, status=Status.WAITING).count() == 1
+
+
+def test_shortest_expected_first(cache_mongo_resource: CacheMongoResource) -> None:
+    test_type = "test_type"
+    JobDurationStats(
+        type=test_type,
+        count=10,
+        total_duration_seconds=600,
+        count_with_num_bytes=10,
+        total_duration_seconds_with_num_bytes=600,
+        total_num_bytes=600_000_000,
+    ).save()
+    for dataset, num_bytes in [("big", 300_000_000_000), ("small", 1_000)]:
+        upsert_response(
+            kind="dataset-size",
+            dataset=dataset,
+            content={"size": {"dataset": {"num_bytes_original_files": num_bytes}}},
+            http_status=HTTPStatus.OK,
+        )
+    queue = Queue(scheduling_policy=SchedulingPolicy.SHORTEST_EXPECTED_FIRST)
+    for dataset in ["big", "unknown", "small"]:
+        queue.upsert_job(job_type=test_type, dataset=dataset, revision="revision")
+    assert Job.objects(dataset="big").get().num_bytes == 300_000_000_000
+    assert Job.objects(dataset="big").get().estimated_cost == pytest.approx(300_000)
+    assert Job.objects(dataset="unknown").get().estimated_cost == 60
+    # the default policy is FIFO
+    assert Queue().get_next_waiting_job().dataset == "big"
+    assert [queue.start_job()["params"]["dataset"] for _ in range(3)] == ["small", "unknown", "big"]
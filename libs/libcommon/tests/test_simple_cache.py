@@ -1,7 +1,7 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from http import HTTPStatus
 from time import process_time
 from typing import Any, Dict, List, Mapping, Optional, TypedDict
@@ -11,6 +11,7 @@ from pymongo.errors import DocumentTooLarge
 
 from libcommon.resources import CacheMongoResource
 from libcommon.simple_cache import (
+    BestResponseCache,
     CachedArtifactError,
     CachedResponse,
     CacheReportsPage,
@@ -22,6 +23,7 @@ from libcommon.simple_cache import (
     delete_response,
     fetch_names,
     get_best_response,
+    get_best_response_metadata,
     get_cache_reports,
     get_cache_reports_with_content,
     get_dataset_responses_without_content_for_kind,
@@ -34,6 +36,7 @@ from libcommon.simple_cache import (
     get_validity_by_kind,
     upsert_response,
 )
+from libcommon.utils import get_datetime
 
 from .utils import CONFIG_NAME_1, CONTENT_ERROR, DATASET_NAME
 
@@ -740,6 +743,48 @@ def test_get_best_response(
     )
     assert best_response.response["http_status"] == entries[best_entry]["http_status"].value
     assert best_response.response["progress"] == entries[best_entry]["progress"]
+    # the metadata select the same response, without loading the content
+    best_response_metadata = get_best_response_metadata(kinds, dataset, config)
+    assert best_response_metadata.kind == best_response.kind
+    assert "content" not in best_response_metadata.response
+    assert best_response_metadata.response["http_status"] == best_response.response["http_status"]
+    assert best_response_metadata.updated_at == best_response.updated_at
+    assert (best_response_metadata.updated_at is None) is (best_entry == "cache_miss")
+
+
+def test_best_response_cache() -> None:
+    kind = "kind"
+    dataset_a = "dataset_a"
+    dataset_b = "dataset_b"
+    dataset_c = "dataset_c"
+    one_minute_ago = get_datetime() - timedelta(minutes=1)
+    # the cache is only invalidated by the explicit polls
+    best_response_cache = BestResponseCache(max_entries=2, poll_interval_seconds=3600, ttl_seconds=3600)
+    for dataset in [dataset_a, dataset_b]:
+        upsert_response(
+            kind=kind, dataset=dataset, content={"a": 1}, http_status=HTTPStatus.OK, updated_at=one_minute_ago
+        )
+        assert best_response_cache.get_best_response(kinds=[kind], dataset=dataset).response["content"] == {"a": 1}
+    assert len(best_response_cache) == 2
+
+    upsert_response(kind=kind, dataset=dataset_a, content={"a": 2}, http_status=HTTPStatus.OK)
+    # not polled yet: the stale entry is returned
+    assert best_response_cache.get_best_response(kinds=[kind], dataset=dataset_a).response["content"] == {"a": 1}
+    # the poll only drops the entries of the updated datasets
+    best_response_cache.poll()
+    assert len(best_response_cache) == 1
+    assert best_response_cache.get_best_response(kinds=[kind], dataset=dataset_a).response["content"] == {"a": 2}
+
+    # the cache misses are cached too, and the least recently used entry (dataset_b) is evicted
+    assert best_response_cache.get_best_response(kinds=[kind], dataset=dataset_c).response["http_status"] == 404
+    assert len(best_response_cache) == 2
+    # the metadata of the cached entries don't carry the content
+    best_response_metadata = best_response_cache.get_best_response_metadata(kinds=[kind], dataset=dataset_c)
+    assert best_response_metadata.response["http_status"] == 404
+    assert "content" not in best_response_metadata.response
+    upsert_response(kind=kind, dataset=dataset_c, content={}, http_status=HTTPStatus.OK)
+    best_response_cache.poll()
+    assert best_response_cache.get_best_response(kinds=[kind], dataset=dataset_c).response["http_status"] == 200
 
 
 def test_cached_artifact_error() -> None:
@@ -7,10 +7,14 @@ from zoneinfo import ZoneInfo
 
 import numpy as np
 import pytest
-from datasets import Audio, Dataset, Image, Value
+from datasets import Audio, Dataset, Features, Image, Value
 
 from libcommon.storage import StrPath
-from libcommon.viewer_utils.features import get_cell_value
+from libcommon.viewer_utils.features import (
+    get_cell_value,
+    transform_rows,
+    transform_table,
+)
 
 # we need to know the correspondence between the feature type and the cell value, in order to:
 # - document the API
@@ -317,3 +321,54 @@ def test_others(
         assets_directory=cached_assets_directory,
     )
     assert value == output_value
+
+
+@pytest.mark.parametrize(
+    "dataset_type",
+    ["null", "int64", "string", "class_label", "dict", "list", "sequence", "array2d", "translation"],
+)
+def test_transform_rows(dataset_type: str, datasets: Mapping[str, Dataset], cached_assets_directory: StrPath) -> None:
+    dataset = datasets[dataset_type]
+    features = Features({**dataset.features, "missing": Value("string")})
+    rows = transform_rows(
+        dataset="dataset",
+        config="config",
+        split="split",
+        pa_table=dataset.data.table,
+        features=features,
+        assets_base_url="http://localhost/assets",
+        assets_directory=cached_assets_directory,
+        offset=7,
+    )
+    assert rows == [
+        {
+            "col": get_cell_value(
+                dataset="dataset",
+                config="config",
+                split="split",
+                row_idx=7,
+                cell=dataset.data.table.to_pylist()[0]["col"],
+                featureName="col",
+                fieldType=dataset.features["col"],
+                assets_base_url="http://localhost/assets",
+                assets_directory=cached_assets_directory,
+            ),
+            "missing": None,
+        }
+    ]
+
+
+def test_transform_table(datasets: Mapping[str, Dataset], cached_assets_directory: StrPath) -> None:
+    dataset = datasets["dict"]
+    features = Features({**dataset.features, "missing": Value("string")})
+    pa_table = transform_table(
+        dataset="dataset",
+        config="config",
+        split="split",
+        pa_table=dataset.data.table,
+        features=features,
+        assets_base_url="http://localhost/assets",
+        assets_directory=cached_assets_directory,
+    )
+    assert pa_table.column_names == ["col", "missing"]
+    assert pa_table.to_pylist() == [{"col": {"a": 0}, "missing": None}]
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from libcommon.viewer_utils.parquet_metadata import (
+    create_row_groups_index,
+    create_row_groups_index_file,
+    load_row_groups_index,
+)
+
+
+def test_create_row_groups_index_file(tmp_path: Path) -> None:
+    pa_table = pa.table({"text": [str(i) for i in range(30)], "label": list(range(30))})
+    parquet_files_metadata = []
+    for filename, row_group_size in [("0.parquet", 10), ("1.parquet", 7)]:
+        pq.write_table(pa_table, tmp_path / filename, row_group_size=row_group_size)
+        parquet_files_metadata.append(pq.read_metadata(tmp_path / filename))
+    row_groups_index_subpath = create_row_groups_index_file(
+        dataset="dataset",
+        config="config",
+        split="train",
+        parquet_files_metadata=parquet_files_metadata,
+        parquet_metadata_directory=tmp_path,
+    )
+    assert row_groups_index_subpath == "dataset/--/config/train.row_groups_index.npy"
+    row_groups_index = load_row_groups_index(tmp_path / row_groups_index_subpath)
+    assert row_groups_index["first_row"].tolist() == [0, 10, 20, 30, 37, 44, 51, 58]
+    assert row_groups_index["num_rows"].tolist() == [10, 10, 10, 7, 7, 7, 7, 2]
+    assert row_groups_index["file_id"].tolist() == [0, 0, 0, 1, 1, 1, 1, 1]
+    assert row_groups_index["row_group_id"].tolist() == [0, 1, 2, 0, 1, 2, 3, 4]
+    assert row_groups_index["column_chunk_offsets"].shape == (8, 2)
+    column_chunk_metadata = parquet_files_metadata[1].row_group(2).column(1)
+    assert row_groups_index["column_chunk_sizes"][5, 1] == column_chunk_metadata.total_compressed_size
+
+
+def test_create_row_groups_index_different_columns() -> None:
+    with pytest.raises(ValueError):
+        create_row_groups_index(
+            [
+                pq.ParquetFile(pa.BufferReader(buffer)).metadata
+                for buffer in [
+                    _write(pa.table({"a": [0]})),
+                    _write(pa.table({"a": [0], "b": [0]})),
+                ]
+            ]
+        )
+
+
+def _write(pa_table: pa.Table) -> pa.Buffer:
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa_table, sink)
+    return sink.getvalue()
@@ -2,10 +2,17 @@
 # Copyright 2022 The HuggingFace Authors.
 
 import uvicorn
+from libcommon.async_mongo import AsyncMongo
 from libcommon.log import init_logging
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.resources import CacheMongoResource, QueueMongoResource, Resource
-from libcommon.storage import exists, init_cached_assets_dir, init_parquet_metadata_dir
+from libcommon.simple_cache import BestResponseCache
+from libcommon.storage import (
+    exists,
+    init_cached_assets_dir,
+    init_parquet_metadata_dir,
+    init_row_groups_cache_dir,
+)
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
@@ -13,14 +20,18 @@ from starlette.middleware.gzip import GZipMiddleware
 from starlette.routing import Route
 from starlette_prometheus import PrometheusMiddleware
 
+from api.authentication import AuthCheckCache, close_session
 from api.config import AppConfig, EndpointConfig, UvicornConfig
-from api.jwt_token import fetch_jwt_public_key
+from api.encoded_response_cache import EncodedResponseCache
+from api.jwt_token import VerifiedJwtCache, fetch_jwt_public_key
+from api.missing_dataset_cache import MissingDatasetCache
 from api.routes.endpoint import EndpointsDefinition, create_endpoint
 from api.routes.healthcheck import healthcheck_endpoint
 from api.routes.metrics import create_metrics_endpoint
 from api.routes.rows import create_rows_endpoint
 from api.routes.valid import create_valid_endpoint
 from api.routes.webhook import create_webhook_endpoint
+from api.row_groups_cache import RowGroupsCache
 
 
 def create_app() -> Starlette:
@@ -36,6 +47,15 @@ def create_app_with_config(app_config: AppConfig, endpoint_config: EndpointConfi
     parquet_metadata_directory = init_parquet_metadata_dir(directory=app_config.parquet_metadata.storage_directory)
     if not exists(cached_assets_directory):
         raise RuntimeError("The assets storage directory could not be accessed. Exiting.")
+    row_groups_cache = (
+        RowGroupsCache(
+            directory=init_row_groups_cache_dir(directory=app_config.row_groups_cache.storage_directory),
+            max_bytes=app_config.row_groups_cache.max_bytes,
+            clean_cache_proba=app_config.row_groups_cache.clean_cache_proba,
+        )
+        if app_config.row_groups_cache.max_bytes > 0
+        else None
+    )
 
     processing_graph = ProcessingGraph(app_config.processing_graph.specification)
     endpoints_definition = EndpointsDefinition(processing_graph, endpoint_config)
@@ -49,6 +69,28 @@ def create_app_with_config(app_config: AppConfig, endpoint_config: EndpointConfi
         else None
     )
 
+    # the answers of the external authentication service, and the verified JWTs, are shared by all the endpoints
+    auth_check_cache = AuthCheckCache(
+        ttl_seconds=app_config.api.auth_check_cache_ttl_seconds,
+        negative_ttl_seconds=app_config.api.auth_check_cache_negative_ttl_seconds,
+    )
+    verified_jwt_cache = VerifiedJwtCache()
+    # the best responses are read from MongoDB only when they are updated, in every uvicorn worker
+    best_response_cache = BestResponseCache(
+        max_entries=app_config.best_response_cache.max_entries,
+        poll_interval_seconds=app_config.best_response_cache.poll_interval_seconds,
+        ttl_seconds=app_config.best_response_cache.ttl_seconds,
+    )
+    # the JSON (and gzip) bytes of the best responses are memoized while they are cached
+    encoded_response_cache = EncodedResponseCache(max_bytes=app_config.api.encoded_response_cache_max_bytes)
+    # the datasets that don't exist on the Hub, or whose revision has just been set, are not requested to the Hub again
+    missing_dataset_cache = MissingDatasetCache(
+        not_found_ttl_seconds=app_config.api.missing_dataset_cache_not_found_ttl_seconds,
+        set_revision_debounce_seconds=app_config.api.set_revision_debounce_seconds,
+    )
+    # the MongoDB queries awaited by the endpoints run in a dedicated pool of threads
+    async_mongo = AsyncMongo(max_workers=app_config.api.mongo_max_workers, best_response_cache=best_response_cache)
+
     middleware = [
         Middleware(
             CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], allow_credentials=True
@@ -73,11 +115,16 @@ def create_app_with_config(app_config: AppConfig, endpoint_config: EndpointConfi
                 steps_by_input_type=steps_by_input_type,
                 processing_graph=processing_graph,
                 hf_endpoint=app_config.common.hf_endpoint,
+                async_mongo=async_mongo,
                 hf_token=app_config.common.hf_token,
                 hf_jwt_public_key=hf_jwt_public_key,
                 hf_jwt_algorithm=app_config.api.hf_jwt_algorithm,
                 external_auth_url=app_config.api.external_auth_url,
                 hf_timeout_seconds=app_config.api.hf_timeout_seconds,
+                auth_check_cache=auth_check_cache,
+                verified_jwt_cache=verified_jwt_cache,
+                encoded_response_cache=encoded_response_cache,
+                missing_dataset_cache=missing_dataset_cache,
                 max_age_long=app_config.api.max_age_long,
                 max_age_short=app_config.api.max_age_short,
             ),
@@ -88,6 +135,7 @@ def create_app_with_config(app_config: AppConfig, endpoint_config: EndpointConfi
             "/valid",
             endpoint=create_valid_endpoint(
                 processing_graph=processing_graph,
+                async_mongo=async_mongo,
                 max_age_long=app_config.api.max_age_long,
                 max_age_short=app_config.api.max_age_short,
             ),
@@ -117,13 +165,31 @@ def create_app_with_config(app_config: AppConfig, endpoint_config: EndpointConfi
                 hf_jwt_algorithm=app_config.api.hf_jwt_algorithm,
                 external_auth_url=app_config.api.external_auth_url,
                 hf_timeout_seconds=app_config.api.hf_timeout_seconds,
+                auth_check_cache=auth_check_cache,
+                verified_jwt_cache=verified_jwt_cache,
                 max_age_long=app_config.api.max_age_long,
                 max_age_short=app_config.api.max_age_short,
+                row_groups_cache=row_groups_cache,
+                best_response_cache=best_response_cache,
+                missing_dataset_cache=missing_dataset_cache,
+                rows_index_cache_max_bytes=app_config.rows_index_cache.max_bytes,
+                thread_pool_max_workers=app_config.rows_thread_pool.max_workers,
+                max_index_tasks=app_config.rows_thread_pool.max_index_tasks,
+                max_query_tasks=app_config.rows_thread_pool.max_query_tasks,
+                max_transform_tasks=app_config.rows_thread_pool.max_transform_tasks,
+                read_ahead_max_bytes=app_config.rows_read_ahead.max_bytes,
+                read_ahead_max_tasks=app_config.rows_read_ahead.max_tasks,
             ),
+            methods=["GET", "POST"],
         ),
+        # ^ POST: batch of ranges of rows
     ]
 
-    return Starlette(routes=routes, middleware=middleware, on_shutdown=[resource.release for resource in resources])
+    return Starlette(
+        routes=routes,
+        middleware=middleware,
+        on_shutdown=[close_session, async_mongo.shutdown] + [resource.release for resource in resources],
+    )
 
 
 def start() -> None:
@@ -1,50 +1,163 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import asyncio
+import hashlib
 import logging
-from typing import Literal, Optional
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Literal, Optional, Tuple
+from weakref import WeakKeyDictionary
 
-import requests
+import aiohttp
 from libcommon.prometheus import StepProfiler
-from requests import PreparedRequest
-from requests.auth import AuthBase
 from starlette.requests import Request
 
-from api.jwt_token import is_jwt_valid
+from api.jwt_token import VerifiedJwtCache, is_jwt_valid
 from api.utils import (
     AuthCheckHubRequestError,
     ExternalAuthenticatedError,
     ExternalUnauthenticatedError,
 )
 
+AUTH_CHECK_CACHE_MAX_ENTRIES = 100_000
 
-class RequestAuth(AuthBase):
-    """Attaches input Request authentication headers to the given Request object."""
+# the HTTP sessions are bound to an event loop: one pooled session per loop (i.e. per uvicorn worker)
+_sessions: "WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = WeakKeyDictionary()
 
-    def __init__(self, request: Optional[Request]) -> None:
-        if request is not None:
-            self.cookie = request.headers.get("cookie")
-            self.authorization = request.headers.get("authorization")
-        else:
-            self.cookie = None
-            self.authorization = None
 
-    def __call__(self, r: PreparedRequest) -> PreparedRequest:
-        # modify and return the request
-        if self.cookie:
-            r.headers["cookie"] = self.cookie
-        if self.authorization:
-            r.headers["authorization"] = self.authorization
-        return r
+def get_session() -> aiohttp.ClientSession:
+    """Get the HTTP session of the running event loop, whose connections are reused by all the auth checks."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession()
+        _sessions[loop] = session
+    return session
 
 
-def auth_check(
+async def close_session() -> None:
+    """Close the HTTP session of the running event loop, if any."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def get_auth_headers(request: Optional[Request]) -> Dict[str, str]:
+    """Get the authentication headers of the input request, to forward them to the external authentication service."""
+    headers: Dict[str, str] = {}
+    if request is not None:
+        if cookie := request.headers.get("cookie"):
+            headers["cookie"] = cookie
+        if authorization := request.headers.get("authorization"):
+            headers["authorization"] = authorization
+    return headers
+
+
+AuthCheckCacheKey = Tuple[str, str]
+
+
+def get_auth_check_cache_key(dataset: str, auth_headers: Dict[str, str]) -> AuthCheckCacheKey:
+    # the credentials are hashed, not to keep them in memory
+    digest = hashlib.sha256(
+        "\n".join([auth_headers.get("cookie", ""), auth_headers.get("authorization", "")]).encode("utf-8")
+    ).hexdigest()
+    return (dataset, digest)
+
+
+class AuthCheckCache:
+    """
+    A cache of the answers of the external authentication service, kept for a short time.
+
+    The answers are keyed by the dataset and a hash of the authentication headers of the request. The positive
+    answers (200) are kept for `ttl_seconds`, the negative ones (401, 403 and 404: the dataset does not exist, or is
+    not accessible with the credentials) for `negative_ttl_seconds`. The other answers, and the failures of the
+    service, are not cached.
+
+    The cache is bounded to `max_entries` entries, the least recently set are evicted first. The cache is
+    thread-safe.
+
+    Args:
+        ttl_seconds (`float`): How long the positive answers are kept, in seconds. If 0, they are not cached.
+        negative_ttl_seconds (`float`): How long the negative answers are kept, in seconds. If 0, they are not cached.
+        max_entries (`int`): The maximum number of entries.
+    """
+
+    def __init__(
+        self, ttl_seconds: float, negative_ttl_seconds: float, max_entries: int = AUTH_CHECK_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        # the status code of the answer, and its expiration time
+        self._entries: "OrderedDict[AuthCheckCacheKey, Tuple[int, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: AuthCheckCacheKey) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            status_code, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            return status_code
+
+    def set(self, key: AuthCheckCacheKey, status_code: int) -> None:
+        ttl_seconds = (
+            self.ttl_seconds
+            if status_code == 200
+            else self.negative_ttl_seconds
+            if status_code in [401, 403, 404]
+            else 0
+        )
+        if ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (status_code, time.monotonic() + ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def check_status_code(status_code: int) -> Literal[True]:
+    """Get the decision from the status code of the external authentication service.
+
+    Raises:
+        - [`~utils.ExternalUnauthenticatedError`]: if the status code is 401.
+        - [`~utils.ExternalAuthenticatedError`]: if the status code is 403 or 404.
+        - [`ValueError`]: for any other status code than 200.
+    """
+    if status_code == 200:
+        return True
+    elif status_code == 401:
+        raise ExternalUnauthenticatedError(
+            "The dataset does not exist, or is not accessible without authentication (private or gated). Please"
+            " check the spelling of the dataset name or retry with authentication."
+        )
+    elif status_code in [403, 404]:
+        raise ExternalAuthenticatedError(
+            "The dataset does not exist, or is not accessible with the current credentials (private or gated)."
+            " Please check the spelling of the dataset name or retry with other authentication credentials."
+        )
+    else:
+        raise ValueError(f"Unexpected status code {status_code}")
+
+
+async def auth_check(
     dataset: str,
     external_auth_url: Optional[str] = None,
     request: Optional[Request] = None,
     hf_jwt_public_key: Optional[str] = None,
     hf_jwt_algorithm: Optional[str] = None,
     hf_timeout_seconds: Optional[float] = None,
+    auth_check_cache: Optional[AuthCheckCache] = None,
+    verified_jwt_cache: Optional[VerifiedJwtCache] = None,
 ) -> Literal[True]:
     """check if the dataset is authorized for the request
 
@@ -52,6 +165,9 @@ def auth_check(
     to the Hugging Face API is authenticated with the same authentication headers as the input request. It timeouts
     after 200ms.
 
+    The request is sent with the pooled HTTP session of the event loop, without blocking it. The answer is cached
+    in `auth_check_cache`, if any, for a short time.
+
     Args:
         dataset (str): the dataset name
         external_auth_url (str|None): the URL of an external authentication service. The URL must contain `%s`,
@@ -64,6 +180,10 @@ def auth_check(
         hf_jwt_algorithm (str): the algorithm to use to decode the JWT token
         hf_timeout_seconds (float|None): the timeout in seconds for the external authentication service. It
           is used both for the connection timeout and the read timeout. If None, the request never timeouts.
+        auth_check_cache (AuthCheckCache|None): the cache of the answers of the external authentication service. If
+          None, the service is called every time.
+        verified_jwt_cache (VerifiedJwtCache|None): the cache of the already verified JWTs. If None, the signature of
+          the JWT is verified every time.
 
     Returns:
         None: the dataset is authorized for the request
@@ -77,7 +197,11 @@ def auth_check(
                 HEADER = "x-api-key"
                 if token := request.headers.get(HEADER):
                     if is_jwt_valid(
-                        dataset=dataset, token=token, public_key=hf_jwt_public_key, algorithm=hf_jwt_algorithm
+                        dataset=dataset,
+                        token=token,
+                        public_key=hf_jwt_public_key,
+                        algorithm=hf_jwt_algorithm,
+                        verified_jwt_cache=verified_jwt_cache,
                     ):
                         logging.debug(
                             f"By-passing the authentication step, because a valid JWT was passed in header: '{HEADER}'"
@@ -100,38 +224,38 @@ def auth_check(
             except TypeError as e:
                 raise ValueError("external_auth_url must contain %s") from e
         with StepProfiler(method="auth_check", step="create auth parameter"):
-            auth = RequestAuth(request)
-        with StepProfiler(
-            method="auth_check",
-            step="requests.get",
-            context=f"external_auth_url={external_auth_url} timeout={hf_timeout_seconds}",
-        ):
-            try:
-                logging.debug(
-                    f"Checking authentication on the Hugging Face Hub for dataset {dataset}, url: {url}, timeout:"
-                    f" {hf_timeout_seconds}, authorization: {auth.authorization}"
-                )
-                response = requests.get(url, auth=auth, timeout=hf_timeout_seconds)
-            except Exception as err:
-                raise AuthCheckHubRequestError(
-                    (
-                        "Authentication check on the Hugging Face Hub failed or timed out. Please try again later,"
-                        " it's a temporary internal issue."
-                    ),
-                    err,
-                ) from err
+            auth_headers = get_auth_headers(request)
+        with StepProfiler(method="auth_check", step="get the answer from the cache"):
+            cache_key = get_auth_check_cache_key(dataset=dataset, auth_headers=auth_headers)
+            status_code = None if auth_check_cache is None else auth_check_cache.get(cache_key)
+        if status_code is None:
+            with StepProfiler(
+                method="auth_check",
+                step="get the answer from the external service",
+                context=f"external_auth_url={external_auth_url} timeout={hf_timeout_seconds}",
+            ):
+                try:
+                    logging.debug(
+                        f"Checking authentication on the Hugging Face Hub for dataset {dataset}, url: {url}, timeout:"
+                        f" {hf_timeout_seconds}, authorization: {auth_headers.get('authorization')}"
+                    )
+                    async with get_session().get(
+                        url,
+                        headers=auth_headers,
+                        timeout=aiohttp.ClientTimeout(
+                            total=None, sock_connect=hf_timeout_seconds, sock_read=hf_timeout_seconds
+                        ),
+                    ) as response:
+                        status_code = response.status
+                except Exception as err:
+                    raise AuthCheckHubRequestError(
+                        (
+                            "Authentication check on the Hugging Face Hub failed or timed out. Please try again later,"
+                            " it's a temporary internal issue."
+                        ),
+                        err,
+                    ) from err
+            if auth_check_cache is not None:
+                auth_check_cache.set(cache_key, status_code)
     with StepProfiler(method="auth_check", step="return or raise"):
-        if response.status_code == 200:
-            return True
-        elif response.status_code == 401:
-            raise ExternalUnauthenticatedError(
-                "The dataset does not exist, or is not accessible without authentication (private or gated). Please"
-                " check the spelling of the dataset name or retry with authentication."
-            )
-        elif response.status_code in [403, 404]:
-            raise ExternalAuthenticatedError(
-                "The dataset does not exist, or is not accessible with the current credentials (private or gated)."
-                " Please check the spelling of the dataset name or retry with other authentication credentials."
-            )
-        else:
-            raise ValueError(f"Unexpected status code {response.status_code}")
+        return check_status_code(status_code)
@@ -38,6 +38,9 @@ class UvicornConfig:
             )
 
 
+API_AUTH_CHECK_CACHE_NEGATIVE_TTL_SECONDS = 2.0
+API_AUTH_CHECK_CACHE_TTL_SECONDS = 10.0
+API_ENCODED_RESPONSE_CACHE_MAX_BYTES = 100_000_000
 API_EXTERNAL_AUTH_URL = None
 API_HF_AUTH_PATH = "/api/datasets/%s/auth-check"
 API_HF_JWT_PUBLIC_KEY_URL = None
@@ -46,10 +49,16 @@ API_HF_TIMEOUT_SECONDS = 0.2
 API_HF_WEBHOOK_SECRET = None
 API_MAX_AGE_LONG = 120  # 2 minutes
 API_MAX_AGE_SHORT = 10  # 10 seconds
+API_MISSING_DATASET_CACHE_NOT_FOUND_TTL_SECONDS = 60.0
+API_MONGO_MAX_WORKERS = 16
+API_SET_REVISION_DEBOUNCE_SECONDS = 60.0
 
 
 @dataclass(frozen=True)
 class ApiConfig:
+    auth_check_cache_negative_ttl_seconds: float = API_AUTH_CHECK_CACHE_NEGATIVE_TTL_SECONDS
+    auth_check_cache_ttl_seconds: float = API_AUTH_CHECK_CACHE_TTL_SECONDS
+    encoded_response_cache_max_bytes: int = API_ENCODED_RESPONSE_CACHE_MAX_BYTES
     external_auth_url: Optional[str] = API_EXTERNAL_AUTH_URL  # not documented
     hf_auth_path: str = API_HF_AUTH_PATH
     hf_jwt_public_key_url: Optional[str] = API_HF_JWT_PUBLIC_KEY_URL
@@ -58,6 +67,9 @@ class ApiConfig:
     hf_webhook_secret: Optional[str] = API_HF_WEBHOOK_SECRET
     max_age_long: int = API_MAX_AGE_LONG
     max_age_short: int = API_MAX_AGE_SHORT
+    missing_dataset_cache_not_found_ttl_seconds: float = API_MISSING_DATASET_CACHE_NOT_FOUND_TTL_SECONDS
+    mongo_max_workers: int = API_MONGO_MAX_WORKERS
+    set_revision_debounce_seconds: float = API_SET_REVISION_DEBOUNCE_SECONDS
 
     @classmethod
     def from_env(cls, common_config: CommonConfig) -> "ApiConfig":
@@ -66,6 +78,15 @@ class ApiConfig:
             hf_auth_path = env.str(name="HF_AUTH_PATH", default=API_HF_AUTH_PATH)
             external_auth_url = None if hf_auth_path is None else f"{common_config.hf_endpoint}{hf_auth_path}"
             return cls(
+                auth_check_cache_negative_ttl_seconds=env.float(
+                    name="AUTH_CHECK_CACHE_NEGATIVE_TTL_SECONDS", default=API_AUTH_CHECK_CACHE_NEGATIVE_TTL_SECONDS
+                ),
+                auth_check_cache_ttl_seconds=env.float(
+                    name="AUTH_CHECK_CACHE_TTL_SECONDS", default=API_AUTH_CHECK_CACHE_TTL_SECONDS
+                ),
+                encoded_response_cache_max_bytes=env.int(
+                    name="ENCODED_RESPONSE_CACHE_MAX_BYTES", default=API_ENCODED_RESPONSE_CACHE_MAX_BYTES
+                ),
                 external_auth_url=external_auth_url,
                 hf_auth_path=hf_auth_path,
                 hf_jwt_public_key_url=env.str(name="HF_JWT_PUBLIC_KEY_URL", default=API_HF_JWT_PUBLIC_KEY_URL),
@@ -74,12 +95,127 @@ class ApiConfig:
                 hf_webhook_secret=env.str(name="HF_WEBHOOK_SECRET", default=API_HF_WEBHOOK_SECRET),
                 max_age_long=env.int(name="MAX_AGE_LONG", default=API_MAX_AGE_LONG),
                 max_age_short=env.int(name="MAX_AGE_SHORT", default=API_MAX_AGE_SHORT),
+                missing_dataset_cache_not_found_ttl_seconds=env.float(
+                    name="MISSING_DATASET_CACHE_NOT_FOUND_TTL_SECONDS",
+                    default=API_MISSING_DATASET_CACHE_NOT_FOUND_TTL_SECONDS,
+                ),
+                mongo_max_workers=env.int(name="MONGO_MAX_WORKERS", default=API_MONGO_MAX_WORKERS),
+                set_revision_debounce_seconds=env.float(
+                    name="SET_REVISION_DEBOUNCE_SECONDS", default=API_SET_REVISION_DEBOUNCE_SECONDS
+                ),
+            )
+
+
+ROW_GROUPS_CACHE_CLEAN_CACHE_PROBA = 0.05
+ROW_GROUPS_CACHE_MAX_BYTES = 10_000_000_000
+ROW_GROUPS_CACHE_STORAGE_DIRECTORY = None
+
+
+@dataclass(frozen=True)
+class RowGroupsCacheConfig:
+    clean_cache_proba: float = ROW_GROUPS_CACHE_CLEAN_CACHE_PROBA
+    max_bytes: int = ROW_GROUPS_CACHE_MAX_BYTES
+    storage_directory: Optional[str] = ROW_GROUPS_CACHE_STORAGE_DIRECTORY
+
+    @classmethod
+    def from_env(cls) -> "RowGroupsCacheConfig":
+        env = Env(expand_vars=True)
+        with env.prefixed("ROW_GROUPS_CACHE_"):
+            return cls(
+                clean_cache_proba=env.float(name="CLEAN_CACHE_PROBA", default=ROW_GROUPS_CACHE_CLEAN_CACHE_PROBA),
+                max_bytes=env.int(name="MAX_BYTES", default=ROW_GROUPS_CACHE_MAX_BYTES),
+                storage_directory=env.str(name="STORAGE_DIRECTORY", default=ROW_GROUPS_CACHE_STORAGE_DIRECTORY),
+            )
+
+
+ROWS_INDEX_CACHE_MAX_BYTES = 500_000_000
+
+
+@dataclass(frozen=True)
+class RowsIndexCacheConfig:
+    max_bytes: int = ROWS_INDEX_CACHE_MAX_BYTES
+
+    @classmethod
+    def from_env(cls) -> "RowsIndexCacheConfig":
+        env = Env(expand_vars=True)
+        with env.prefixed("ROWS_INDEX_CACHE_"):
+            return cls(
+                max_bytes=env.int(name="MAX_BYTES", default=ROWS_INDEX_CACHE_MAX_BYTES),
+            )
+
+
+ROWS_THREAD_POOL_MAX_INDEX_TASKS = 8
+ROWS_THREAD_POOL_MAX_QUERY_TASKS = 16
+ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS = 8
+ROWS_THREAD_POOL_MAX_WORKERS = 32
+
+
+@dataclass(frozen=True)
+class RowsThreadPoolConfig:
+    max_index_tasks: int = ROWS_THREAD_POOL_MAX_INDEX_TASKS
+    max_query_tasks: int = ROWS_THREAD_POOL_MAX_QUERY_TASKS
+    max_transform_tasks: int = ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS
+    max_workers: int = ROWS_THREAD_POOL_MAX_WORKERS
+
+    @classmethod
+    def from_env(cls) -> "RowsThreadPoolConfig":
+        env = Env(expand_vars=True)
+        with env.prefixed("ROWS_THREAD_POOL_"):
+            return cls(
+                max_index_tasks=env.int(name="MAX_INDEX_TASKS", default=ROWS_THREAD_POOL_MAX_INDEX_TASKS),
+                max_query_tasks=env.int(name="MAX_QUERY_TASKS", default=ROWS_THREAD_POOL_MAX_QUERY_TASKS),
+                max_transform_tasks=env.int(name="MAX_TRANSFORM_TASKS", default=ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS),
+                max_workers=env.int(name="MAX_WORKERS", default=ROWS_THREAD_POOL_MAX_WORKERS),
+            )
+
+
+BEST_RESPONSE_CACHE_MAX_ENTRIES = 10_000
+BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS = 1.0
+BEST_RESPONSE_CACHE_TTL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class BestResponseCacheConfig:
+    max_entries: int = BEST_RESPONSE_CACHE_MAX_ENTRIES
+    poll_interval_seconds: float = BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS
+    ttl_seconds: float = BEST_RESPONSE_CACHE_TTL_SECONDS
+
+    @classmethod
+    def from_env(cls) -> "BestResponseCacheConfig":
+        env = Env(expand_vars=True)
+        with env.prefixed("BEST_RESPONSE_CACHE_"):
+            return cls(
+                max_entries=env.int(name="MAX_ENTRIES", default=BEST_RESPONSE_CACHE_MAX_ENTRIES),
+                poll_interval_seconds=env.float(
+                    name="POLL_INTERVAL_SECONDS", default=BEST_RESPONSE_CACHE_POLL_INTERVAL_SECONDS
+                ),
+                ttl_seconds=env.float(name="TTL_SECONDS", default=BEST_RESPONSE_CACHE_TTL_SECONDS),
+            )
+
+
+ROWS_READ_AHEAD_MAX_BYTES = 200_000_000
+ROWS_READ_AHEAD_MAX_TASKS = 4
+
+
+@dataclass(frozen=True)
+class RowsReadAheadConfig:
+    max_bytes: int = ROWS_READ_AHEAD_MAX_BYTES
+    max_tasks: int = ROWS_READ_AHEAD_MAX_TASKS
+
+    @classmethod
+    def from_env(cls) -> "RowsReadAheadConfig":
+        env = Env(expand_vars=True)
+        with env.prefixed("ROWS_READ_AHEAD_"):
+            return cls(
+                max_bytes=env.int(name="MAX_BYTES", default=ROWS_READ_AHEAD_MAX_BYTES),
+                max_tasks=env.int(name="MAX_TASKS", default=ROWS_READ_AHEAD_MAX_TASKS),
             )
 
 
 @dataclass(frozen=True)
 class AppConfig:
     api: ApiConfig = field(default_factory=ApiConfig)
+    best_response_cache: BestResponseCacheConfig = field(default_factory=BestResponseCacheConfig)
     cached_assets: CachedAssetsConfig = field(default_factory=CachedAssetsConfig)
     cache: CacheConfig = field(default_factory=CacheConfig)
     common: CommonConfig = field(default_factory=CommonConfig)
@@ -87,6 +223,10 @@ class AppConfig:
     queue: QueueConfig = field(default_factory=QueueConfig)
     processing_graph: ProcessingGraphConfig = field(default_factory=ProcessingGraphConfig)
     parquet_metadata: ParquetMetadataConfig = field(default_factory=ParquetMetadataConfig)
+    row_groups_cache: RowGroupsCacheConfig = field(default_factory=RowGroupsCacheConfig)
+    rows_index_cache: RowsIndexCacheConfig = field(default_factory=RowsIndexCacheConfig)
+    rows_thread_pool: RowsThreadPoolConfig = field(default_factory=RowsThreadPoolConfig)
+    rows_read_ahead: RowsReadAheadConfig = field(default_factory=RowsReadAheadConfig)
 
     @classmethod
     def from_env(cls) -> "AppConfig":
@@ -99,7 +239,12 @@ class AppConfig:
             processing_graph=ProcessingGraphConfig.from_env(),
             queue=QueueConfig.from_env(),
             api=ApiConfig.from_env(common_config=common_config),
+            best_response_cache=BestResponseCacheConfig.from_env(),
             parquet_metadata=ParquetMetadataConfig.from_env(),
+            row_groups_cache=RowGroupsCacheConfig.from_env(),
+            rows_index_cache=RowsIndexCacheConfig.from_env(),
+            rows_thread_pool=RowsThreadPoolConfig.from_env(),
+            rows_read_ahead=RowsReadAheadConfig.from_env(),
         )
 
 
@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import gzip
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from libcommon.utils import orjson_dumps
+
+from api.memory_cache import MemoryCache
+
+# same as GZipMiddleware: the smaller responses are not compressed
+GZIP_MINIMUM_SIZE = 500
+GZIP_COMPRESS_LEVEL = 9
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    # same rule as GZipMiddleware
+    return accept_encoding is not None and "gzip" in accept_encoding
+
+
+class EncodedResponseCache:
+    """
+    Memoize the JSON serialization of the contents of the cached responses, and its gzip compression.
+
+    The contents are the objects returned by the best responses cache, which returns the same object until the
+    response is updated in the database. An entry is thus keyed by the request, and only reused if it has been computed
+    from the same object: an updated response is encoded again. The entry keeps a reference to the content, so that its
+    identity cannot be taken by another object.
+
+    The cache is bounded by the size of the encoded bytes, the least recently used entries are evicted first.
+
+    Args:
+        max_bytes (`int`): The maximum total size of the encoded bytes. If 0, nothing is memoized.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.cache: MemoryCache[Hashable, Tuple[Any, Dict[Optional[str], bytes]]] = MemoryCache(max_bytes=max_bytes)
+
+    def get(self, key: Hashable, content: Any, accept_encoding: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """Get the JSON bytes of `content`, compressed if the client accepts it.
+
+        Args:
+            key (`Hashable`): Identifies the request, e.g. (endpoint, dataset, config, split).
+            content (`Any`): The content of the response.
+            accept_encoding (`str`, *optional*): The Accept-Encoding header of the request.
+
+        Returns:
+            `Tuple[bytes, Optional[str]]`: The body of the response, and its content encoding (None if not
+              compressed).
+        """
+        entry = self.cache.get(key)
+        if entry is None or entry[0] is not content:
+            entry = (content, {})
+        encoded = entry[1]
+        num_encoded = len(encoded)
+        body = encoded.get(None)
+        if body is None:
+            body = orjson_dumps(content)
+            encoded[None] = body
+        content_encoding = "gzip" if accepts_gzip(accept_encoding) and len(body) >= GZIP_MINIMUM_SIZE else None
+        if content_encoding is not None:
+            compressed_body = encoded.get(content_encoding)
+            if compressed_body is None:
+                compressed_body = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+                encoded[content_encoding] = compressed_body
+            body = compressed_body
+        if len(encoded) > num_encoded:
+            self.cache.set(key, entry, nbytes=sum(len(value) for value in encoded.values()))
+        return body, content_encoding
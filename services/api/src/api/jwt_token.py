@@ -1,8 +1,12 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import hashlib
 import logging
-from typing import Any, Optional, Union
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, Union
 
 import jwt
 import requests
@@ -32,6 +36,7 @@ from api.utils import JWKError
 
 ASYMMETRIC_ALGORITHMS = (ECAlgorithm, OKPAlgorithm, RSAAlgorithm, RSAPSSAlgorithm)
 SYMMETRIC_ALGORITHMS = (HMACAlgorithm,)
+VERIFIED_JWT_CACHE_MAX_ENTRIES = 10_000
 
 
 def is_public_key(
@@ -113,8 +118,69 @@ def fetch_jwt_public_key(
         raise JWKError(f"Failed to fetch or parse the JWT public key from {url}. ", cause=err) from err
 
 
+def get_verified_jwt_cache_key(token: Any, public_key: str, algorithm: str) -> str:
+    # the token is hashed, not to keep it in memory
+    return hashlib.sha256("\n".join([algorithm, public_key, str(token)]).encode("utf-8")).hexdigest()
+
+
+class VerifiedJwtCache:
+    """
+    A cache of the claims of the JWTs whose signature has already been verified.
+
+    The claims are keyed by a hash of the token, the public key and the algorithm, so that a token is only trusted
+    with the key that verified it. Only the tokens with a valid signature are cached, and an entry is dropped when the
+    token expires ("exp" claim): the other claims ("sub" and "read") are still checked against the dataset on every
+    request.
+
+    The cache is bounded to `max_entries` entries, the least recently set are evicted first. The cache is
+    thread-safe.
+
+    Args:
+        max_entries (`int`): The maximum number of entries.
+    """
+
+    def __init__(self, max_entries: int = VERIFIED_JWT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # the claims of the token, and its expiration time
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, exp = entry
+            # same rule as jwt.decode: the token is expired if "exp" is in the past
+            if exp <= time.time():
+                del self._entries[key]
+                return None
+            return claims
+
+    def set(self, key: str, claims: Dict[str, Any]) -> None:
+        try:
+            exp = int(claims["exp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if exp <= time.time() or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (claims, exp)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
 def is_jwt_valid(
-    dataset: str, token: Any, public_key: Optional[str], algorithm: Optional[str], verify_exp: Optional[bool] = True
+    dataset: str,
+    token: Any,
+    public_key: Optional[str],
+    algorithm: Optional[str],
+    verify_exp: Optional[bool] = True,
+    verified_jwt_cache: Optional[VerifiedJwtCache] = None,
 ) -> bool:
     """
     Check if the JWT is valid for the dataset.
@@ -131,6 +197,8 @@ def is_jwt_valid(
         public_key (str|None): the public key to use to decode the JWT token
         algorithm (str|None): the algorithm to use to decode the JWT token
         verify_exp (bool|None): whether to verify the expiration of the JWT token. Default to True.
+        verified_jwt_cache (VerifiedJwtCache|None): the cache of the already verified tokens, to skip the verification
+          of the signature. If None, the signature is verified every time.
 
     Returns:
         bool: True if the JWT is valid for the input dataset, else False
@@ -141,20 +209,25 @@ def is_jwt_valid(
             " validation."
         )
         return False
-    try:
-        decoded = jwt.decode(
-            jwt=token,
-            key=public_key,
-            algorithms=[algorithm],
-            options={"require": ["exp", "sub", "read"], "verify_exp": verify_exp},
-        )
-        logging.debug(f"Decoded JWT is: '{public_key}'.")
-    except Exception:
-        logging.debug(
-            f"Missing public key '{public_key}' or algorithm '{algorithm}' to decode JWT token. Skipping JWT"
-            " validation."
-        )
-        return False
+    cache_key = get_verified_jwt_cache_key(token=token, public_key=public_key, algorithm=algorithm)
+    decoded = None if verified_jwt_cache is None else verified_jwt_cache.get(cache_key)
+    if decoded is None:
+        try:
+            decoded = jwt.decode(
+                jwt=token,
+                key=public_key,
+                algorithms=[algorithm],
+                options={"require": ["exp", "sub", "read"], "verify_exp": verify_exp},
+            )
+            logging.debug(f"Decoded JWT is: '{public_key}'.")
+        except Exception:
+            logging.debug(
+                f"Missing public key '{public_key}' or algorithm '{algorithm}' to decode JWT token. Skipping JWT"
+                " validation."
+            )
+            return False
+        if verified_jwt_cache is not None:
+            verified_jwt_cache.set(cache_key, decoded)
     sub = decoded.get("sub")
     if not isinstance(sub, str) or not sub.startswith("datasets/") or sub.removeprefix("datasets/") != dataset:
         return False
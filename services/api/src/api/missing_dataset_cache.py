@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Literal, Optional, Tuple
+
+MISSING_DATASET_CACHE_MAX_ENTRIES = 100_000
+
+MissingDatasetOutcome = Literal["not_found", "revision_set"]
+
+
+class MissingDatasetCache:
+    """
+    A cache of the outcomes of the lookups of the datasets that have no cache entry at all.
+
+    Such a lookup requests the Hub, and if the dataset exists, sets its revision, which creates the jobs. Both are
+    expensive, and are triggered again by every request, e.g. by the scrapers requesting nonexistent datasets:
+
+    - "not_found": the dataset does not exist on the Hub, or is not supported. The outcome is kept for
+      `not_found_ttl_seconds`.
+    - "revision_set": the revision has just been set. Setting it again before the jobs have been processed is
+      useless: the outcome is kept for `set_revision_debounce_seconds`.
+
+    The cache is bounded to `max_entries` entries, the least recently set are evicted first. The cache is
+    thread-safe.
+
+    Args:
+        not_found_ttl_seconds (`float`): How long the "not_found" outcomes are kept, in seconds. If 0, they are not
+          cached.
+        set_revision_debounce_seconds (`float`): How long the "revision_set" outcomes are kept, in seconds. If 0, they
+          are not cached.
+        max_entries (`int`): The maximum number of entries.
+    """
+
+    def __init__(
+        self,
+        not_found_ttl_seconds: float,
+        set_revision_debounce_seconds: float,
+        max_entries: int = MISSING_DATASET_CACHE_MAX_ENTRIES,
+    ):
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.set_revision_debounce_seconds = set_revision_debounce_seconds
+        self.max_entries = max_entries
+        # the outcome, and its expiration time
+        self._entries: "OrderedDict[str, Tuple[MissingDatasetOutcome, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, dataset: str) -> Optional[MissingDatasetOutcome]:
+        with self._lock:
+            entry = self._entries.get(dataset)
+            if entry is None:
+                return None
+            outcome, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[dataset]
+                return None
+            return outcome
+
+    def set(self, dataset: str, outcome: MissingDatasetOutcome) -> None:
+        ttl_seconds = self.not_found_ttl_seconds if outcome == "not_found" else self.set_revision_debounce_seconds
+        if ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(dataset, None)
+            self._entries[dataset] = (outcome, time.monotonic() + ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
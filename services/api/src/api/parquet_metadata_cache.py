@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow.parquet as pq
+from libcommon.storage import StrPath
+
+from api.memory_cache import MemoryCache
+
+PARQUET_METADATA_CACHE_MAX_BYTES = 100_000_000
+
+
+@dataclass(frozen=True)
+class ParquetFileMetadata:
+    """The parsed footer of a parquet file, and the offsets of its row groups.
+
+    Args:
+        metadata (`pq.FileMetaData`): The parsed footer.
+        row_group_offsets (`npt.NDArray[np.int64]`): The cumulative number of rows at the end of every row group, as
+          in `np.cumsum([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])`.
+    """
+
+    metadata: pq.FileMetaData
+    row_group_offsets: npt.NDArray[np.int64]
+
+    @property
+    def nbytes(self) -> int:
+        # the parsed footer takes more memory than the serialized one, but it's a good enough proxy
+        return int(self.metadata.serialized_size) + self.row_group_offsets.nbytes
+
+
+# the cache is global to the process: the metadata files are shared by all the splits of all the datasets
+parquet_metadata_cache: MemoryCache[Tuple[str, int], ParquetFileMetadata] = MemoryCache(
+    max_bytes=PARQUET_METADATA_CACHE_MAX_BYTES
+)
+
+
+def read_parquet_metadata(metadata_path: StrPath) -> ParquetFileMetadata:
+    """Read and parse a parquet metadata file, or get it from the in-process cache.
+
+    The cache is keyed by the path and the last modification time of the file, so that a file rewritten by the
+    worker is parsed again.
+
+    Args:
+        metadata_path (`StrPath`): The path to the parquet metadata file.
+
+    Returns:
+        `ParquetFileMetadata`: The parsed footer and the offsets of the row groups.
+    """
+    path = str(metadata_path)
+    key = (path, os.stat(path).st_mtime_ns)
+    parquet_file_metadata = parquet_metadata_cache.get(key)
+    if parquet_file_metadata is None:
+        metadata = pq.read_metadata(path)
+        parquet_file_metadata = ParquetFileMetadata(
+            metadata=metadata,
+            row_group_offsets=np.cumsum(
+                [metadata.row_group(group_id).num_rows for group_id in range(metadata.num_row_groups)],
+                dtype=np.int64,
+            ),
+        )
+        parquet_metadata_cache.set(key, parquet_file_metadata, nbytes=parquet_file_metadata.nbytes)
+    return parquet_file_metadata
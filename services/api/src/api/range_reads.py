@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+import io
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow.parquet as pq
+from fsspec.asyn import sync
+
+# a byte range [start, end) in a file
+ByteRange = Tuple[int, int]
+
+# two ranges separated by less than RANGE_HOLE_SIZE_LIMIT bytes are fetched with a single request, unless the merged
+# range would be bigger than RANGE_SIZE_LIMIT bytes
+RANGE_HOLE_SIZE_LIMIT = 64 * 1024
+RANGE_SIZE_LIMIT = 32 * 1024 * 1024
+MAX_CONCURRENT_REQUESTS_PER_HOST = 8
+
+# the semaphores are created lazily, in the loop where the requests are sent (the fsspec IO loop)
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_column_ids(schema: pq.ParquetSchema, columns: List[str]) -> List[int]:
+    """Get the indexes of the leaf columns (the column chunks of a row group) of some top-level columns.
+
+    Args:
+        schema (pq.ParquetSchema): The parquet schema.
+        columns (List[str]): The (top-level) columns. The nested fields of a column are included.
+
+    Returns:
+        List[int]: The indexes of the leaf columns, sorted.
+    """
+    return [
+        column_id
+        for column_id in range(len(schema))
+        if any(
+            schema.column(column_id).path == column or schema.column(column_id).path.startswith(f"{column}.")
+            for column in columns
+        )
+    ]
+
+
+def get_column_chunk_ranges(
+    metadata: pq.FileMetaData, row_group_ids: Iterable[int], columns: List[str]
+) -> List[ByteRange]:
+    """Get the byte ranges of the column chunks of some columns in some row groups of a parquet file.
+
+    Args:
+        metadata (pq.FileMetaData): The metadata of the parquet file.
+        row_group_ids (Iterable[int]): The row groups.
+        columns (List[str]): The (top-level) columns. The nested fields of a column are included.
+
+    Returns:
+        List[ByteRange]: The byte ranges, in no particular order.
+    """
+    column_ids = get_column_ids(metadata.schema, columns)
+    ranges: List[ByteRange] = []
+    for row_group_id in row_group_ids:
+        row_group_metadata = metadata.row_group(row_group_id)
+        for column_id in column_ids:
+            column_chunk_metadata = row_group_metadata.column(column_id)
+            start = (
+                column_chunk_metadata.dictionary_page_offset
+                if column_chunk_metadata.has_dictionary_page
+                else column_chunk_metadata.data_page_offset
+            )
+            ranges.append((start, start + column_chunk_metadata.total_compressed_size))
+    return ranges
+
+
+def get_column_chunk_ranges_from_index(
+    row_groups_index: npt.NDArray[np.void], column_ids: List[int]
+) -> List[ByteRange]:
+    """Get the byte ranges of the column chunks of some columns, from a row groups index.
+
+    Args:
+        row_groups_index (npt.NDArray[np.void]): The records of the row groups, as created by
+          `libcommon.viewer_utils.parquet_metadata.create_row_groups_index`.
+        column_ids (List[int]): The indexes of the leaf columns (see `get_column_ids`).
+
+    Returns:
+        List[ByteRange]: The byte ranges, in no particular order.
+    """
+    starts = row_groups_index["column_chunk_offsets"][:, column_ids].ravel()
+    ends = starts + row_groups_index["column_chunk_sizes"][:, column_ids].ravel()
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def merge_ranges(
+    ranges: List[ByteRange],
+    hole_size_limit: int = RANGE_HOLE_SIZE_LIMIT,
+    range_size_limit: int = RANGE_SIZE_LIMIT,
+) -> List[ByteRange]:
+    """Merge the overlapping or close byte ranges, to reduce the number of requests.
+
+    Args:
+        ranges (List[ByteRange]): The byte ranges.
+        hole_size_limit (int): The maximum gap, in bytes, between two ranges that are merged.
+        range_size_limit (int): The maximum size, in bytes, of a merged range. A range that is bigger by itself is
+          not split.
+
+    Returns:
+        List[ByteRange]: The merged byte ranges, sorted.
+    """
+    merged: List[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged:
+            last_start, last_end = merged[-1]
+            if start <= last_end or (
+                start - last_end <= hole_size_limit and max(end, last_end) - last_start <= range_size_limit
+            ):
+                merged[-1] = (last_start, max(end, last_end))
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def _get_host_semaphore(source: Any, max_concurrent_requests_per_host: int) -> asyncio.Semaphore:
+    host = urlparse(str(getattr(source, "url", ""))).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(max_concurrent_requests_per_host)
+    return _host_semaphores[host]
+
+
+async def _async_fetch_range(source: Any, byte_range: ByteRange, max_concurrent_requests_per_host: int) -> bytes:
+    async with _get_host_semaphore(source, max_concurrent_requests_per_host):
+        return await source.async_fetch_range(*byte_range)  # type: ignore
+
+
+async def _async_fetch_ranges(
+    sources_and_ranges: List[Tuple[Any, List[ByteRange]]], max_concurrent_requests_per_host: int
+) -> List[List[bytes]]:
+    sizes = [len(ranges) for _, ranges in sources_and_ranges]
+    results = await asyncio.gather(
+        *[
+            _async_fetch_range(source, byte_range, max_concurrent_requests_per_host)
+            for source, ranges in sources_and_ranges
+            for byte_range in ranges
+        ]
+    )
+    fetched: List[List[bytes]] = []
+    for size in sizes:
+        fetched.append(list(results[:size]))
+        results = results[size:]
+    return fetched
+
+
+def fetch_ranges(
+    sources_and_ranges: List[Tuple[Any, List[ByteRange]]],
+    max_concurrent_requests_per_host: int = MAX_CONCURRENT_REQUESTS_PER_HOST,
+) -> List["RangesFile"]:
+    """Fetch byte ranges of several files, and return files that serve the reads from the fetched bytes.
+
+    The ranges of the remote files (fsspec's HTTPFile) are all fetched concurrently, in the fsspec IO loop, with at
+    most `max_concurrent_requests_per_host` requests in flight per host. The ranges of the other file-like objects
+    (e.g. local files) are read sequentially.
+
+    Args:
+        sources_and_ranges (List[Tuple[Any, List[ByteRange]]]): The files, with the byte ranges to fetch.
+        max_concurrent_requests_per_host (int): The maximum number of concurrent requests to the same host.
+
+    Returns:
+        List[RangesFile]: One file per source, in the same order.
+    """
+    remote = [
+        (source, ranges)
+        for source, ranges in sources_and_ranges
+        if hasattr(source, "async_fetch_range") and hasattr(source, "loop")
+    ]
+    fetched_remote = (
+        sync(remote[0][0].loop, _async_fetch_ranges, remote, max_concurrent_requests_per_host) if remote else []
+    )
+    fetched_by_source_id = {id(source): data for (source, _), data in zip(remote, fetched_remote)}
+    files = []
+    for source, ranges in sources_and_ranges:
+        if id(source) in fetched_by_source_id:
+            data = fetched_by_source_id[id(source)]
+        else:
+            data = []
+            for start, end in ranges:
+                source.seek(start)
+                data.append(source.read(end - start))
+        files.append(RangesFile(source=source, parts=[(start, chunk) for (start, _), chunk in zip(ranges, data)]))
+    return files
+
+
+class RangesFile(io.RawIOBase):
+    """A read-only file-like object, that serves the reads from byte ranges fetched beforehand.
+
+    The reads that are not contained in one of the fetched ranges are delegated to the source file.
+
+    Args:
+        source (Any): The source file-like object. It must be seekable.
+        parts (List[Tuple[int, bytes]]): The fetched parts, as (offset, bytes), without overlap.
+        size (int, optional): The size of the file. If None, it's taken from the source.
+    """
+
+    def __init__(self, source: Any, parts: List[Tuple[int, bytes]], size: Optional[int] = None):
+        super().__init__()
+        self.source = source
+        self.parts = sorted(parts, key=lambda part: part[0])
+        self.starts = [start for start, _ in self.parts]
+        if size is None:
+            size = getattr(source, "size", None)
+        if size is None:
+            size = source.seek(0, io.SEEK_END)
+        self.size: int = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self.position
+
+    def readinto(self, buffer: Any) -> int:
+        length = max(0, min(len(buffer), self.size - self.position))
+        if length == 0:
+            return 0
+        part_id = bisect_right(self.starts, self.position) - 1
+        if part_id >= 0:
+            start, data = self.parts[part_id]
+            if self.position + length <= start + len(data):
+                buffer[:length] = data[self.position - start : self.position - start + length]  # noqa: E203
+                self.position += length
+                return length
+        logging.debug(f"Read outside of the fetched ranges: {length} bytes at {self.position}.")
+        self.source.seek(self.position)
+        data = self.source.read(length)
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
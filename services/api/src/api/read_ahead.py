@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Hashable, List, Set
+
+from libcommon.prometheus import READ_AHEAD_TASKS_TOTAL
+
+from api.thread_pool import ThreadPoolStage
+
+
+class ReadAhead:
+    """
+    Run the read-ahead tasks (e.g. fetching the next page of rows) in the background, in a dedicated thread pool.
+
+    The read-ahead is best effort: a task is dropped, instead of being queued, if the stages of the requests are busy
+    (the process is under load), if all the read-ahead threads are busy, if a task with the same key is already
+    running, or if the estimated size of the running tasks would exceed `max_bytes`. The number of submitted and
+    dropped tasks is exposed as a Prometheus metric.
+
+    Args:
+        name (`str`): The name of the read-ahead, used as a label in the metrics and as the prefix of the threads.
+        max_bytes (`int`): The maximum estimated size of the data read by the running tasks, in bytes. If `0`, the
+          read-ahead is disabled.
+        max_tasks (`int`): The maximum number of tasks running concurrently.
+        stages (`List[ThreadPoolStage]`): The stages of the requests. No task is submitted while one of them is busy.
+    """
+
+    def __init__(self, name: str, max_bytes: int, max_tasks: int, stages: List[ThreadPoolStage]):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_tasks = max_tasks
+        self.stages = stages
+        self.executor = ThreadPoolExecutor(max_workers=max_tasks, thread_name_prefix=name) if self.is_enabled else None
+        self._lock = Lock()
+        self._nbytes = 0
+        self._keys: Set[Hashable] = set()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_tasks > 0
+
+    def _drop(self, reason: str) -> bool:
+        READ_AHEAD_TASKS_TOTAL.labels(name=self.name, status=f"dropped_{reason}").inc()
+        return False
+
+    def submit(self, key: Hashable, func: Callable[[], Any], nbytes: int) -> bool:
+        """Run `func` in the background, if the budget allows it.
+
+        Args:
+            key (`Hashable`): Identifies the task, to avoid running the same task twice concurrently.
+            func (`Callable[[], Any]`): The task. Its result is ignored, and its exceptions are logged.
+            nbytes (`int`): The estimated size of the data read by the task, in bytes.
+
+        Returns:
+            `bool`: True if the task has been submitted.
+        """
+        if self.executor is None:
+            return False
+        if any(stage.is_busy for stage in self.stages):
+            return self._drop("load")
+        with self._lock:
+            if key in self._keys:
+                return self._drop("duplicate")
+            if len(self._keys) >= self.max_tasks:
+                return self._drop("tasks")
+            if self._nbytes + nbytes > self.max_bytes:
+                return self._drop("bytes")
+            self._keys.add(key)
+            self._nbytes += nbytes
+
+        def done(future: "Future[Any]") -> None:
+            with self._lock:
+                self._keys.discard(key)
+                self._nbytes -= nbytes
+            if future.exception() is not None:
+                logging.debug(f"The read-ahead task {key} failed.", exc_info=future.exception())
+
+        self.executor.submit(func).add_done_callback(done)
+        READ_AHEAD_TASKS_TOTAL.labels(name=self.name, status="submitted").inc()
+        return True
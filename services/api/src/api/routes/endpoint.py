@@ -3,15 +3,19 @@
 
 import logging
 from abc import ABC, abstractmethod
+from functools import partial
 from http import HTTPStatus
-from typing import List, Mapping, Optional, Tuple, TypedDict
+from typing import Any, List, Mapping, NoReturn, Optional, Tuple, TypedDict
 
+from libcommon.async_mongo import AsyncMongo
 from libcommon.dataset import get_dataset_git_revision
 from libcommon.orchestrator import DatasetOrchestrator
 from libcommon.processing_graph import InputType, ProcessingGraph, ProcessingStep
 from libcommon.prometheus import StepProfiler
 from libcommon.simple_cache import (
     CACHED_RESPONSE_NOT_FOUND,
+    BestResponse,
+    BestResponseCache,
     CacheEntry,
     get_best_response,
 )
@@ -19,8 +23,12 @@ from libcommon.utils import Priority
 from starlette.requests import Request
 from starlette.responses import Response
 
-from api.authentication import auth_check
+from api.authentication import AuthCheckCache, auth_check
 from api.config import EndpointConfig
+from api.encoded_response_cache import EncodedResponseCache
+from api.jwt_token import VerifiedJwtCache
+from api.missing_dataset_cache import MissingDatasetCache
+from api.single_flight import SingleFlight
 from api.utils import (
     ApiCustomError,
     Endpoint,
@@ -29,9 +37,13 @@ from api.utils import (
     ResponseNotReadyError,
     UnexpectedError,
     are_valid_parameters,
+    get_encoded_json_ok_response,
+    get_etag,
     get_json_api_error_response,
     get_json_error_response,
     get_json_ok_response,
+    get_not_modified_response,
+    is_etag_matching,
 )
 
 StepsByInputType = Mapping[InputType, List[ProcessingStep]]
@@ -59,6 +71,10 @@ class EndpointsDefinition:
         }
 
 
+# the concurrent lookups of the same cache entries, in the threads of the process, share the same MongoDB queries
+cache_entry_single_flight: SingleFlight[Tuple[Any, ...], BestResponse] = SingleFlight(name="cache_entry")
+
+
 def get_cache_entry_from_steps(
     processing_steps: List[ProcessingStep],
     dataset: str,
@@ -68,10 +84,13 @@ def get_cache_entry_from_steps(
     hf_endpoint: str,
     hf_token: Optional[str] = None,
     hf_timeout_seconds: Optional[float] = None,
+    best_response_cache: Optional[BestResponseCache] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
 ) -> CacheEntry:
     """Gets the cache from the first successful step in the processing steps list.
     If no successful result is found, it will return the last one even if it's an error,
     Checks if job is still in progress by each processing step in case of no entry found.
+    The concurrent calls with the same steps and parameters are coalesced into one.
     Raises:
         - [`~utils.ResponseNotFoundError`]
           if no result is found.
@@ -80,40 +99,182 @@ def get_cache_entry_from_steps(
 
     Returns: the cached record
     """
+    return cache_entry_single_flight.do(
+        (tuple(processing_step.name for processing_step in processing_steps), dataset, config, split),
+        partial(
+            _get_best_response_from_steps,
+            processing_steps=processing_steps,
+            dataset=dataset,
+            config=config,
+            split=split,
+            processing_graph=processing_graph,
+            hf_endpoint=hf_endpoint,
+            hf_token=hf_token,
+            hf_timeout_seconds=hf_timeout_seconds,
+            best_response_cache=best_response_cache,
+            missing_dataset_cache=missing_dataset_cache,
+        ),
+    ).response
+
+
+def _get_best_response_from_steps(
+    processing_steps: List[ProcessingStep],
+    dataset: str,
+    config: Optional[str],
+    split: Optional[str],
+    processing_graph: ProcessingGraph,
+    hf_endpoint: str,
+    hf_token: Optional[str] = None,
+    hf_timeout_seconds: Optional[float] = None,
+    best_response_cache: Optional[BestResponseCache] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+) -> BestResponse:
     kinds = [processing_step.cache_kind for processing_step in processing_steps]
-    best_response = get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+    best_response = (
+        get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+        if best_response_cache is None
+        else best_response_cache.get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+    )
     if "error_code" in best_response.response and best_response.response["error_code"] == CACHED_RESPONSE_NOT_FOUND:
-        dataset_orchestrator = DatasetOrchestrator(dataset=dataset, processing_graph=processing_graph)
-        if not dataset_orchestrator.has_some_cache():
-            # We have to check if the dataset exists and is supported
-            try:
-                revision = get_dataset_git_revision(
-                    dataset=dataset,
-                    hf_endpoint=hf_endpoint,
-                    hf_token=hf_token,
-                    hf_timeout_seconds=hf_timeout_seconds,
-                )
-            except Exception as e:
-                # The dataset is not supported
-                raise ResponseNotFoundError("Not found.") from e
-            # The dataset is supported, and the revision is known. We set the revision (it will create the jobs)
-            # and tell the user to retry.
-            dataset_orchestrator.set_revision(revision=revision, priority=Priority.NORMAL, error_codes_to_retry=[])
+        raise_missing_cache_entry_error(
+            processing_steps=processing_steps,
+            dataset=dataset,
+            processing_graph=processing_graph,
+            hf_endpoint=hf_endpoint,
+            hf_token=hf_token,
+            hf_timeout_seconds=hf_timeout_seconds,
+            missing_dataset_cache=missing_dataset_cache,
+        )
+    return best_response
+
+
+async def get_best_response_from_steps_async(
+    processing_steps: List[ProcessingStep],
+    dataset: str,
+    config: Optional[str],
+    split: Optional[str],
+    processing_graph: ProcessingGraph,
+    hf_endpoint: str,
+    async_mongo: AsyncMongo,
+    hf_token: Optional[str] = None,
+    hf_timeout_seconds: Optional[float] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+) -> BestResponse:
+    """Same as get_cache_entry_from_steps, but the MongoDB queries are awaited: they don't block the event loop.
+
+    The concurrent calls, from coroutines or threads, with the same steps and parameters are coalesced into one.
+
+    Returns: the best response (the cached record, its kind and its update date)
+    """
+    return await cache_entry_single_flight.run(
+        (tuple(processing_step.name for processing_step in processing_steps), dataset, config, split),
+        partial(
+            _get_best_response_from_steps_async,
+            processing_steps=processing_steps,
+            dataset=dataset,
+            config=config,
+            split=split,
+            processing_graph=processing_graph,
+            hf_endpoint=hf_endpoint,
+            async_mongo=async_mongo,
+            hf_token=hf_token,
+            hf_timeout_seconds=hf_timeout_seconds,
+            missing_dataset_cache=missing_dataset_cache,
+        ),
+    )
+
+
+async def _get_best_response_from_steps_async(
+    processing_steps: List[ProcessingStep],
+    dataset: str,
+    config: Optional[str],
+    split: Optional[str],
+    processing_graph: ProcessingGraph,
+    hf_endpoint: str,
+    async_mongo: AsyncMongo,
+    hf_token: Optional[str] = None,
+    hf_timeout_seconds: Optional[float] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+) -> BestResponse:
+    kinds = [processing_step.cache_kind for processing_step in processing_steps]
+    best_response = await async_mongo.get_best_response(kinds=kinds, dataset=dataset, config=config, split=split)
+    if "error_code" in best_response.response and best_response.response["error_code"] == CACHED_RESPONSE_NOT_FOUND:
+        # rare path: it sends several queries, and a request to the Hub, all run in the threads of async_mongo
+        await async_mongo.run(
+            raise_missing_cache_entry_error,
+            processing_steps=processing_steps,
+            dataset=dataset,
+            processing_graph=processing_graph,
+            hf_endpoint=hf_endpoint,
+            hf_token=hf_token,
+            hf_timeout_seconds=hf_timeout_seconds,
+            missing_dataset_cache=missing_dataset_cache,
+        )
+    return best_response
+
+
+def raise_missing_cache_entry_error(
+    processing_steps: List[ProcessingStep],
+    dataset: str,
+    processing_graph: ProcessingGraph,
+    hf_endpoint: str,
+    hf_token: Optional[str] = None,
+    hf_timeout_seconds: Optional[float] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+) -> NoReturn:
+    """Raise the error that explains why no cache entry exists for the processing steps.
+
+    If the dataset has no cache entry at all, and it exists on the Hub, its revision is set (it creates the jobs). If
+    `missing_dataset_cache` is passed, the datasets that don't exist on the Hub, or whose revision has just been set,
+    are not requested to the Hub again until their entry expires.
+
+    Raises:
+        - [`~utils.ResponseNotFoundError`]
+          if the cache entry will not be created.
+        - [`~utils.ResponseNotReadyError`]
+          if the cache entry could be created in the future.
+    """
+    dataset_orchestrator = DatasetOrchestrator(dataset=dataset, processing_graph=processing_graph)
+    if not dataset_orchestrator.has_some_cache():
+        outcome = None if missing_dataset_cache is None else missing_dataset_cache.get(dataset)
+        if outcome == "not_found":
+            raise ResponseNotFoundError("Not found.")
+        if outcome == "revision_set":
+            # the jobs have just been created
             raise ResponseNotReadyError(
                 "The server is busier than usual and the response is not ready yet. Please retry later."
             )
-        elif dataset_orchestrator.has_pending_ancestor_jobs(
-            processing_step_names=[processing_step.name for processing_step in processing_steps]
-        ):
-            # some jobs are still in progress, the cache entries could exist in the future
-            raise ResponseNotReadyError(
-                "The server is busier than usual and the response is not ready yet. Please retry later."
+        # We have to check if the dataset exists and is supported
+        try:
+            revision = get_dataset_git_revision(
+                dataset=dataset,
+                hf_endpoint=hf_endpoint,
+                hf_token=hf_token,
+                hf_timeout_seconds=hf_timeout_seconds,
             )
-        else:
-            # no pending job: the cache entry will not be created
-            raise ResponseNotFoundError("Not found.")
-
-    return best_response.response
+        except Exception as e:
+            # The dataset is not supported
+            if missing_dataset_cache is not None:
+                missing_dataset_cache.set(dataset, "not_found")
+            raise ResponseNotFoundError("Not found.") from e
+        # The dataset is supported, and the revision is known. We set the revision (it will create the jobs)
+        # and tell the user to retry.
+        dataset_orchestrator.set_revision(revision=revision, priority=Priority.NORMAL, error_codes_to_retry=[])
+        if missing_dataset_cache is not None:
+            missing_dataset_cache.set(dataset, "revision_set")
+        raise ResponseNotReadyError(
+            "The server is busier than usual and the response is not ready yet. Please retry later."
+        )
+    elif dataset_orchestrator.has_pending_ancestor_jobs(
+        processing_step_names=[processing_step.name for processing_step in processing_steps]
+    ):
+        # some jobs are still in progress, the cache entries could exist in the future
+        raise ResponseNotReadyError(
+            "The server is busier than usual and the response is not ready yet. Please retry later."
+        )
+    else:
+        # no pending job: the cache entry will not be created
+        raise ResponseNotFoundError("Not found.")
 
 
 # TODO: remove once full scan is implemented for spawning urls scan
@@ -248,14 +409,22 @@ def create_endpoint(
     steps_by_input_type: StepsByInputType,
     processing_graph: ProcessingGraph,
     hf_endpoint: str,
+    async_mongo: AsyncMongo,
     hf_token: Optional[str] = None,
     hf_jwt_public_key: Optional[str] = None,
     hf_jwt_algorithm: Optional[str] = None,
     external_auth_url: Optional[str] = None,
     hf_timeout_seconds: Optional[float] = None,
+    auth_check_cache: Optional[AuthCheckCache] = None,
+    verified_jwt_cache: Optional[VerifiedJwtCache] = None,
+    encoded_response_cache: Optional[EncodedResponseCache] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
     max_age_long: int = 0,
     max_age_short: int = 0,
 ) -> Endpoint:
+    # if no cache is passed, the responses are encoded on every request
+    response_encoder = EncodedResponseCache(max_bytes=0) if encoded_response_cache is None else encoded_response_cache
+
     async def processing_step_endpoint(request: Request) -> Response:
         context = f"endpoint: {endpoint_name}"
         revision: Optional[str] = None
@@ -291,14 +460,41 @@ def create_endpoint(
 
                 # if auth_check fails, it will raise an exception that will be caught below
                 with StepProfiler(method="processing_step_endpoint", step="check authentication", context=context):
-                    auth_check(
+                    await auth_check(
                         dataset,
                         external_auth_url=external_auth_url,
                         request=request,
                         hf_jwt_public_key=hf_jwt_public_key,
                         hf_jwt_algorithm=hf_jwt_algorithm,
                         hf_timeout_seconds=hf_timeout_seconds,
+                        auth_check_cache=auth_check_cache,
+                        verified_jwt_cache=verified_jwt_cache,
                     )
+                if_none_match = request.headers.get("If-None-Match")
+                if if_none_match is not None:
+                    # the client has a copy of the response: only check if it's still the best one, without loading
+                    # the content from the database
+                    with StepProfiler(
+                        method="processing_step_endpoint", step="check if not modified", context=context
+                    ):
+                        best_response_metadata = await async_mongo.get_best_response_metadata(
+                            kinds=[processing_step.cache_kind for processing_step in processing_steps],
+                            dataset=dataset,
+                            config=config,
+                            split=split,
+                        )
+                        metadata = best_response_metadata.response
+                        if metadata["http_status"] == HTTPStatus.OK and best_response_metadata.updated_at is not None:
+                            etag = get_etag(
+                                kind=best_response_metadata.kind,
+                                dataset_git_revision=metadata["dataset_git_revision"],
+                                updated_at=best_response_metadata.updated_at,
+                                job_runner_version=metadata["job_runner_version"],
+                            )
+                            if is_etag_matching(if_none_match=if_none_match, etag=etag):
+                                return get_not_modified_response(
+                                    etag=etag, max_age=max_age_long, revision=metadata["dataset_git_revision"]
+                                )
                 # getting result based on processing steps
                 with StepProfiler(method="processing_step_endpoint", step="get cache entry", context=context):
                     # TODO: remove once full scan is implemented for spawning urls scan
@@ -311,23 +507,44 @@ def create_endpoint(
                             content=HARD_CODED_OPT_IN_OUT_URLS[dataset], max_age=max_age_long, revision=revision
                         )
 
-                    result = get_cache_entry_from_steps(
+                    best_response = await get_best_response_from_steps_async(
                         processing_steps=processing_steps,
                         dataset=dataset,
                         config=config,
                         split=split,
                         processing_graph=processing_graph,
                         hf_endpoint=hf_endpoint,
+                        async_mongo=async_mongo,
                         hf_token=hf_token,
                         hf_timeout_seconds=hf_timeout_seconds,
+                        missing_dataset_cache=missing_dataset_cache,
                     )
+                result = best_response.response
                 content = result["content"]
                 http_status = result["http_status"]
                 error_code = result["error_code"]
                 revision = result["dataset_git_revision"]
                 if http_status == HTTPStatus.OK:
                     with StepProfiler(method="processing_step_endpoint", step="generate OK response", context=context):
-                        return get_json_ok_response(content=content, max_age=max_age_long, revision=revision)
+                        body, content_encoding = response_encoder.get(
+                            key=(endpoint_name, dataset, config, split),
+                            content=content,
+                            accept_encoding=request.headers.get("Accept-Encoding"),
+                        )
+                        return get_encoded_json_ok_response(
+                            body=body,
+                            content_encoding=content_encoding,
+                            max_age=max_age_long,
+                            revision=revision,
+                            etag=None
+                            if best_response.updated_at is None
+                            else get_etag(
+                                kind=best_response.kind,
+                                dataset_git_revision=revision,
+                                updated_at=best_response.updated_at,
+                                job_runner_version=result["job_runner_version"],
+                            ),
+                        )
 
                 with StepProfiler(method="processing_step_endpoint", step="generate error response", context=context):
                     return get_json_error_response(
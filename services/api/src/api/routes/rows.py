@@ -6,16 +6,23 @@ import logging
 import os
 import random
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache, partial
 from itertools import islice
 from os import PathLike
+from threading import Lock
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
     Callable,
+    Dict,
     List,
     Literal,
     Mapping,
+    NamedTuple,
     Optional,
     Tuple,
     TypedDict,
@@ -32,17 +39,45 @@ from huggingface_hub import HfFileSystem
 from huggingface_hub.hf_file_system import safe_quote
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.prometheus import StepProfiler
+from libcommon.simple_cache import BestResponseCache, CacheEntry
+from libcommon.utils import orjson_dumps
 from libcommon.viewer_utils.asset import (
     glob_rows_in_assets_dir,
     update_last_modified_date_of_rows_in_assets_dir,
 )
-from libcommon.viewer_utils.features import get_cell_value
+from libcommon.viewer_utils.features import transform_rows, transform_table
+from libcommon.viewer_utils.parquet_metadata import load_row_groups_index
 from starlette.requests import Request
 from starlette.responses import Response
 from tqdm.contrib.concurrent import thread_map
 
-from api.authentication import auth_check
+from api.authentication import AuthCheckCache, auth_check
+from api.config import (
+    ROWS_INDEX_CACHE_MAX_BYTES,
+    ROWS_READ_AHEAD_MAX_BYTES,
+    ROWS_READ_AHEAD_MAX_TASKS,
+    ROWS_THREAD_POOL_MAX_INDEX_TASKS,
+    ROWS_THREAD_POOL_MAX_QUERY_TASKS,
+    ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS,
+    ROWS_THREAD_POOL_MAX_WORKERS,
+)
+from api.jwt_token import VerifiedJwtCache
+from api.memory_cache import MemoryCache
+from api.missing_dataset_cache import MissingDatasetCache
+from api.parquet_metadata_cache import read_parquet_metadata
+from api.range_reads import (
+    ByteRange,
+    fetch_ranges,
+    get_column_chunk_ranges,
+    get_column_chunk_ranges_from_index,
+    get_column_ids,
+    merge_ranges,
+)
+from api.read_ahead import ReadAhead
 from api.routes.endpoint import get_cache_entry_from_steps
+from api.row_groups_cache import RowGroupKey, RowGroupsCache
+from api.single_flight import SingleFlight
+from api.thread_pool import ThreadPoolStage
 from api.utils import (
     ApiCustomError,
     Endpoint,
@@ -50,8 +85,10 @@ from api.utils import (
     MissingRequiredParameterError,
     UnexpectedError,
     are_valid_parameters,
+    get_bytes_ok_response,
     get_json_api_error_response,
     get_json_ok_response,
+    get_streaming_ok_response,
 )
 
 logger = logging.getLogger(__name__)
@@ -62,6 +99,23 @@ session = asyncio.run(httpfs.set_session())
 
 
 MAX_ROWS = 100
+# maximum number of ranges of rows in a batch request (POST), every range being limited to MAX_ROWS rows
+MAX_BATCH_RANGES = 20
+
+# the response format is negotiated with the Accept header (JSON by default)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+RowsFormat = Literal["json", "ndjson", "arrow"]
+# in NDJSON, the rows are transformed and sent by batches of NDJSON_BATCH_SIZE rows
+NDJSON_BATCH_SIZE = 10
+
+# row groups bigger than this (compressed size of their column chunks) are not read entirely: only the pages up to the
+# last requested row are fetched, by streaming the column chunks with a read buffer of PARTIAL_READ_BUFFER_SIZE bytes
+PARTIAL_READ_MIN_ROW_GROUP_BYTES = 50_000_000
+PARTIAL_READ_BUFFER_SIZE = 1_000_000
+
+# number of sequential accesses followed by every rows index, to detect that the next page will be requested
+READ_AHEAD_MAX_SEQUENCES = 16
 
 PARQUET_REVISION = "refs/convert/parquet"
 
@@ -105,7 +159,7 @@ class ParquetFileMetadataItem(TypedDict):
     parquet_metadata_subpath: str
 
 
-# TODO: how to invalidate the cache when the parquet branch is created or deleted?
+# the listings cached by the filesystem are invalidated by the Indexer when the dataset git revision changes
 @lru_cache(maxsize=128)
 def get_hf_fs(hf_token: Optional[str]) -> HfFileSystem:
     """Get the Hugging Face filesystem.
@@ -154,15 +208,81 @@ def get_supported_unsupported_columns(features: Features, dataset_name: str) ->
     return supported_columns, unsupported_columns
 
 
+def get_row_group_reader(
+    parquet_file: pq.ParquetFile, key: RowGroupKey, row_groups_cache: Optional[RowGroupsCache]
+) -> Callable[..., pa.Table]:
+    """Get a function that reads the row group, restricted to the columns of the key.
+
+    The function accepts an optional `columns` argument, to read another set of columns. The columns are part of the
+    key of the row groups cache.
+    """
+
+    def read(columns: Optional[List[str]] = None) -> pa.Table:
+        row_group_key = key if columns is None else key._replace(columns=tuple(columns))
+        reader = partial(
+            parquet_file.read_row_group, i=row_group_key.row_group_id, columns=list(row_group_key.columns)
+        )
+        if row_groups_cache is None:
+            return reader()
+        return row_groups_cache.read(key=row_group_key, reader=reader)
+
+    return read
+
+
+def get_row_group_compressed_size(row_group_metadata: pq.RowGroupMetaData) -> int:
+    return sum(row_group_metadata.column(i).total_compressed_size for i in range(row_group_metadata.num_columns))
+
+
+def read_row_group_head(
+    source: Any,
+    metadata: pq.FileMetaData,
+    row_group_id: int,
+    columns: List[str],
+    num_rows: int,
+    buffer_size: int = PARTIAL_READ_BUFFER_SIZE,
+) -> pa.Table:
+    """Read the first rows of a row group, without fetching the whole row group.
+
+    The column chunks are streamed with a read buffer, and the reading stops as soon as the requested number of rows
+    has been decoded. Only the pages up to the last requested row (plus the read buffer) are fetched.
+
+    Args:
+        source (Any): The parquet file (path or file-like object).
+        metadata (pq.FileMetaData): The metadata of the parquet file.
+        row_group_id (int): The index of the row group in the parquet file.
+        columns (List[str]): The columns to read.
+        num_rows (int): The number of rows to read, from the start of the row group. Must be positive.
+        buffer_size (int): The size of the read buffer, in bytes.
+
+    Returns:
+        pa.Table: The first `num_rows` rows of the row group.
+    """
+    parquet_file = pq.ParquetFile(source, metadata=metadata, buffer_size=buffer_size)
+    batches: List[pa.RecordBatch] = []
+    read_rows = 0
+    for batch in parquet_file.iter_batches(batch_size=num_rows, row_groups=[row_group_id], columns=columns):
+        batches.append(batch)
+        read_rows += batch.num_rows
+        if read_rows >= num_rows:
+            break
+    return pa.Table.from_batches(batches).slice(0, num_rows)
+
+
 @dataclass
 class ParquetIndexWithoutMetadata:
     features: Features
     supported_columns: List[str]
     unsupported_columns: List[str]
     row_group_offsets: npt.NDArray[np.int64]
-    row_group_readers: List[Callable[[], pa.Table]]
+    row_group_readers: List[Callable[..., pa.Table]]
+    metadata_nbytes: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the index, dominated by the parquet metadata held by the readers."""
+        return self.row_group_offsets.nbytes + self.metadata_nbytes
 
-    def query(self, offset: int, length: int) -> pa.Table:
+    def query(self, offset: int, length: int, columns: Optional[List[str]] = None) -> pa.Table:
         """Query the parquet files
 
         Note that this implementation will always read at least one row group, to get the list of columns and always
@@ -171,30 +291,62 @@ class ParquetIndexWithoutMetadata:
         Args:
             offset (int): The first row to read.
             length (int): The number of rows to read.
+            columns (List[str], optional): The columns to read, among the supported columns. If None, all the
+              supported columns are read.
 
         Returns:
             pa.Table: The requested rows.
         """
+        return self.query_ranges([(offset, length)], columns=columns)[0]
+
+    def query_ranges(self, ranges: List[Tuple[int, int]], columns: Optional[List[str]] = None) -> List[pa.Table]:
+        """Query several ranges of rows of the parquet files at once
+
+        The row groups that contain the rows of several ranges are read only once. See `query` for the details.
+
+        Args:
+            ranges (List[Tuple[int, int]]): The ranges of rows to read, as (offset, length). Must not be empty.
+            columns (List[str], optional): The columns to read, among the supported columns. If None, all the
+              supported columns are read.
+
+        Returns:
+            List[pa.Table]: The requested rows, for every range.
+        """
         if (len(self.row_group_offsets) == 0) or (len(self.row_group_readers) == 0):
             raise ParquetResponseEmptyError("No parquet files found.")
         last_row_in_parquet = self.row_group_offsets[-1] - 1
-        first_row = min(offset, last_row_in_parquet)
-        last_row = min(offset + length - 1, last_row_in_parquet)
-        first_row_group_id, last_row_group_id = np.searchsorted(
-            self.row_group_offsets, [first_row, last_row], side="right"
-        )
-        pa_table = pa.concat_tables(
-            [self.row_group_readers[i]() for i in range(first_row_group_id, last_row_group_id + 1)]
-        )
-        first_row_in_pa_table = self.row_group_offsets[first_row_group_id - 1] if first_row_group_id > 0 else 0
-        return pa_table.slice(offset - first_row_in_pa_table, length)
+        row_group_ids_by_range: List[range] = []
+        for offset, length in ranges:
+            first_row = min(offset, last_row_in_parquet)
+            last_row = max(first_row, min(offset + length - 1, last_row_in_parquet))
+            first_row_group_id, last_row_group_id = np.searchsorted(
+                self.row_group_offsets, [first_row, last_row], side="right"
+            )
+            row_group_ids_by_range.append(range(int(first_row_group_id), int(last_row_group_id) + 1))
+        row_group_tables = {
+            i: self.row_group_readers[i](columns=columns)
+            for i in sorted({i for row_group_ids in row_group_ids_by_range for i in row_group_ids})
+        }
+        pa_tables: List[pa.Table] = []
+        for (offset, length), row_group_ids in zip(ranges, row_group_ids_by_range):
+            pa_table = pa.concat_tables([row_group_tables[i] for i in row_group_ids])
+            first_row_in_pa_table = self.row_group_offsets[row_group_ids[0] - 1] if row_group_ids[0] > 0 else 0
+            pa_tables.append(pa_table.slice(offset - first_row_in_pa_table, length))
+        return pa_tables
 
     @staticmethod
     def from_parquet_file_items(
-        parquet_file_items: List[ParquetFileItem], dataset: str, config: str, split: str, hf_token: Optional[str]
+        parquet_file_items: List[ParquetFileItem],
+        dataset: str,
+        config: str,
+        split: str,
+        hf_token: Optional[str],
+        revision: Optional[str] = None,
+        row_groups_cache: Optional[RowGroupsCache] = None,
     ) -> "ParquetIndexWithoutMetadata":
         try:
-            sources = sorted(f"{config}/{parquet_file['filename']}" for parquet_file in parquet_file_items)
+            filenames = sorted(parquet_file["filename"] for parquet_file in parquet_file_items)
+            sources = [f"{config}/{filename}" for filename in filenames]
         except Exception as e:
             raise ParquetResponseFormatError(f"Could not parse the list of parquet files: {e}") from e
         logging.debug(
@@ -227,9 +379,21 @@ class ParquetIndexWithoutMetadata:
                 ]
             )
         with StepProfiler(method="rows.index.without_metadata", step="create the row group readers"):
-            row_group_readers: List[Callable[[], pa.Table]] = [
-                partial(parquet_file.read_row_group, i=group_id, columns=supported_columns)
-                for parquet_file in parquet_files
+            row_group_readers = [
+                get_row_group_reader(
+                    parquet_file=parquet_file,
+                    key=RowGroupKey(
+                        dataset=dataset,
+                        revision=revision,
+                        config=config,
+                        split=split,
+                        filename=filename,
+                        row_group_id=group_id,
+                        columns=tuple(supported_columns),
+                    ),
+                    row_groups_cache=row_groups_cache,
+                )
+                for filename, parquet_file in zip(filenames, parquet_files)
                 for group_id in range(parquet_file.metadata.num_row_groups)
             ]
         return ParquetIndexWithoutMetadata(
@@ -238,6 +402,7 @@ class ParquetIndexWithoutMetadata:
             unsupported_columns=unsupported_columns,
             row_group_offsets=row_group_offsets,
             row_group_readers=row_group_readers,
+            metadata_nbytes=sum(parquet_file.metadata.serialized_size for parquet_file in parquet_files),
         )
 
 
@@ -247,90 +412,263 @@ class ParquetIndexWithMetadata:
     supported_columns: List[str]
     unsupported_columns: List[str]
     parquet_files_urls: List[str]
+    filenames: List[str]
     metadata_paths: List[str]
     num_bytes: List[int]
     num_rows: List[int]
     hf_token: Optional[str]
-
-    def query(self, offset: int, length: int) -> pa.Table:
+    dataset: str
+    config: str
+    split: str
+    revision: Optional[str] = None
+    row_groups_cache: Optional[RowGroupsCache] = None
+    row_groups_index: Optional[npt.NDArray[np.void]] = None
+    supported_column_ids: Optional[List[int]] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the index: the URLs and paths of the files, and the number of rows. The
+        parsed parquet metadata are not counted, since they are held, and accounted for, by the process-wide parquet
+        metadata cache (see `read_parquet_metadata`). The row groups index is memory-mapped."""
+        return sum(
+            len(url) + len(metadata_path) for url, metadata_path in zip(self.parquet_files_urls, self.metadata_paths)
+        ) + 16 * len(self.num_rows)
+
+    def query(self, offset: int, length: int, columns: Optional[List[str]] = None) -> pa.Table:
         """Query the parquet files
 
         Note that this implementation will always read at least one row group, to get the list of columns and always
         have the same schema, even if the requested rows are invalid (out of range).
 
+        Only the column chunks of the requested columns are fetched.
+
+        The row groups bigger than PARTIAL_READ_MIN_ROW_GROUP_BYTES are not read entirely (nor stored in the row
+        groups cache): only their pages up to the last requested row are fetched. Note that the pages before the first
+        requested row still have to be read, since the parquet files have no page index.
+
+        If the split has a row groups index, the row groups and the byte ranges of their column chunks are looked up
+        in it, instead of being computed from the parquet metadata. The parquet metadata is still needed to decode the
+        row groups.
+
         Args:
             offset (int): The first row to read.
             length (int): The number of rows to read.
+            columns (List[str], optional): The columns to read, among the supported columns. If None, all the
+              supported columns are read.
 
         Returns:
             pa.Table: The requested rows.
         """
+        return self.query_ranges([(offset, length)], columns=columns)[0]
+
+    def query_ranges(self, ranges: List[Tuple[int, int]], columns: Optional[List[str]] = None) -> List[pa.Table]:
+        """Query several ranges of rows of the parquet files at once
+
+        The parquet files and the row groups are loaded only once, even if they contain the rows of several ranges,
+        and the column chunks of all the ranges are fetched together. See `query` for the details.
+
+        Args:
+            ranges (List[Tuple[int, int]]): The ranges of rows to read, as (offset, length). Must not be empty.
+            columns (List[str], optional): The columns to read, among the supported columns. If None, all the
+              supported columns are read.
+
+        Returns:
+            List[pa.Table]: The requested rows, for every range.
+        """
+        if columns is None:
+            columns = self.supported_columns
         with StepProfiler(
             method="rows.query.with_metadata", step="get the parquet files than contain the requested rows"
         ):
             parquet_file_offsets = np.cumsum(self.num_rows)
-
             last_row_in_parquet = parquet_file_offsets[-1] - 1
-            first_row = min(offset, last_row_in_parquet)
-            last_row = min(offset + length - 1, last_row_in_parquet)
-            first_parquet_file_id, last_parquet_file_id = np.searchsorted(
-                parquet_file_offsets, [first_row, last_row], side="right"
-            )
-            parquet_offset = (
-                offset - parquet_file_offsets[first_parquet_file_id - 1] if first_parquet_file_id > 0 else offset
+            # the first and last rows to read for every range, so that at least one row group is read
+            row_spans: List[Tuple[int, int]] = []
+            for offset, length in ranges:
+                first_row = min(offset, last_row_in_parquet)
+                row_spans.append((first_row, max(first_row, min(offset + length - 1, last_row_in_parquet))))
+            parquet_file_ids: List[int] = sorted(
+                {
+                    parquet_file_id
+                    for first_row, last_row in row_spans
+                    for parquet_file_id in range(
+                        int(np.searchsorted(parquet_file_offsets, first_row, side="right")),
+                        int(np.searchsorted(parquet_file_offsets, last_row, side="right")) + 1,
+                    )
+                }
             )
-            urls = self.parquet_files_urls[first_parquet_file_id : last_parquet_file_id + 1]  # noqa: E203
-            metadata_paths = self.metadata_paths[first_parquet_file_id : last_parquet_file_id + 1]  # noqa: E203
-            num_bytes = self.num_bytes[first_parquet_file_id : last_parquet_file_id + 1]  # noqa: E203
+            filenames = [self.filenames[parquet_file_id] for parquet_file_id in parquet_file_ids]
 
-        with StepProfiler(
-            method="rows.query.with_metadata", step="load the remote parquet files using metadata from disk"
-        ):
-            parquet_files = [
-                pq.ParquetFile(
-                    HTTPFile(httpfs, url, session=session, size=size, loop=httpfs.loop, cache_type=None),
-                    metadata=pq.read_metadata(metadata_path),
-                    pre_buffer=True,
+        with StepProfiler(method="rows.query.with_metadata", step="load the parquet metadata"):
+            parquet_files_metadata = [
+                read_parquet_metadata(self.metadata_paths[parquet_file_id]) for parquet_file_id in parquet_file_ids
+            ]
+            metadatas = [parquet_file_metadata.metadata for parquet_file_metadata in parquet_files_metadata]
+            sources = [
+                HTTPFile(
+                    httpfs,
+                    self.parquet_files_urls[parquet_file_id],
+                    session=session,
+                    size=self.num_bytes[parquet_file_id],
+                    loop=httpfs.loop,
+                    cache_type=None,
                 )
-                for url, metadata_path, size in zip(urls, metadata_paths, num_bytes)
+                for parquet_file_id in parquet_file_ids
             ]
 
         with StepProfiler(
             method="rows.query.with_metadata", step="get the row groups than contain the requested rows"
         ):
-            row_group_offsets = np.cumsum(
-                [
-                    parquet_file.metadata.row_group(group_id).num_rows
-                    for parquet_file in parquet_files
-                    for group_id in range(parquet_file.metadata.num_row_groups)
+            # the row groups of the loaded files, in order: their first and last+1 rows in the split, and their
+            # location (index of the loaded parquet file, index of the row group in the parquet file)
+            row_groups_index: Optional[npt.NDArray[np.void]] = None
+            if self.row_groups_index is not None:
+                # the row groups of a file are contiguous in the index of the split
+                first_index_ids = np.searchsorted(self.row_groups_index["file_id"], parquet_file_ids, side="left")
+                last_index_ids = np.searchsorted(self.row_groups_index["file_id"], parquet_file_ids, side="right")
+                selected_row_groups_index: npt.NDArray[np.void] = np.concatenate(
+                    [
+                        self.row_groups_index[first_index_id:last_index_id]
+                        for first_index_id, last_index_id in zip(first_index_ids, last_index_ids)
+                    ]
+                )
+                row_group_starts = selected_row_groups_index["first_row"]
+                row_group_ends = selected_row_groups_index["first_row"] + selected_row_groups_index["num_rows"]
+                row_group_file_ids = np.searchsorted(parquet_file_ids, selected_row_groups_index["file_id"])
+                row_group_ids_in_files = selected_row_groups_index["row_group_id"]
+                row_groups_index = selected_row_groups_index
+            else:
+                # the row group offsets of every parquet file are precomputed, shift them by the rows of the previous
+                # files
+                first_rows_of_files = [
+                    parquet_file_offsets[parquet_file_id - 1] if parquet_file_id > 0 else 0
+                    for parquet_file_id in parquet_file_ids
                 ]
+                row_group_ends = np.concatenate(
+                    [
+                        parquet_file_metadata.row_group_offsets + first_row_of_file
+                        for parquet_file_metadata, first_row_of_file in zip(
+                            parquet_files_metadata, first_rows_of_files
+                        )
+                    ]
+                )
+                row_group_starts = np.concatenate(
+                    [
+                        np.concatenate([[0], parquet_file_metadata.row_group_offsets[:-1]]) + first_row_of_file
+                        for parquet_file_metadata, first_row_of_file in zip(
+                            parquet_files_metadata, first_rows_of_files
+                        )
+                    ]
+                )
+                row_group_file_ids = np.concatenate(
+                    [np.full(metadata.num_row_groups, file_id) for file_id, metadata in enumerate(metadatas)]
+                )
+                row_group_ids_in_files = np.concatenate([np.arange(metadata.num_row_groups) for metadata in metadatas])
+
+            # the row groups of every range, and the number of rows to read from every row group (only the first
+            # rows of the row groups that are read partially are decoded)
+            row_group_ids_by_range: List[range] = []
+            num_rows_to_read: Dict[int, int] = {}
+            for first_row, last_row in row_spans:
+                first_row_group_id, last_row_group_id = np.searchsorted(
+                    row_group_ends, [first_row, last_row], side="right"
+                )
+                row_group_ids = range(int(first_row_group_id), int(last_row_group_id) + 1)
+                row_group_ids_by_range.append(row_group_ids)
+                for i in row_group_ids:
+                    num_rows_to_read[i] = max(
+                        num_rows_to_read.get(i, 0),
+                        int(min(row_group_ends[i], last_row + 1) - row_group_starts[i]),
+                    )
+            row_group_locations: Dict[int, Tuple[int, int]] = {
+                i: (int(row_group_file_ids[i]), int(row_group_ids_in_files[i])) for i in num_rows_to_read
+            }
+            row_group_keys = {
+                i: RowGroupKey(
+                    dataset=self.dataset,
+                    revision=self.revision,
+                    config=self.config,
+                    split=self.split,
+                    filename=filenames[file_id],
+                    row_group_id=group_id,
+                    columns=tuple(columns),
+                )
+                for i, (file_id, group_id) in row_group_locations.items()
+            }
+            partially_read_row_group_ids = {
+                i
+                for i, (file_id, group_id) in row_group_locations.items()
+                if (
+                    int(row_groups_index["column_chunk_sizes"][i].sum())
+                    if row_groups_index is not None
+                    else get_row_group_compressed_size(metadatas[file_id].row_group(group_id))
+                )
+                >= PARTIAL_READ_MIN_ROW_GROUP_BYTES
+            }
+
+        with StepProfiler(method="rows.query.with_metadata", step="fetch the column chunks"):
+            # fetch the column chunks of all the row groups that will be read entirely (and are not in the row groups
+            # cache) at once: the close byte ranges are merged, and the requests are sent concurrently
+            fetched_row_group_ids_by_file_id: List[List[int]] = [[] for _ in metadatas]
+            for i in sorted(row_group_locations):
+                if i in partially_read_row_group_ids or (
+                    self.row_groups_cache is not None and self.row_groups_cache.has(row_group_keys[i])
+                ):
+                    continue
+                fetched_row_group_ids_by_file_id[row_group_locations[i][0]].append(i)
+            sources_and_ranges: List[Tuple[Any, List[ByteRange]]] = []
+            column_ids = (
+                self.supported_column_ids
+                if columns == self.supported_columns
+                else get_column_ids(metadatas[0].schema, columns)
             )
-            row_group_readers: List[Callable[[], pa.Table]] = [
-                partial(parquet_file.read_row_group, i=group_id, columns=self.supported_columns)
-                for parquet_file in parquet_files
-                for group_id in range(parquet_file.metadata.num_row_groups)
+            for source, metadata, ids in zip(sources, metadatas, fetched_row_group_ids_by_file_id):
+                if row_groups_index is not None and column_ids is not None:
+                    ranges_in_file = get_column_chunk_ranges_from_index(row_groups_index[ids], column_ids=column_ids)
+                else:
+                    ranges_in_file = get_column_chunk_ranges(
+                        metadata=metadata,
+                        row_group_ids=[row_group_locations[i][1] for i in ids],
+                        columns=columns,
+                    )
+                sources_and_ranges.append((source, merge_ranges(ranges_in_file)))
+            ranges_files = fetch_ranges(sources_and_ranges)
+            parquet_files = [
+                pq.ParquetFile(ranges_file, metadata=metadata)
+                for ranges_file, metadata in zip(ranges_files, metadatas)
             ]
 
-            last_row_in_parquet = row_group_offsets[-1] - 1
-            first_row = min(parquet_offset, last_row_in_parquet)
-            last_row = min(parquet_offset + length - 1, last_row_in_parquet)
-
-            first_row_group_id, last_row_group_id = np.searchsorted(
-                row_group_offsets, [first_row, last_row], side="right"
-            )
-
         with StepProfiler(method="rows.query.with_metadata", step="read the row groups"):
-            pa_table = pa.concat_tables(
-                [row_group_readers[i]() for i in range(first_row_group_id, last_row_group_id + 1)]
-            )
-            first_row_in_pa_table = row_group_offsets[first_row_group_id - 1] if first_row_group_id > 0 else 0
-            return pa_table.slice(parquet_offset - first_row_in_pa_table, length)
+            row_group_tables: Dict[int, pa.Table] = {}
+            for i, (file_id, group_id) in sorted(row_group_locations.items()):
+                if i in partially_read_row_group_ids:
+                    row_group_tables[i] = read_row_group_head(
+                        sources[file_id],
+                        metadata=metadatas[file_id],
+                        row_group_id=group_id,
+                        columns=columns,
+                        num_rows=num_rows_to_read[i],
+                    )
+                else:
+                    row_group_tables[i] = get_row_group_reader(
+                        parquet_file=parquet_files[file_id],
+                        key=row_group_keys[i],
+                        row_groups_cache=self.row_groups_cache,
+                    )()
+            pa_tables: List[pa.Table] = []
+            for (offset, length), row_group_ids in zip(ranges, row_group_ids_by_range):
+                pa_table = pa.concat_tables([row_group_tables[i] for i in row_group_ids])
+                pa_tables.append(pa_table.slice(offset - row_group_starts[row_group_ids[0]], length))
+            return pa_tables
 
     @staticmethod
     def from_parquet_metadata_items(
         parquet_file_metadata_items: List[ParquetFileMetadataItem],
         parquet_metadata_directory: StrPath,
         hf_token: Optional[str],
+        revision: Optional[str] = None,
+        row_groups_cache: Optional[RowGroupsCache] = None,
+        row_groups_index_subpath: Optional[str] = None,
     ) -> "ParquetIndexWithMetadata":
         if not parquet_file_metadata_items:
             raise ParquetResponseEmptyError("No parquet files found.")
@@ -341,6 +679,7 @@ class ParquetIndexWithMetadata:
                     parquet_file_metadata_items, key=lambda parquet_file_metadata: parquet_file_metadata["filename"]
                 )
                 parquet_files_urls = [parquet_file_metadata["url"] for parquet_file_metadata in parquet_files_metadata]
+                filenames = [parquet_file_metadata["filename"] for parquet_file_metadata in parquet_files_metadata]
                 metadata_paths = [
                     os.path.join(parquet_metadata_directory, parquet_file_metadata["parquet_metadata_subpath"])
                     for parquet_file_metadata in parquet_files_metadata
@@ -348,26 +687,97 @@ class ParquetIndexWithMetadata:
                 num_bytes = [parquet_file_metadata["size"] for parquet_file_metadata in parquet_files_metadata]
                 num_rows = [parquet_file_metadata["num_rows"] for parquet_file_metadata in parquet_files_metadata]
                 dataset_name = parquet_files_metadata[0]["dataset"]
+                config = parquet_files_metadata[0]["config"]
+                split = parquet_files_metadata[0]["split"]
             except Exception as e:
                 raise ParquetResponseFormatError(f"Could not parse the list of parquet files: {e}") from e
 
         with StepProfiler(method="rows.index.with_metadata", step="get the dataset's features"):
-            features = Features.from_arrow_schema(pq.read_schema(metadata_paths[0]))
+            parquet_schema = read_parquet_metadata(metadata_paths[0]).metadata.schema
+            features = Features.from_arrow_schema(parquet_schema.to_arrow_schema())
             supported_columns, unsupported_columns = get_supported_unsupported_columns(
                 features, dataset_name=dataset_name
             )
+
+        row_groups_index: Optional[npt.NDArray[np.void]] = None
+        if row_groups_index_subpath is not None:
+            with StepProfiler(method="rows.index.with_metadata", step="load the row groups index"):
+                row_groups_index = load_row_groups_index(
+                    os.path.join(parquet_metadata_directory, row_groups_index_subpath)
+                )
+                # the index must describe the same parquet files, in the same order
+                if (
+                    len(row_groups_index) == 0
+                    or int(row_groups_index["first_row"][-1] + row_groups_index["num_rows"][-1]) != sum(num_rows)
+                    or int(row_groups_index["file_id"][-1]) != len(filenames) - 1
+                    or row_groups_index["column_chunk_offsets"].shape[1] != len(parquet_schema)
+                ):
+                    logging.warning(
+                        f"The row groups index of {dataset_name=} {config=} {split=} does not match the parquet"
+                        " files, and is ignored."
+                    )
+                    row_groups_index = None
         return ParquetIndexWithMetadata(
             features=features,
             supported_columns=supported_columns,
             unsupported_columns=unsupported_columns,
             parquet_files_urls=parquet_files_urls,
+            filenames=filenames,
             metadata_paths=metadata_paths,
             num_bytes=num_bytes,
             num_rows=num_rows,
             hf_token=hf_token,
+            dataset=dataset_name,
+            config=config,
+            split=split,
+            revision=revision,
+            row_groups_cache=row_groups_cache,
+            row_groups_index=row_groups_index,
+            supported_column_ids=get_column_ids(parquet_schema, supported_columns),
         )
 
 
+def get_config_parquet_cache_entry(
+    dataset: str,
+    config: str,
+    processing_graph: ProcessingGraph,
+    hf_endpoint: str,
+    hf_token: Optional[str],
+    best_response_cache: Optional[BestResponseCache] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+) -> CacheEntry:
+    """Get the cache entry that lists the parquet files of a config.
+
+    Raises:
+        - [`~utils.ApiCustomError`]: if the cache entry is not found or not ready.
+        - [`~utils.UnexpectedError`]: on any other error.
+
+    Returns:
+        CacheEntry: The cache entry, with the list of parquet files and the dataset git revision.
+    """
+    config_parquet_processing_steps = processing_graph.get_config_parquet_processing_steps()
+    config_parquet_metadata_processing_steps = processing_graph.get_config_parquet_metadata_processing_steps()
+    if not config_parquet_processing_steps:
+        raise RuntimeError("No processing steps are configured to provide a config's parquet response.")
+    try:
+        return get_cache_entry_from_steps(
+            processing_steps=config_parquet_metadata_processing_steps + config_parquet_processing_steps,
+            dataset=dataset,
+            config=config,
+            split=None,
+            processing_graph=processing_graph,
+            hf_endpoint=hf_endpoint,
+            hf_token=hf_token,
+            best_response_cache=best_response_cache,
+            missing_dataset_cache=missing_dataset_cache,
+        )
+    except ApiCustomError as e:
+        raise e
+    except Exception as e:
+        raise UnexpectedError("Could not get the list of parquet files to fetch the rows from.") from e
+        # ^ TODO: improve the error, depending on the case
+
+
 class RowsIndex:
     def __init__(
         self,
@@ -378,16 +788,25 @@ class RowsIndex:
         hf_endpoint: str,
         hf_token: Optional[str],
         parquet_metadata_directory: StrPath,
+        row_groups_cache: Optional[RowGroupsCache] = None,
+        cache_entry: Optional[CacheEntry] = None,
+        query_cache: Optional[MemoryCache[Tuple[Any, ...], Any]] = None,
     ):
         self.dataset = dataset
         self.revision: Optional[str] = None
         self.config = config
         self.split = split
         self.processing_graph = processing_graph
+        self.row_groups_cache = row_groups_cache
+        self.query_cache = query_cache
+        # the offsets that would continue the recent accesses: (offset, length, columns)
+        self._next_accesses: "OrderedDict[Tuple[int, int, Optional[Tuple[str, ...]]], None]" = OrderedDict()
+        self._next_accesses_lock = Lock()
         self.parquet_index = self._init_parquet_index(
             hf_endpoint=hf_endpoint,
             hf_token=hf_token,
             parquet_metadata_directory=parquet_metadata_directory,
+            cache_entry=cache_entry,
         )
 
     def _init_parquet_index(
@@ -395,33 +814,21 @@ class RowsIndex:
         hf_endpoint: str,
         hf_token: Optional[str],
         parquet_metadata_directory: StrPath,
+        cache_entry: Optional[CacheEntry] = None,
     ) -> Union[ParquetIndexWithMetadata, ParquetIndexWithoutMetadata]:
         with StepProfiler(method="rows.index", step="all"):
             # get the list of parquet files
             with StepProfiler(method="rows.index", step="get list of parquet files for split"):
-                config_parquet_processing_steps = self.processing_graph.get_config_parquet_processing_steps()
-                config_parquet_metadata_processing_steps = (
-                    self.processing_graph.get_config_parquet_metadata_processing_steps()
-                )
-                if not config_parquet_processing_steps:
-                    raise RuntimeError("No processing steps are configured to provide a config's parquet response.")
-                try:
-                    result = get_cache_entry_from_steps(
-                        processing_steps=config_parquet_metadata_processing_steps + config_parquet_processing_steps,
+                if cache_entry is None:
+                    cache_entry = get_config_parquet_cache_entry(
                         dataset=self.dataset,
                         config=self.config,
-                        split=None,
                         processing_graph=self.processing_graph,
                         hf_endpoint=hf_endpoint,
                         hf_token=hf_token,
                     )
-                    self.revision = result["dataset_git_revision"]
-                    content = result["content"]
-                except ApiCustomError as e:
-                    raise e
-                except Exception as e:
-                    raise UnexpectedError("Could not get the list of parquet files to fetch the rows from.") from e
-                    # ^ TODO: improve the error, depending on the case
+                self.revision = cache_entry["dataset_git_revision"]
+                content = cache_entry["content"]
             if content and "parquet_files" in content:
                 return ParquetIndexWithoutMetadata.from_parquet_file_items(
                     [
@@ -433,8 +840,16 @@ class RowsIndex:
                     config=self.config,
                     split=self.split,
                     hf_token=hf_token,
+                    revision=self.revision,
+                    row_groups_cache=self.row_groups_cache,
                 )
             else:
+                # the row groups indexes are created since version 2 of the config-parquet-metadata step
+                row_groups_index_subpaths = [
+                    row_groups_index_item["row_groups_index_subpath"]
+                    for row_groups_index_item in content.get("row_groups_indexes", [])
+                    if row_groups_index_item["split"] == self.split and row_groups_index_item["config"] == self.config
+                ]
                 return ParquetIndexWithMetadata.from_parquet_metadata_items(
                     [
                         parquet_item
@@ -443,55 +858,192 @@ class RowsIndex:
                     ],
                     parquet_metadata_directory=parquet_metadata_directory,
                     hf_token=hf_token,
+                    revision=self.revision,
+                    row_groups_cache=self.row_groups_cache,
+                    row_groups_index_subpath=row_groups_index_subpaths[0] if row_groups_index_subpaths else None,
                 )
 
-    # note that this cache size is global for the class, not per instance
-    @lru_cache(maxsize=1024)
-    def query(self, offset: int, length: int) -> pa.Table:
+    def get_projection(self, columns: List[str]) -> Tuple[Features, Optional[List[str]]]:
+        """Restrict the features to the requested columns.
+
+        Raises:
+            - [`~utils.InvalidParameterError`]: if a column is not in the features.
+
+        Args:
+            columns (List[str]): The requested columns. If empty, all the columns are returned.
+
+        Returns:
+            Tuple[Features, Optional[List[str]]]: The features of the requested columns, and the supported columns to
+              read (None if all the columns are requested).
+        """
+        features = self.parquet_index.features
+        if not columns:
+            return features, None
+        unknown_columns = [column for column in columns if column not in features]
+        if unknown_columns:
+            raise InvalidParameterError(f"Unknown columns: {', '.join(unknown_columns)}")
+        supported_columns = [column for column in self.parquet_index.supported_columns if column in columns]
+        if not supported_columns:
+            # read at least one column, to get the number of rows (the column is not returned)
+            supported_columns = self.parquet_index.supported_columns[:1]
+        return (
+            Features({column: feature for column, feature in features.items() if column in columns}),
+            supported_columns,
+        )
+
+    def is_sequential_access(self, offset: int, length: int, columns: Optional[List[str]] = None) -> bool:
+        """Record an access to the rows, and tell if it continues a previous one (i.e. it is the next page).
+
+        The last READ_AHEAD_MAX_SEQUENCES accesses are followed, so that several clients can page through the split
+        at the same time.
+
+        Args:
+            offset (int): The first row requested.
+            length (int): The number of rows requested.
+            columns (List[str], optional): The columns requested (see `get_projection`).
+
+        Returns:
+            bool: True if the previous page, with the same length and columns, has been requested recently.
+        """
+        columns_key = None if columns is None else tuple(columns)
+        access = (offset, length, columns_key)
+        next_access = (offset + length, length, columns_key)
+        with self._next_accesses_lock:
+            is_sequential = access in self._next_accesses
+            if is_sequential:
+                del self._next_accesses[access]
+            self._next_accesses[next_access] = None
+            self._next_accesses.move_to_end(next_access)
+            while len(self._next_accesses) > READ_AHEAD_MAX_SEQUENCES:
+                self._next_accesses.popitem(last=False)
+        return is_sequential
+
+    def query(self, offset: int, length: int, columns: Optional[List[str]] = None) -> pa.Table:
         """Query the parquet files
 
         Note that this implementation will always read at least one row group, to get the list of columns and always
         have the same schema, even if the requested rows are invalid (out of range).
 
+        The result is stored in the query cache, if any. Its size is the total size of the buffers it references,
+        not `pa.Table.nbytes`, because a slice keeps the buffers of the whole row groups alive.
+
         Args:
             offset (int): The first row to read.
             length (int): The number of rows to read.
+            columns (List[str], optional): The columns to read, among the supported columns (see `get_projection`).
+              If None, all the supported columns are read.
 
         Returns:
             pa.Table: The requested rows.
         """
-        return self.parquet_index.query(offset=offset, length=length)
+        return self.query_ranges([(offset, length)], columns=columns)[0]
+
+    def query_ranges(self, ranges: List[Tuple[int, int]], columns: Optional[List[str]] = None) -> List[pa.Table]:
+        """Query several ranges of rows at once
+
+        The ranges that are not in the query cache are read together from the parquet files, so that the row groups
+        they share are read only once. See `query` for the details.
+
+        Args:
+            ranges (List[Tuple[int, int]]): The ranges of rows to read, as (offset, length).
+            columns (List[str], optional): The columns to read, among the supported columns (see `get_projection`).
+              If None, all the supported columns are read.
+
+        Returns:
+            List[pa.Table]: The requested rows, for every range.
+        """
+        if self.query_cache is None:
+            return self.parquet_index.query_ranges(ranges, columns=columns) if ranges else []
+        keys = [
+            (
+                self.dataset,
+                self.config,
+                self.split,
+                self.revision,
+                offset,
+                length,
+                None if columns is None else tuple(columns),
+            )
+            for offset, length in ranges
+        ]
+        pa_tables: List[Optional[pa.Table]] = [self.query_cache.get(key) for key in keys]
+        missing_ids = [i for i, pa_table in enumerate(pa_tables) if pa_table is None]
+        if missing_ids:
+            missing_pa_tables = self.parquet_index.query_ranges([ranges[i] for i in missing_ids], columns=columns)
+            for i, pa_table in zip(missing_ids, missing_pa_tables):
+                pa_tables[i] = pa_table
+                self.query_cache.set(keys[i], pa_table, nbytes=pa_table.get_total_buffer_size())
+        return [pa_table for pa_table in pa_tables if pa_table is not None]
 
 
 class Indexer:
+    """Creates the rows indexes, and keeps them in memory along with the results of their queries.
+
+    The memory cache is bounded by `cache_max_bytes`. It is shared by the indexes and the queries, so that a dataset
+    with big rows cannot pin an unbounded amount of memory. An index, and the results of its queries, are dropped as
+    soon as the dataset git revision of the config's parquet cache entry changes.
+    """
+
     def __init__(
         self,
         processing_graph: ProcessingGraph,
         parquet_metadata_directory: StrPath,
         hf_endpoint: str,
         hf_token: Optional[str] = None,
+        row_groups_cache: Optional[RowGroupsCache] = None,
+        cache_max_bytes: int = ROWS_INDEX_CACHE_MAX_BYTES,
+        best_response_cache: Optional[BestResponseCache] = None,
+        missing_dataset_cache: Optional[MissingDatasetCache] = None,
     ):
         self.processing_graph = processing_graph
         self.parquet_metadata_directory = parquet_metadata_directory
         self.hf_endpoint = hf_endpoint
         self.hf_token = hf_token
+        self.row_groups_cache = row_groups_cache
+        self.best_response_cache = best_response_cache
+        self.missing_dataset_cache = missing_dataset_cache
+        self.cache: MemoryCache[Tuple[Any, ...], Any] = MemoryCache(max_bytes=cache_max_bytes)
 
-    @lru_cache(maxsize=128)
     def get_rows_index(
         self,
         dataset: str,
         config: str,
         split: str,
     ) -> RowsIndex:
-        return RowsIndex(
-            dataset=dataset,
-            config=config,
-            split=split,
-            processing_graph=self.processing_graph,
-            hf_endpoint=self.hf_endpoint,
-            hf_token=self.hf_token,
-            parquet_metadata_directory=self.parquet_metadata_directory,
-        )
+        with StepProfiler(method="rows.indexer", step="get the config parquet cache entry"):
+            cache_entry = get_config_parquet_cache_entry(
+                dataset=dataset,
+                config=config,
+                processing_graph=self.processing_graph,
+                hf_endpoint=self.hf_endpoint,
+                hf_token=self.hf_token,
+                best_response_cache=self.best_response_cache,
+                missing_dataset_cache=self.missing_dataset_cache,
+            )
+        key = (dataset, config, split)
+        rows_index: Optional[RowsIndex] = self.cache.get(key)
+        if rows_index is not None and rows_index.revision == cache_entry["dataset_git_revision"]:
+            return rows_index
+        with StepProfiler(method="rows.indexer", step="create the rows index"):
+            if rows_index is not None:
+                # drop the index and the query results of the previous revision, and the listings of the parquet
+                # files cached by the filesystem
+                self.cache.delete(lambda cached_key: cached_key[:3] == key)
+                get_hf_fs(hf_token=self.hf_token).invalidate_cache()
+            rows_index = RowsIndex(
+                dataset=dataset,
+                config=config,
+                split=split,
+                processing_graph=self.processing_graph,
+                hf_endpoint=self.hf_endpoint,
+                hf_token=self.hf_token,
+                parquet_metadata_directory=self.parquet_metadata_directory,
+                row_groups_cache=self.row_groups_cache,
+                cache_entry=cache_entry,
+                query_cache=self.cache,
+            )
+            self.cache.set(key, rows_index, nbytes=rows_index.parquet_index.nbytes)
+        return rows_index
 
 
 Row = Mapping[str, Any]
@@ -539,20 +1091,17 @@ def to_rows_list(
     features: Features,
     unsupported_columns: List[str],
 ) -> List[RowItem]:
-    num_rows = pa_table.num_rows
-    for idx, (column, feature) in enumerate(features.items()):
-        if column in unsupported_columns:
-            pa_table = pa_table.add_column(idx, column, pa.array([None] * num_rows))
     # transform the rows, if needed (e.g. save the images or audio to the assets, and return their URL)
+    # the unsupported columns are not in the table, their cells are set to None
     try:
         transformed_rows = transform_rows(
             dataset=dataset,
             config=config,
             split=split,
-            rows=pa_table.to_pylist(),
+            pa_table=pa_table,
             features=features,
-            cached_assets_base_url=cached_assets_base_url,
-            cached_assets_directory=cached_assets_directory,
+            assets_base_url=cached_assets_base_url,
+            assets_directory=cached_assets_directory,
             offset=offset,
         )
     except Exception as err:
@@ -569,35 +1118,6 @@ def to_rows_list(
     ]
 
 
-def transform_rows(
-    dataset: str,
-    config: str,
-    split: str,
-    rows: List[Row],
-    features: Features,
-    cached_assets_base_url: str,
-    cached_assets_directory: StrPath,
-    offset: int,
-) -> List[Row]:
-    return [
-        {
-            featureName: get_cell_value(
-                dataset=dataset,
-                config=config,
-                split=split,
-                row_idx=offset + row_idx,
-                cell=row[featureName] if featureName in row else None,
-                featureName=featureName,
-                fieldType=fieldType,
-                assets_base_url=cached_assets_base_url,
-                assets_directory=cached_assets_directory,
-            )
-            for (featureName, fieldType) in features.items()
-        }
-        for row_idx, row in enumerate(rows)
-    ]
-
-
 def _greater_or_equal(row_dir_name: str, row_idx: int, on_error: bool) -> bool:
     try:
         return int(row_dir_name) >= row_idx
@@ -692,6 +1212,112 @@ def create_response(
     }
 
 
+def check_offset_and_length(offset: int, length: int) -> None:
+    if offset < 0:
+        raise InvalidParameterError(message="Offset must be positive")
+    if length < 0:
+        raise InvalidParameterError("Length must be positive")
+    if length > MAX_ROWS:
+        raise InvalidParameterError(f"Length must be less than or equal to {MAX_ROWS}")
+
+
+class RowsRange(NamedTuple):
+    """A range of rows of a split, requested in a batch request."""
+
+    dataset: str
+    config: str
+    split: str
+    offset: int
+    length: int
+    columns: Tuple[str, ...]
+
+
+def parse_rows_ranges(content: Any) -> List[RowsRange]:
+    """Parse and validate the body of a batch request: a list of ranges of rows.
+
+    Every range is a JSON object with the same parameters as a GET request: `dataset`, `config` and `split` are
+    required, `offset` (default: 0), `length` (default: MAX_ROWS) and `columns` (default: all the columns) are
+    optional.
+
+    Raises:
+        - [`~utils.MissingRequiredParameterError`]: if `dataset`, `config` or `split` is missing in a range.
+        - [`~utils.InvalidParameterError`]: if the body or a parameter is invalid.
+
+    Args:
+        content (Any): The parsed JSON body.
+
+    Returns:
+        List[RowsRange]: The ranges of rows, in the same order.
+    """
+    if not isinstance(content, list) or not content:
+        raise InvalidParameterError("The body must be a non-empty JSON list of ranges of rows")
+    if len(content) > MAX_BATCH_RANGES:
+        raise InvalidParameterError(f"The number of ranges must be less than or equal to {MAX_BATCH_RANGES}")
+    rows_ranges: List[RowsRange] = []
+    for item in content:
+        if not isinstance(item, dict):
+            raise InvalidParameterError("Every range of rows must be a JSON object")
+        dataset = item.get("dataset")
+        config = item.get("config")
+        split = item.get("split")
+        if not are_valid_parameters([dataset, config, split]):
+            raise MissingRequiredParameterError("Parameter 'dataset', 'config' and 'split' are required")
+        offset = item.get("offset", 0)
+        length = item.get("length", MAX_ROWS)
+        if any(not isinstance(value, int) or isinstance(value, bool) for value in [offset, length]):
+            raise InvalidParameterError("Parameters 'offset' and 'length' must be integers")
+        check_offset_and_length(offset=offset, length=length)
+        columns = item.get("columns", [])
+        if not isinstance(columns, list) or not are_valid_parameters(columns):
+            raise InvalidParameterError("Parameter 'columns' must be a list of non-empty strings")
+        rows_ranges.append(
+            RowsRange(
+                dataset=str(dataset),
+                config=str(config),
+                split=str(split),
+                offset=offset,
+                length=length,
+                columns=tuple(columns),
+            )
+        )
+    return rows_ranges
+
+
+def get_batch_error_item(err: BaseException) -> Any:
+    error = err if isinstance(err, ApiCustomError) else UnexpectedError("Unexpected error.", err)
+    return {**error.as_response(), "error_code": error.code}
+
+
+def get_rows_format(accept: Optional[str]) -> RowsFormat:
+    """Get the format of the response from the Accept header.
+
+    The media types are considered in order (the quality values are ignored), and the first supported one is chosen.
+
+    Args:
+        accept (Optional[str]): The value of the Accept header.
+
+    Returns:
+        RowsFormat: "ndjson" for application/x-ndjson, "arrow" for application/vnd.apache.arrow.stream, and "json"
+          otherwise.
+    """
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type == NDJSON_MEDIA_TYPE:
+            return "ndjson"
+        if media_type == ARROW_STREAM_MEDIA_TYPE:
+            return "arrow"
+        if media_type in ["application/json", "application/*", "*/*"]:
+            return "json"
+    return "json"
+
+
+def to_arrow_stream(pa_table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, pa_table.schema) as writer:
+        writer.write_table(pa_table)
+    return bytes(sink.getvalue())
+
+
 def create_rows_endpoint(
     processing_graph: ProcessingGraph,
     cached_assets_base_url: str,
@@ -703,21 +1329,348 @@ def create_rows_endpoint(
     hf_jwt_algorithm: Optional[str] = None,
     external_auth_url: Optional[str] = None,
     hf_timeout_seconds: Optional[float] = None,
+    auth_check_cache: Optional[AuthCheckCache] = None,
+    verified_jwt_cache: Optional[VerifiedJwtCache] = None,
     max_age_long: int = 0,
     max_age_short: int = 0,
     clean_cache_proba: float = 0.0,
     keep_first_rows_number: int = -1,
     keep_most_recent_rows_number: int = -1,
     max_cleaned_rows_number: int = -1,
+    row_groups_cache: Optional[RowGroupsCache] = None,
+    best_response_cache: Optional[BestResponseCache] = None,
+    missing_dataset_cache: Optional[MissingDatasetCache] = None,
+    rows_index_cache_max_bytes: int = ROWS_INDEX_CACHE_MAX_BYTES,
+    thread_pool_max_workers: int = ROWS_THREAD_POOL_MAX_WORKERS,
+    max_index_tasks: int = ROWS_THREAD_POOL_MAX_INDEX_TASKS,
+    max_query_tasks: int = ROWS_THREAD_POOL_MAX_QUERY_TASKS,
+    max_transform_tasks: int = ROWS_THREAD_POOL_MAX_TRANSFORM_TASKS,
+    read_ahead_max_bytes: int = ROWS_READ_AHEAD_MAX_BYTES,
+    read_ahead_max_tasks: int = ROWS_READ_AHEAD_MAX_TASKS,
 ) -> Endpoint:
     indexer = Indexer(
         processing_graph=processing_graph,
         hf_endpoint=hf_endpoint,
         hf_token=hf_token,
         parquet_metadata_directory=parquet_metadata_directory,
+        row_groups_cache=row_groups_cache,
+        cache_max_bytes=rows_index_cache_max_bytes,
+        best_response_cache=best_response_cache,
+        missing_dataset_cache=missing_dataset_cache,
     )
+    # the blocking steps (MongoDB lookups, parquet reads, assets writes) are run in a thread pool, to
+    # never block the event loop. Every stage has its own limit, so that a slow stage cannot starve the others.
+    executor = ThreadPoolExecutor(max_workers=thread_pool_max_workers, thread_name_prefix="rows")
+    index_stage = ThreadPoolStage(name="rows.index", executor=executor, max_tasks=max_index_tasks)
+    query_stage = ThreadPoolStage(name="rows.query", executor=executor, max_tasks=max_query_tasks)
+    transform_stage = ThreadPoolStage(name="rows.transform", executor=executor, max_tasks=max_transform_tasks)
+    # the next page of a sequential pagination is read in the background, unless the requests are waiting for a slot
+    read_ahead = ReadAhead(
+        name="rows.read_ahead",
+        max_bytes=read_ahead_max_bytes,
+        max_tasks=read_ahead_max_tasks,
+        stages=[index_stage, query_stage],
+    )
+    rows_single_flight: SingleFlight[Tuple[Any, ...], Tuple[RowsIndex, Features, pa.Table]] = SingleFlight(name="rows")
+
+    def clean_cache(dataset: str) -> None:
+        # no need to do it every time
+        if random.random() < clean_cache_proba:  # nosec
+            if keep_first_rows_number < 0 and keep_most_recent_rows_number < 0 and max_cleaned_rows_number < 0:
+                logger.debug(
+                    "Params keep_first_rows_number, keep_most_recent_rows_number and"
+                    " max_cleaned_rows_number are not set. Skipping cached assets cleaning."
+                )
+            else:
+                clean_cached_assets(
+                    dataset=dataset,
+                    cached_assets_directory=cached_assets_directory,
+                    keep_first_rows_number=keep_first_rows_number,
+                    keep_most_recent_rows_number=keep_most_recent_rows_number,
+                    max_cleaned_rows_number=max_cleaned_rows_number,
+                )
+
+    def transform(
+        dataset: str,
+        config: str,
+        split: str,
+        features: Features,
+        unsupported_columns: List[str],
+        pa_table: pa.Table,
+        offset: int,
+        length: int,
+    ) -> Any:
+        with StepProfiler(method="rows_endpoint", step="clean cache"):
+            clean_cache(dataset=dataset)
+        with StepProfiler(method="rows_endpoint", step="transform to a list"):
+            response = create_response(
+                dataset=dataset,
+                config=config,
+                split=split,
+                cached_assets_base_url=cached_assets_base_url,
+                cached_assets_directory=cached_assets_directory,
+                pa_table=pa_table,
+                offset=offset,
+                features=features,
+                unsupported_columns=unsupported_columns,
+            )
+        with StepProfiler(method="rows_endpoint", step="update last modified time of rows in asset dir"):
+            update_last_modified_date_of_rows_in_assets_dir(
+                dataset=dataset,
+                config=config,
+                split=split,
+                offset=offset,
+                length=length,
+                assets_directory=cached_assets_directory,
+            )
+        return response
+
+    async def get_rows(
+        dataset: str, config: str, split: str, offset: int, length: int, columns: List[str]
+    ) -> Tuple[RowsIndex, Features, pa.Table]:
+        with StepProfiler(method="rows_endpoint", step="get row groups index"):
+            rows_index = await index_stage.run(
+                partial(indexer.get_rows_index, dataset=dataset, config=config, split=split)
+            )
+            features, query_columns = rows_index.get_projection(columns)
+        with StepProfiler(method="rows_endpoint", step="query the rows"):
+            pa_table = await query_stage.run(
+                partial(rows_index.query, offset=offset, length=length, columns=query_columns)
+            )
+        with StepProfiler(method="rows_endpoint", step="read ahead the next rows"):
+            # the next page is read into the query cache and the row groups cache. Its size is estimated from the
+            # current page. No need to read ahead past the end of the split.
+            if (
+                read_ahead.is_enabled
+                and pa_table.num_rows == length
+                and rows_index.is_sequential_access(offset=offset, length=length, columns=query_columns)
+            ):
+                read_ahead.submit(
+                    key=(
+                        dataset,
+                        config,
+                        split,
+                        rows_index.revision,
+                        offset + length,
+                        length,
+                        None if query_columns is None else tuple(query_columns),
+                    ),
+                    func=partial(rows_index.query, offset=offset + length, length=length, columns=query_columns),
+                    nbytes=pa_table.nbytes,
+                )
+        return rows_index, features, pa_table
+
+    async def get_rows_ranges(
+        dataset: str, config: str, split: str, ranges: List[Tuple[int, int]], columns: List[str]
+    ) -> Tuple[RowsIndex, Features, List[pa.Table]]:
+        with StepProfiler(method="rows_batch_endpoint", step="get row groups index"):
+            rows_index = await index_stage.run(
+                partial(indexer.get_rows_index, dataset=dataset, config=config, split=split)
+            )
+            features, query_columns = rows_index.get_projection(columns)
+        with StepProfiler(method="rows_batch_endpoint", step="query the rows"):
+            pa_tables = await query_stage.run(partial(rows_index.query_ranges, ranges=ranges, columns=query_columns))
+        return rows_index, features, pa_tables
+
+    def transform_to_arrow_stream(
+        dataset: str, config: str, split: str, features: Features, pa_table: pa.Table, offset: int, length: int
+    ) -> bytes:
+        with StepProfiler(method="rows_endpoint", step="clean cache"):
+            clean_cache(dataset=dataset)
+        with StepProfiler(method="rows_endpoint", step="transform to an arrow stream"):
+            try:
+                arrow_stream = to_arrow_stream(
+                    transform_table(
+                        dataset=dataset,
+                        config=config,
+                        split=split,
+                        pa_table=pa_table,
+                        features=features,
+                        assets_base_url=cached_assets_base_url,
+                        assets_directory=cached_assets_directory,
+                        offset=offset,
+                    )
+                )
+            except Exception as err:
+                raise ParquetDataProcessingError(
+                    "Server error while post-processing the split rows. Please report the issue."
+                ) from err
+        with StepProfiler(method="rows_endpoint", step="update last modified time of rows in asset dir"):
+            update_last_modified_date_of_rows_in_assets_dir(
+                dataset=dataset,
+                config=config,
+                split=split,
+                offset=offset,
+                length=length,
+                assets_directory=cached_assets_directory,
+            )
+        return arrow_stream
+
+    def transform_to_ndjson_lines(
+        dataset: str, config: str, split: str, features: Features, pa_table: pa.Table, offset: int
+    ) -> bytes:
+        with StepProfiler(method="rows_endpoint", step="transform to ndjson lines"):
+            row_items = to_rows_list(
+                pa_table,
+                dataset,
+                config,
+                split,
+                cached_assets_base_url,
+                cached_assets_directory,
+                offset,
+                features,
+                [],
+            )
+            return b"".join(orjson_dumps(row_item) + b"\n" for row_item in row_items)
+
+    async def stream_ndjson(
+        dataset: str, config: str, split: str, features: Features, pa_table: pa.Table, offset: int, length: int
+    ) -> AsyncIterator[bytes]:
+        # the first line contains the features, the next ones the rows. The rows are transformed by batches, so that
+        # the first rows are sent before the last ones are transformed. The headers have already been sent when a
+        # batch fails: the error is sent as the last line.
+        yield orjson_dumps({"features": to_features_list(features)}) + b"\n"
+        try:
+            await transform_stage.run(partial(clean_cache, dataset=dataset))
+            for batch_offset in range(0, pa_table.num_rows, NDJSON_BATCH_SIZE):
+                yield await transform_stage.run(
+                    partial(
+                        transform_to_ndjson_lines,
+                        dataset=dataset,
+                        config=config,
+                        split=split,
+                        features=features,
+                        pa_table=pa_table.slice(batch_offset, NDJSON_BATCH_SIZE),
+                        offset=offset + batch_offset,
+                    )
+                )
+            await transform_stage.run(
+                partial(
+                    update_last_modified_date_of_rows_in_assets_dir,
+                    dataset=dataset,
+                    config=config,
+                    split=split,
+                    offset=offset,
+                    length=length,
+                    assets_directory=cached_assets_directory,
+                )
+            )
+        except Exception as err:
+            error = UnexpectedError("Server error while post-processing the split rows. Please report the issue.", err)
+            yield orjson_dumps(error.as_response()) + b"\n"
+
+    async def rows_batch_endpoint(request: Request) -> Response:
+        # the ranges are processed concurrently. The error of a range (e.g. the split does not exist) is returned in
+        # place of its rows, and does not fail the other ranges.
+        with StepProfiler(method="rows_batch_endpoint", step="all"):
+            try:
+                with StepProfiler(method="rows_batch_endpoint", step="validate parameters"):
+                    try:
+                        content = await request.json()
+                    except Exception as err:
+                        raise InvalidParameterError(
+                            "The body must be a non-empty JSON list of ranges of rows"
+                        ) from err
+                    rows_ranges = parse_rows_ranges(content)
+                    logging.info(f"/rows (batch), ranges={rows_ranges}")
+                results: List[Any] = [None] * len(rows_ranges)
+                with StepProfiler(method="rows_batch_endpoint", step="check authentication"):
+                    # once per dataset
+                    datasets = list(dict.fromkeys(rows_range.dataset for rows_range in rows_ranges))
+                    auth_results = await asyncio.gather(
+                        *[
+                            auth_check(
+                                dataset=dataset,
+                                external_auth_url=external_auth_url,
+                                request=request,
+                                hf_jwt_public_key=hf_jwt_public_key,
+                                hf_jwt_algorithm=hf_jwt_algorithm,
+                                hf_timeout_seconds=hf_timeout_seconds,
+                                auth_check_cache=auth_check_cache,
+                                verified_jwt_cache=verified_jwt_cache,
+                            )
+                            for dataset in datasets
+                        ],
+                        return_exceptions=True,
+                    )
+                    auth_errors = {
+                        dataset: auth_result
+                        for dataset, auth_result in zip(datasets, auth_results)
+                        if isinstance(auth_result, BaseException)
+                    }
+                with StepProfiler(method="rows_batch_endpoint", step="get the rows"):
+                    # the ranges of the same split (and columns) share the index, and are read together
+                    range_ids_by_group: Dict[Tuple[str, str, str, Tuple[str, ...]], List[int]] = {}
+                    for i, rows_range in enumerate(rows_ranges):
+                        if rows_range.dataset in auth_errors:
+                            results[i] = get_batch_error_item(auth_errors[rows_range.dataset])
+                        else:
+                            range_ids_by_group.setdefault(
+                                (rows_range.dataset, rows_range.config, rows_range.split, rows_range.columns), []
+                            ).append(i)
+                    groups_results = await asyncio.gather(
+                        *[
+                            get_rows_ranges(
+                                dataset=dataset,
+                                config=config,
+                                split=split,
+                                ranges=[(rows_ranges[i].offset, rows_ranges[i].length) for i in range_ids],
+                                columns=list(columns),
+                            )
+                            for (dataset, config, split, columns), range_ids in range_ids_by_group.items()
+                        ],
+                        return_exceptions=True,
+                    )
+                with StepProfiler(method="rows_batch_endpoint", step="transform the rows"):
+                    transformed_range_ids: List[int] = []
+                    transforms: List[Awaitable[Any]] = []
+                    for range_ids, group_result in zip(range_ids_by_group.values(), groups_results):
+                        if isinstance(group_result, BaseException):
+                            for i in range_ids:
+                                results[i] = get_batch_error_item(group_result)
+                            continue
+                        rows_index, features, pa_tables = group_result
+                        unsupported_columns = [
+                            column for column in rows_index.parquet_index.unsupported_columns if column in features
+                        ]
+                        for i, pa_table in zip(range_ids, pa_tables):
+                            transformed_range_ids.append(i)
+                            transforms.append(
+                                transform_stage.run(
+                                    partial(
+                                        transform,
+                                        dataset=rows_ranges[i].dataset,
+                                        config=rows_ranges[i].config,
+                                        split=rows_ranges[i].split,
+                                        features=features,
+                                        unsupported_columns=unsupported_columns,
+                                        pa_table=pa_table,
+                                        offset=rows_ranges[i].offset,
+                                        length=rows_ranges[i].length,
+                                    )
+                                )
+                            )
+                    for i, transform_result in zip(
+                        transformed_range_ids, await asyncio.gather(*transforms, return_exceptions=True)
+                    ):
+                        results[i] = (
+                            get_batch_error_item(transform_result)
+                            if isinstance(transform_result, BaseException)
+                            else transform_result
+                        )
+                with StepProfiler(method="rows_batch_endpoint", step="generate the OK response"):
+                    has_errors = len(auth_errors) > 0 or len(transformed_range_ids) < len(rows_ranges)
+                    return get_json_ok_response(
+                        content={"results": results}, max_age=max_age_short if has_errors else max_age_long
+                    )
+            except Exception as e:
+                error = e if isinstance(e, ApiCustomError) else UnexpectedError("Unexpected error.", e)
+                with StepProfiler(method="rows_batch_endpoint", step="generate API error response"):
+                    return get_json_api_error_response(error=error, max_age=max_age_short)
 
     async def rows_endpoint(request: Request) -> Response:
+        if request.method == "POST":
+            return await rows_batch_endpoint(request)
         revision: Optional[str] = None
         with StepProfiler(method="rows_endpoint", step="all"):
             try:
@@ -728,74 +1681,104 @@ def create_rows_endpoint(
                     if not dataset or not config or not split or not are_valid_parameters([dataset, config, split]):
                         raise MissingRequiredParameterError("Parameter 'dataset', 'config' and 'split' are required")
                     offset = int(request.query_params.get("offset", 0))
-                    if offset < 0:
-                        raise InvalidParameterError(message="Offset must be positive")
                     length = int(request.query_params.get("length", MAX_ROWS))
-                    if length < 0:
-                        raise InvalidParameterError("Length must be positive")
-                    if length > MAX_ROWS:
-                        raise InvalidParameterError(f"Length must be less than or equal to {MAX_ROWS}")
+                    check_offset_and_length(offset=offset, length=length)
+                    # optional, repeated parameter: the columns to return (all by default)
+                    columns = request.query_params.getlist("columns")
+                    if not are_valid_parameters(columns):
+                        raise InvalidParameterError("Parameter 'columns' must be a non-empty string")
                     logging.info(
-                        f"/rows, dataset={dataset}, config={config}, split={split}, offset={offset}, length={length}"
+                        f"/rows, dataset={dataset}, config={config}, split={split}, offset={offset}, length={length},"
+                        f" columns={columns}"
                     )
                 with StepProfiler(method="rows_endpoint", step="check authentication"):
                     # if auth_check fails, it will raise an exception that will be caught below
-                    auth_check(
+                    await auth_check(
                         dataset=dataset,
                         external_auth_url=external_auth_url,
                         request=request,
                         hf_jwt_public_key=hf_jwt_public_key,
                         hf_jwt_algorithm=hf_jwt_algorithm,
                         hf_timeout_seconds=hf_timeout_seconds,
+                        auth_check_cache=auth_check_cache,
+                        verified_jwt_cache=verified_jwt_cache,
                     )
-                with StepProfiler(method="rows_endpoint", step="get row groups index"):
-                    rows_index = indexer.get_rows_index(dataset=dataset, config=config, split=split)
-                    revision = rows_index.revision
-                with StepProfiler(method="rows_endpoint", step="query the rows"):
-                    pa_table = rows_index.query(offset=offset, length=length)
-                with StepProfiler(method="rows_endpoint", step="clean cache"):
-                    # no need to do it every time
-                    if random.random() < clean_cache_proba:  # nosec
-                        if (
-                            keep_first_rows_number < 0
-                            and keep_most_recent_rows_number < 0
-                            and max_cleaned_rows_number < 0
-                        ):
-                            logger.debug(
-                                "Params keep_first_rows_number, keep_most_recent_rows_number and"
-                                " max_cleaned_rows_number are not set. Skipping cached assets cleaning."
-                            )
-                        else:
-                            clean_cached_assets(
-                                dataset=dataset,
-                                cached_assets_directory=cached_assets_directory,
-                                keep_first_rows_number=keep_first_rows_number,
-                                keep_most_recent_rows_number=keep_most_recent_rows_number,
-                                max_cleaned_rows_number=max_cleaned_rows_number,
-                            )
-                with StepProfiler(method="rows_endpoint", step="transform to a list"):
-                    response = create_response(
-                        dataset=dataset,
-                        config=config,
-                        split=split,
-                        cached_assets_base_url=cached_assets_base_url,
-                        cached_assets_directory=cached_assets_directory,
-                        pa_table=pa_table,
-                        offset=offset,
-                        features=rows_index.parquet_index.features,
-                        unsupported_columns=rows_index.parquet_index.unsupported_columns,
-                    )
-                with StepProfiler(method="rows_endpoint", step="update last modified time of rows in asset dir"):
-                    update_last_modified_date_of_rows_in_assets_dir(
+                # the concurrent identical requests share the same index lookup and parquet reads
+                rows_index, features, pa_table = await rows_single_flight.run(
+                    (dataset, config, split, offset, length, tuple(columns)),
+                    partial(
+                        get_rows,
                         dataset=dataset,
                         config=config,
                         split=split,
                         offset=offset,
                         length=length,
-                        assets_directory=cached_assets_directory,
+                        columns=columns,
+                    ),
+                )
+                revision = rows_index.revision
+                rows_format = get_rows_format(request.headers.get("accept"))
+                if rows_format == "ndjson":
+                    with StepProfiler(method="rows_endpoint", step="generate the OK streaming response"):
+                        streaming_response = get_streaming_ok_response(
+                            content=stream_ndjson(
+                                dataset=dataset,
+                                config=config,
+                                split=split,
+                                features=features,
+                                pa_table=pa_table,
+                                offset=offset,
+                                length=length,
+                            ),
+                            media_type=NDJSON_MEDIA_TYPE,
+                            max_age=max_age_long,
+                            revision=revision,
+                        )
+                        streaming_response.headers["Vary"] = "Accept"
+                        return streaming_response
+                if rows_format == "arrow":
+                    with StepProfiler(method="rows_endpoint", step="transform the rows to an arrow stream"):
+                        arrow_stream = await transform_stage.run(
+                            partial(
+                                transform_to_arrow_stream,
+                                dataset=dataset,
+                                config=config,
+                                split=split,
+                                features=features,
+                                pa_table=pa_table,
+                                offset=offset,
+                                length=length,
+                            )
+                        )
+                    with StepProfiler(method="rows_endpoint", step="generate the OK arrow response"):
+                        arrow_response = get_bytes_ok_response(
+                            content=arrow_stream,
+                            media_type=ARROW_STREAM_MEDIA_TYPE,
+                            max_age=max_age_long,
+                            revision=revision,
+                        )
+                        arrow_response.headers["Vary"] = "Accept"
+                        return arrow_response
+                with StepProfiler(method="rows_endpoint", step="transform the rows"):
+                    response = await transform_stage.run(
+                        partial(
+                            transform,
+                            dataset=dataset,
+                            config=config,
+                            split=split,
+                            features=features,
+                            unsupported_columns=[
+                                column for column in rows_index.parquet_index.unsupported_columns if column in features
+                            ],
+                            pa_table=pa_table,
+                            offset=offset,
+                            length=length,
+                        )
                     )
                 with StepProfiler(method="rows_endpoint", step="generate the OK response"):
-                    return get_json_ok_response(content=response, max_age=max_age_long, revision=revision)
+                    json_response = get_json_ok_response(content=response, max_age=max_age_long, revision=revision)
+                    json_response.headers["Vary"] = "Accept"
+                    return json_response
             except Exception as e:
                 error = e if isinstance(e, ApiCustomError) else UnexpectedError("Unexpected error.", e)
                 with StepProfiler(method="rows_endpoint", step="generate API error response"):
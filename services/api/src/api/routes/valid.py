@@ -1,12 +1,13 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import asyncio
 import logging
 from typing import List
 
+from libcommon.async_mongo import AsyncMongo
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.prometheus import StepProfiler
-from libcommon.simple_cache import get_valid_datasets
 from starlette.requests import Request
 from starlette.responses import Response
 
@@ -18,14 +19,16 @@ from api.utils import (
 )
 
 
-def get_valid(processing_graph: ProcessingGraph) -> List[str]:
+async def get_valid(processing_graph: ProcessingGraph, async_mongo: AsyncMongo) -> List[str]:
     # a dataset is considered valid if at least one response of any of the
     # "required_by_dataset_viewer" steps is valid.
     processing_steps = processing_graph.get_processing_steps_required_by_dataset_viewer()
     if not processing_steps:
         return []
     datasets = set.union(
-        *[get_valid_datasets(kind=processing_step.cache_kind) for processing_step in processing_steps]
+        *await asyncio.gather(
+            *[async_mongo.get_valid_datasets(kind=processing_step.cache_kind) for processing_step in processing_steps]
+        )
     )
     # note that the list is sorted alphabetically for consistency
     return sorted(datasets)
@@ -33,6 +36,7 @@ def get_valid(processing_graph: ProcessingGraph) -> List[str]:
 
 def create_valid_endpoint(
     processing_graph: ProcessingGraph,
+    async_mongo: AsyncMongo,
     max_age_long: int = 0,
     max_age_short: int = 0,
 ) -> Endpoint:
@@ -42,7 +46,7 @@ def create_valid_endpoint(
             try:
                 logging.info("/valid")
                 with StepProfiler(method="valid_endpoint", step="prepare content"):
-                    content = {"valid": get_valid(processing_graph=processing_graph)}
+                    content = {"valid": await get_valid(processing_graph=processing_graph, async_mongo=async_mongo)}
                 with StepProfiler(method="valid_endpoint", step="generate OK response"):
                     return get_json_ok_response(content, max_age=max_age_long)
             except Exception as e:
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import contextlib
+import hashlib
+import logging
+import os
+import random
+import tempfile
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import pyarrow as pa
+from libcommon.prometheus import StepProfiler
+from libcommon.storage import StrPath
+
+DATASET_SEPARATOR = "--"
+ROW_GROUPS_CACHE_DIR_MODE = 0o755
+ROW_GROUP_FILE_SUFFIX = ".arrow"
+
+
+class RowGroupKey(NamedTuple):
+    """Identifies a row group (restricted to a set of columns) of a parquet file of a split."""
+
+    dataset: str
+    revision: Optional[str]
+    config: str
+    split: str
+    filename: str
+    row_group_id: int
+    columns: Tuple[str, ...]
+
+
+def get_row_group_file_path(key: RowGroupKey, directory: StrPath) -> Path:
+    # the dataset, config and split are kept in clear to be able to delete all the entries of a dataset.
+    # The other parts of the key are hashed to get a fixed-length file name.
+    digest = hashlib.sha256(
+        "\n".join([str(key.revision), key.filename, str(key.row_group_id), *key.columns]).encode("utf-8")
+    ).hexdigest()
+    return (
+        Path(directory).resolve()
+        / key.dataset
+        / DATASET_SEPARATOR
+        / key.config
+        / key.split
+        / f"{digest}{ROW_GROUP_FILE_SUFFIX}"
+    )
+
+
+@dataclass
+class RowGroupsCache:
+    """
+    A cache of the parquet row groups, stored as Arrow IPC files on the local disk.
+
+    The files are memory-mapped when read, so that all the processes of the node (e.g. the uvicorn workers) share the
+    same pages in memory, and the decoded row groups survive a restart of the processes.
+
+    The cache is bounded in size with a least-recently-used policy based on the last modified date of the files,
+    which is updated every time a row group is read from the cache. As for the cached assets, the cleaning is not
+    done on every write, but with a probability of `clean_cache_proba`.
+
+    Args:
+        directory (`StrPath`): The directory where the row groups are stored.
+        max_bytes (`int`): The maximum size of the cache on disk, in bytes.
+        clean_cache_proba (`float`): The probability of cleaning the cache after a row group has been written.
+    """
+
+    directory: StrPath
+    max_bytes: int
+    clean_cache_proba: float = 0.0
+
+    def has(self, key: RowGroupKey) -> bool:
+        return get_row_group_file_path(key=key, directory=self.directory).is_file()
+
+    def get(self, key: RowGroupKey) -> Optional[pa.Table]:
+        path = get_row_group_file_path(key=key, directory=self.directory)
+        try:
+            pa_table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # the file might have been removed while being read, or be corrupted. Ignore it.
+            logging.debug(f"Could not read the row group {key} from the cache at {path}.", exc_info=True)
+            return None
+        # update the last modified date, used to evict the least recently used row groups
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return pa_table
+
+    def set(self, key: RowGroupKey, pa_table: pa.Table) -> None:
+        path = get_row_group_file_path(key=key, directory=self.directory)
+        tmp_path: Optional[str] = None
+        try:
+            os.makedirs(path.parent, ROW_GROUPS_CACHE_DIR_MODE, exist_ok=True)
+            # write to a temporary file, then rename it atomically, so that concurrent readers never see a
+            # partially written file
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp_f:
+                tmp_path = tmp_f.name
+                with pa.ipc.new_file(tmp_f, pa_table.schema) as writer:
+                    writer.write_table(pa_table)
+            os.replace(tmp_path, path)
+        except Exception:
+            logging.warning(f"Could not write the row group {key} to the cache at {path}.", exc_info=True)
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            return
+        # no need to do it every time
+        if random.random() < self.clean_cache_proba:  # nosec
+            self.clean()
+
+    def read(self, key: RowGroupKey, reader: Callable[[], pa.Table]) -> pa.Table:
+        """Get the row group from the cache, or read it with `reader` and store it in the cache."""
+        with StepProfiler(method="row_groups_cache.read", step="get from the cache"):
+            pa_table = self.get(key=key)
+        if pa_table is not None:
+            return pa_table
+        with StepProfiler(method="row_groups_cache.read", step="read the row group"):
+            pa_table = reader()
+        with StepProfiler(method="row_groups_cache.read", step="store in the cache"):
+            self.set(key=key, pa_table=pa_table)
+        return pa_table
+
+    def get_reader(self, key: RowGroupKey, reader: Callable[[], pa.Table]) -> Callable[[], pa.Table]:
+        return partial(self.read, key=key, reader=reader)
+
+    def clean(self) -> None:
+        """Delete the least recently used row groups until the size of the cache is below `max_bytes`."""
+        entries: List[Tuple[float, int, Path]] = []
+        for path in Path(self.directory).resolve().glob(os.path.join("**", f"*{ROW_GROUP_FILE_SUFFIX}")):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+        logging.debug(f"Row groups cache cleaned, the size is now {total_bytes} bytes.")
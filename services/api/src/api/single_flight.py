@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from libcommon.prometheus import SINGLE_FLIGHT_CALLS_TOTAL
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesce the concurrent calls that have the same key: only the first call (the leader) computes the result, the
+    calls that arrive while it is in flight wait for it and get the same result, or the same exception. The result
+    is not kept once the leader has finished: this is not a cache.
+
+    The calls can come from several threads (`do`) or from coroutines (`run`), the waiters of `run` don't block the
+    event loop. The number of leaders and followers is exposed as a Prometheus metric.
+
+    Args:
+        name (`str`): The name of the single-flight group, used as a label in the metrics.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self._calls: Dict[K, "Future[V]"] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key: K) -> Tuple["Future[V]", bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+        SINGLE_FLIGHT_CALLS_TOTAL.labels(name=self.name, role="leader" if is_leader else "follower").inc()
+        return future, is_leader
+
+    def _leave(self, key: K) -> None:
+        with self._lock:
+            del self._calls[key]
+
+    def do(self, key: K, func: Callable[[], V]) -> V:
+        """Call `func`, unless a call with the same key is in flight, and return its result."""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            self._leave(key)
+        future.set_result(result)
+        return result
+
+    async def run(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """Await `func()`, unless a call with the same key is in flight, and return its result."""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            self._leave(key)
+        future.set_result(result)
+        return result
@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+from libcommon.prometheus import THREAD_POOL_STAGE_MAX_TASKS, THREAD_POOL_STAGE_TASKS
+
+T = TypeVar("T")
+
+
+class ThreadPoolStage:
+    """
+    A stage of a pipeline, whose blocking calls are run in a thread pool instead of the event loop.
+
+    The number of calls of the stage that run concurrently is limited to `max_tasks`, so that a slow stage (e.g. the
+    remote parquet reads) cannot take all the threads of the pool, and starve the other stages. The number of waiting
+    and running tasks is exposed as a Prometheus metric.
+
+    Args:
+        name (`str`): The name of the stage, used as a label in the metrics.
+        executor (`Executor`): The thread pool, generally shared by all the stages.
+        max_tasks (`int`): The maximum number of calls of the stage running concurrently. Must be positive.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_tasks: int):
+        if max_tasks <= 0:
+            raise ValueError(f"The maximum number of tasks of the stage {name} must be positive (got {max_tasks}).")
+        self.name = name
+        self.executor = executor
+        self.max_tasks = max_tasks
+        # number of waiting and running tasks, only updated in the event loops
+        self.num_tasks = 0
+        # asyncio primitives are bound to the event loop, create one semaphore per loop
+        self._semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+        THREAD_POOL_STAGE_MAX_TASKS.labels(stage=name).set(max_tasks)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_tasks)
+        return self._semaphores[loop]
+
+    @property
+    def is_busy(self) -> bool:
+        """True if a new task would have to wait for a slot."""
+        return self.num_tasks >= self.max_tasks
+
+    async def run(self, func: Callable[[], T]) -> T:
+        """Run `func` in the thread pool, once a slot of the stage is available, and return its result."""
+        semaphore = self._get_semaphore()
+        self.num_tasks += 1
+        try:
+            THREAD_POOL_STAGE_TASKS.labels(stage=self.name, status="waiting").inc()
+            try:
+                await semaphore.acquire()
+            finally:
+                THREAD_POOL_STAGE_TASKS.labels(stage=self.name, status="waiting").dec()
+            THREAD_POOL_STAGE_TASKS.labels(stage=self.name, status="running").inc()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func)
+            finally:
+                THREAD_POOL_STAGE_TASKS.labels(stage=self.name, status="running").dec()
+                semaphore.release()
+        finally:
+            self.num_tasks -= 1
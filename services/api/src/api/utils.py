@@ -1,14 +1,25 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import hashlib
 import logging
+from datetime import datetime
 from http import HTTPStatus
-from typing import Any, Callable, Coroutine, List, Literal, Optional
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Literal,
+    Optional,
+)
 
 from libcommon.exceptions import CustomError
 from libcommon.utils import orjson_dumps
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 ApiErrorCode = Literal[
     "AuthCheckHubRequestError",
@@ -117,6 +128,15 @@ def get_response(content: Any, status_code: int = 200, max_age: int = 0) -> Resp
     return OrjsonResponse(content=content, status_code=status_code, headers=headers)
 
 
+def get_headers(max_age: int = 0, error_code: Optional[str] = None, revision: Optional[str] = None) -> Dict[str, str]:
+    headers = {"Cache-Control": f"max-age={max_age}" if max_age > 0 else "no-store"}
+    if error_code is not None:
+        headers["X-Error-Code"] = error_code
+    if revision is not None:
+        headers["X-Revision"] = revision
+    return headers
+
+
 def get_json_response(
     content: Any,
     status_code: HTTPStatus = HTTPStatus.OK,
@@ -124,11 +144,7 @@ def get_json_response(
     error_code: Optional[str] = None,
     revision: Optional[str] = None,
 ) -> Response:
-    headers = {"Cache-Control": f"max-age={max_age}" if max_age > 0 else "no-store"}
-    if error_code is not None:
-        headers["X-Error-Code"] = error_code
-    if revision is not None:
-        headers["X-Revision"] = revision
+    headers = get_headers(max_age=max_age, error_code=error_code, revision=revision)
     return OrjsonResponse(content=content, status_code=status_code.value, headers=headers)
 
 
@@ -136,6 +152,75 @@ def get_json_ok_response(content: Any, max_age: int = 0, revision: Optional[str]
     return get_json_response(content=content, max_age=max_age, revision=revision)
 
 
+def get_encoded_json_ok_response(
+    body: bytes,
+    content_encoding: Optional[str] = None,
+    max_age: int = 0,
+    revision: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    # the body is already serialized (and compressed if content_encoding is set): GZipMiddleware lets it through
+    headers = get_headers(max_age=max_age, revision=revision)
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+        headers["Vary"] = "Accept-Encoding"
+    if etag is not None:
+        headers["ETag"] = get_encoded_etag(etag=etag, content_encoding=content_encoding)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_etag(
+    kind: str, dataset_git_revision: Optional[str], updated_at: datetime, job_runner_version: Optional[int]
+) -> str:
+    """Get the entity tag of a cached response: it changes every time the response is updated in the database."""
+    digest = hashlib.sha256(
+        "\n".join([kind, str(dataset_git_revision), updated_at.isoformat(), str(job_runner_version)]).encode("utf-8")
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def get_encoded_etag(etag: str, content_encoding: Optional[str] = None) -> str:
+    # the compressed body is another representation of the response: it has its own (strong) entity tag
+    return etag if content_encoding is None else f'{etag[:-1]}-{content_encoding}"'
+
+
+def is_etag_matching(if_none_match: Optional[str], etag: str) -> bool:
+    """Check if the If-None-Match header of a request matches the entity tag of a response.
+
+    As specified in RFC 9110, the weak comparison is used: the "W/" prefixes are ignored. The entity tags of the
+    compressed representations (see `get_encoded_etag`) match the entity tag of the response.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == etag or candidate == get_encoded_etag(etag=etag, content_encoding="gzip"):
+            return True
+    return False
+
+
+def get_not_modified_response(etag: str, max_age: int = 0, revision: Optional[str] = None) -> Response:
+    headers = get_headers(max_age=max_age, revision=revision)
+    headers["ETag"] = etag
+    return Response(status_code=HTTPStatus.NOT_MODIFIED.value, headers=headers)
+
+
+def get_bytes_ok_response(
+    content: bytes, media_type: str, max_age: int = 0, revision: Optional[str] = None
+) -> Response:
+    return Response(content=content, media_type=media_type, headers=get_headers(max_age=max_age, revision=revision))
+
+
+def get_streaming_ok_response(
+    content: AsyncIterable[bytes], media_type: str, max_age: int = 0, revision: Optional[str] = None
+) -> Response:
+    return StreamingResponse(
+        content=content, media_type=media_type, headers=get_headers(max_age=max_age, revision=revision)
+    )
+
+
 def get_json_error_response(
     content: Any,
     status_code: HTTPStatus = HTTPStatus.OK,
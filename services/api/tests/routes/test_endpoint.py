@@ -1,9 +1,11 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import asyncio
 from http import HTTPStatus
 from unittest.mock import patch
 
+from libcommon.async_mongo import AsyncMongo
 from libcommon.config import ProcessingGraphConfig
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.queue import Queue
@@ -11,8 +13,14 @@ from libcommon.simple_cache import upsert_response
 from pytest import raises
 
 from api.config import AppConfig, EndpointConfig
-from api.routes.endpoint import EndpointsDefinition, get_cache_entry_from_steps
-from api.utils import ResponseNotReadyError
+from api.missing_dataset_cache import MissingDatasetCache
+from api.routes.endpoint import (
+    EndpointsDefinition,
+    get_best_response_from_steps_async,
+    get_cache_entry_from_steps,
+    raise_missing_cache_entry_error,
+)
+from api.utils import ResponseNotFoundError, ResponseNotReadyError
 
 
 def test_endpoints_definition() -> None:
@@ -159,3 +167,99 @@ def test_get_cache_entry_from_steps() -> None:
             get_cache_entry_from_steps(
                 [non_existent_step], dataset, None, None, processing_graph, app_config.common.hf_endpoint
             )
+
+
+def test_get_best_response_from_steps_async() -> None:
+    dataset = "dataset"
+    revision = "revision"
+    config = "config"
+
+    app_config = AppConfig.from_env()
+    graph_config = ProcessingGraphConfig()
+    processing_graph = ProcessingGraph(graph_config.specification)
+    async_mongo = AsyncMongo(max_workers=1)
+
+    cache_with_error = "config-split-names-from-streaming"
+    cache_without_error = "config-split-names-from-info"
+
+    step_with_error = processing_graph.get_processing_step(cache_with_error)
+    step_without_error = processing_graph.get_processing_step(cache_without_error)
+
+    upsert_response(
+        kind=cache_without_error,
+        dataset=dataset,
+        config=config,
+        content={},
+        http_status=HTTPStatus.OK,
+    )
+
+    upsert_response(
+        kind=cache_with_error,
+        dataset=dataset,
+        config=config,
+        content={},
+        http_status=HTTPStatus.INTERNAL_SERVER_ERROR,
+    )
+
+    # succeeded result is returned even if first step failed
+    best_response = asyncio.run(
+        get_best_response_from_steps_async(
+            [step_with_error, step_without_error],
+            dataset,
+            config,
+            None,
+            processing_graph,
+            app_config.common.hf_endpoint,
+            async_mongo,
+        )
+    )
+    assert best_response.kind == cache_without_error
+    assert best_response.response["http_status"] == HTTPStatus.OK
+    assert best_response.updated_at is not None
+
+    # pending job throws exception
+    queue = Queue()
+    queue.upsert_job(job_type="dataset-split-names", dataset=dataset, revision=revision, config=config)
+    non_existent_step = processing_graph.get_processing_step("dataset-split-names")
+    with raises(ResponseNotReadyError):
+        asyncio.run(
+            get_best_response_from_steps_async(
+                [non_existent_step], dataset, None, None, processing_graph, app_config.common.hf_endpoint, async_mongo
+            )
+        )
+    async_mongo.shutdown()
+
+
+def test_raise_missing_cache_entry_error_with_cache() -> None:
+    processing_graph = ProcessingGraph(ProcessingGraphConfig().specification)
+    processing_steps = [processing_graph.get_processing_step("dataset-config-names")]
+    missing_dataset_cache = MissingDatasetCache(not_found_ttl_seconds=60, set_revision_debounce_seconds=60)
+
+    # the Hub is requested only once for a dataset that does not exist
+    with patch("api.routes.endpoint.get_dataset_git_revision", side_effect=Exception) as get_revision:
+        for _ in range(3):
+            with raises(ResponseNotFoundError):
+                raise_missing_cache_entry_error(
+                    processing_steps=processing_steps,
+                    dataset="does_not_exist",
+                    processing_graph=processing_graph,
+                    hf_endpoint="https://hub",
+                    missing_dataset_cache=missing_dataset_cache,
+                )
+        assert get_revision.call_count == 1
+
+    # the revision is set only once
+    with patch("api.routes.endpoint.get_dataset_git_revision", return_value="revision") as get_revision, patch(
+        "api.routes.endpoint.DatasetOrchestrator.set_revision"
+    ) as set_revision:
+        for _ in range(3):
+            with raises(ResponseNotReadyError):
+                raise_missing_cache_entry_error(
+                    processing_steps=processing_steps,
+                    dataset="new_dataset",
+                    processing_graph=processing_graph,
+                    hf_endpoint="https://hub",
+                    missing_dataset_cache=missing_dataset_cache,
+                )
+        assert get_revision.call_count == 1
+        assert set_revision.call_count == 1
@@ -3,10 +3,11 @@ import shutil
 import time
 from http import HTTPStatus
 from pathlib import Path
-from typing import Any, Generator, List
+from typing import Any, Generator, List, Optional, Type
 from unittest.mock import patch
 
 import numpy as np
+import pyarrow as pa
 import pyarrow.parquet as pq
 import pytest
 from datasets import Dataset, Image, concatenate_datasets
@@ -23,9 +24,14 @@ from api.routes.rows import (
     ParquetIndexWithMetadata,
     ParquetIndexWithoutMetadata,
     RowsIndex,
+    RowsRange,
     clean_cached_assets,
     create_response,
+    get_rows_format,
+    parse_rows_ranges,
+    to_arrow_stream,
 )
+from api.utils import InvalidParameterError, MissingRequiredParameterError
 
 
 @pytest.fixture(autouse=True)
@@ -314,6 +320,65 @@ def test_rows_index_query(rows_index: RowsIndex, ds_sharded: Dataset) -> None:
         rows_index.query(offset=-1, length=2)
 
 
+def test_rows_index_query_with_columns(rows_index: RowsIndex, ds_sharded: Dataset) -> None:
+    assert rows_index.get_projection([]) == (ds_sharded.features, None)
+    features, columns = rows_index.get_projection(["text"])
+    assert features == ds_sharded.features
+    assert columns == ["text"]
+    assert rows_index.query(offset=1, length=3, columns=columns).to_pydict() == ds_sharded[1:4]
+    with pytest.raises(InvalidParameterError):
+        rows_index.get_projection(["unknown"])
+
+
+def test_rows_index_query_ranges(rows_index: RowsIndex, ds_sharded: Dataset) -> None:
+    assert [pa_table.to_pydict() for pa_table in rows_index.query_ranges([(1, 3), (0, 2), (999999, 1), (2, 0)])] == [
+        ds_sharded[1:4],
+        ds_sharded[0:2],
+        ds_sharded[:0],
+        ds_sharded[:0],
+    ]
+    assert rows_index.query_ranges([]) == []
+
+
+def test_rows_index_is_sequential_access(rows_index: RowsIndex) -> None:
+    assert not rows_index.is_sequential_access(offset=0, length=2)
+    assert rows_index.is_sequential_access(offset=2, length=2)
+    assert rows_index.is_sequential_access(offset=4, length=2)
+    # another length or other columns are another sequence
+    assert not rows_index.is_sequential_access(offset=6, length=3)
+    assert not rows_index.is_sequential_access(offset=6, length=2, columns=["text"])
+    assert rows_index.is_sequential_access(offset=6, length=2)
+    # the same page, requested again, does not continue the sequence
+    assert not rows_index.is_sequential_access(offset=6, length=2)
+
+
+def test_indexer_get_rows_index_revision(
+    indexer: Indexer,
+    ds_sharded_fs: AbstractFileSystem,
+    dataset_sharded_with_config_parquet: dict[str, Any],
+) -> None:
+    with patch("api.routes.rows.get_hf_fs", return_value=ds_sharded_fs):
+        with patch("api.routes.rows.get_hf_parquet_uris", side_effect=mock_get_hf_parquet_uris):
+            index = indexer.get_rows_index("ds_sharded", "plain_text", "train")
+            index.query(offset=1, length=3)
+            assert indexer.get_rows_index("ds_sharded", "plain_text", "train") is index
+            assert len(indexer.cache) == 2
+            upsert_response(
+                kind="config-parquet",
+                dataset="ds_sharded",
+                config="plain_text",
+                content=dataset_sharded_with_config_parquet,
+                http_status=HTTPStatus.OK,
+                progress=1.0,
+                dataset_git_revision="new_revision",
+            )
+            new_index = indexer.get_rows_index("ds_sharded", "plain_text", "train")
+    assert new_index is not index
+    assert new_index.revision == "new_revision"
+    # the query results of the previous revision have been dropped
+    assert len(indexer.cache) == 1
+
+
 @pytest.fixture
 def rows_index_with_parquet_metadata(
     indexer: Indexer,
@@ -377,6 +442,29 @@ def test_rows_index_query_with_parquet_metadata(
         rows_index_with_parquet_metadata.query(offset=-1, length=2)
 
 
+def test_rows_index_query_ranges_with_parquet_metadata(
+    rows_index_with_parquet_metadata: RowsIndex, ds_sharded: Dataset
+) -> None:
+    assert [
+        pa_table.to_pydict()
+        for pa_table in rows_index_with_parquet_metadata.query_ranges([(1, 3), (0, 2), (999999, 1), (2, 0)])
+    ] == [ds_sharded[1:4], ds_sharded[0:2], ds_sharded[:0], ds_sharded[:0]]
+    with patch("api.routes.rows.PARTIAL_READ_MIN_ROW_GROUP_BYTES", 0):
+        assert [
+            pa_table.to_pydict() for pa_table in rows_index_with_parquet_metadata.query_ranges([(3, 2), (1, 3)])
+        ] == [ds_sharded[3:5], ds_sharded[1:4]]
+
+
+def test_rows_index_query_with_parquet_metadata_partial_read(
+    rows_index_with_parquet_metadata: RowsIndex, ds_sharded: Dataset
+) -> None:
+    with patch("api.routes.rows.PARTIAL_READ_MIN_ROW_GROUP_BYTES", 0):
+        assert rows_index_with_parquet_metadata.query(offset=1, length=3).to_pydict() == ds_sharded[1:4]
+        assert rows_index_with_parquet_metadata.query(offset=1, length=0).to_pydict() == ds_sharded[:0]
+        assert rows_index_with_parquet_metadata.query(offset=999999, length=1).to_pydict() == ds_sharded[:0]
+        assert rows_index_with_parquet_metadata.query(offset=1, length=99999999).to_pydict() == ds_sharded[1:]
+
+
 def test_create_response(ds: Dataset, app_config: AppConfig, cached_assets_directory: StrPath) -> None:
     response = create_response(
         dataset="ds",
@@ -492,3 +580,57 @@ def test_update_last_modified_date_of_rows_in_assets_dir(tmp_path: Path) -> None
     most_recent_rows = [int(row_dir.name) for row_dir in most_recent_rows_dirs]
     assert sorted(most_recent_rows[:3]) == [2, 3, 4]
     assert most_recent_rows[3:] == [7, 6, 5, 1, 0]
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, "json"),
+        ("application/json", "json"),
+        ("text/html, */*;q=0.8", "json"),
+        ("application/x-ndjson", "ndjson"),
+        ("application/vnd.apache.arrow.stream, application/json;q=0.5", "arrow"),
+        ("application/json, application/x-ndjson", "json"),
+    ],
+)
+def test_get_rows_format(accept: Optional[str], expected: str) -> None:
+    assert get_rows_format(accept) == expected
+
+
+def test_to_arrow_stream(ds: Dataset) -> None:
+    assert pa.ipc.open_stream(to_arrow_stream(ds.data.table)).read_all() == ds.data.table
+
+
+def test_parse_rows_ranges() -> None:
+    assert parse_rows_ranges(
+        [
+            {"dataset": "ds", "config": "plain_text", "split": "train"},
+            {"dataset": "ds", "config": "plain_text", "split": "test", "offset": 10, "length": 5, "columns": ["text"]},
+        ]
+    ) == [
+        RowsRange(dataset="ds", config="plain_text", split="train", offset=0, length=100, columns=()),
+        RowsRange(dataset="ds", config="plain_text", split="test", offset=10, length=5, columns=("text",)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "content,expected_error",
+    [
+        (None, InvalidParameterError),
+        ([], InvalidParameterError),
+        ({"dataset": "ds", "config": "plain_text", "split": "train"}, InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train"}] * 21, InvalidParameterError),
+        (["ds"], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text"}], MissingRequiredParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": ""}], MissingRequiredParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "offset": -1}], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "offset": "1"}], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "length": 101}], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "length": True}], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "columns": "text"}], InvalidParameterError),
+        ([{"dataset": "ds", "config": "plain_text", "split": "train", "columns": [""]}], InvalidParameterError),
+    ],
+)
+def test_parse_rows_ranges_error(content: Any, expected_error: Type[Exception]) -> None:
+    with pytest.raises(expected_error):
+        parse_rows_ranges(content)
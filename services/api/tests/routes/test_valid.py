@@ -1,7 +1,9 @@
+import asyncio
 from http import HTTPStatus
 from typing import List
 
 import pytest
+from libcommon.async_mongo import AsyncMongo
 from libcommon.processing_graph import ProcessingGraph, ProcessingGraphSpecification
 from libcommon.simple_cache import _clean_cache_database, upsert_response
 
@@ -16,11 +18,18 @@ step_1 = "step-1"
 step_2 = "step-2"
 
 
+async_mongo = AsyncMongo(max_workers=1)
+
+
 @pytest.fixture(autouse=True)
 def clean_mongo_databases(app_config: AppConfig) -> None:
     _clean_cache_database()
 
 
+def run_get_valid(processing_graph: ProcessingGraph) -> List[str]:
+    return asyncio.run(get_valid(processing_graph=processing_graph, async_mongo=async_mongo))
+
+
 @pytest.mark.parametrize(
     "processing_graph_specification",
     [
@@ -31,7 +40,7 @@ def clean_mongo_databases(app_config: AppConfig) -> None:
 )
 def test_empty(processing_graph_specification: ProcessingGraphSpecification) -> None:
     processing_graph = ProcessingGraph(processing_graph_specification)
-    assert get_valid(processing_graph=processing_graph) == []
+    assert run_get_valid(processing_graph=processing_graph) == []
 
 
 @pytest.mark.parametrize(
@@ -48,7 +57,7 @@ def test_one_dataset(processing_graph_specification: ProcessingGraphSpecificatio
     processing_graph = ProcessingGraph(processing_graph_specification)
     processing_step = processing_graph.get_processing_step(step_1)
     upsert_response(kind=processing_step.cache_kind, dataset=dataset, content={}, http_status=HTTPStatus.OK)
-    assert get_valid(processing_graph=processing_graph) == expected_valid
+    assert run_get_valid(processing_graph=processing_graph) == expected_valid
 
 
 @pytest.mark.parametrize(
@@ -77,7 +86,7 @@ def test_two_datasets(processing_graph_specification: ProcessingGraphSpecificati
         content={},
         http_status=HTTPStatus.OK,
     )
-    assert get_valid(processing_graph=processing_graph) == expected_valid
+    assert run_get_valid(processing_graph=processing_graph) == expected_valid
 
 
 @pytest.mark.parametrize(
@@ -159,7 +168,7 @@ def test_three_steps(processing_graph_specification: ProcessingGraphSpecificatio
         content={},
         http_status=HTTPStatus.OK,
     )
-    assert get_valid(processing_graph=processing_graph) == expected_valid
+    assert run_get_valid(processing_graph=processing_graph) == expected_valid
 
 
 def test_errors() -> None:
@@ -171,4 +180,4 @@ def test_errors() -> None:
     upsert_response(kind=cache_kind, dataset=dataset_a, content={}, http_status=HTTPStatus.OK)
     upsert_response(kind=cache_kind, dataset=dataset_b, content={}, http_status=HTTPStatus.OK)
     upsert_response(kind=cache_kind, dataset=dataset_c, content={}, http_status=HTTPStatus.INTERNAL_SERVER_ERROR)
-    assert get_valid(processing_graph=processing_graph) == [dataset_a, dataset_b]
+    assert run_get_valid(processing_graph=processing_graph) == [dataset_a, dataset_b]
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+from http import HTTPStatus
 from typing import Optional
 
 import pytest
+from libcommon.simple_cache import upsert_response
+from pytest_httpserver import HTTPServer
 from starlette.testclient import TestClient
 
 from api.app import create_app_with_config
@@ -66,6 +69,23 @@ def test_get_endpoint(client: TestClient, first_dataset_endpoint: str) -> None:
     assert response.status_code == 422
 
 
+def test_get_endpoint_not_modified(client: TestClient, httpserver: HTTPServer, hf_auth_path: str) -> None:
+    dataset = "dataset_with_etag"
+    httpserver.expect_request(hf_auth_path % dataset).respond_with_data(status=200)
+    upsert_response(
+        kind="dataset-config-names", dataset=dataset, content={"config_names": []}, http_status=HTTPStatus.OK
+    )
+    response = client.get(f"/config-names?dataset={dataset}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    response = client.get(f"/config-names?dataset={dataset}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    response = client.get(f"/config-names?dataset={dataset}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
 @pytest.mark.parametrize(
     "dataset,config",
     [
@@ -1,9 +1,10 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2022 The HuggingFace Authors.
 
+import asyncio
 import time
 from contextlib import nullcontext as does_not_raise
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, Literal, Mapping, Optional
 
 import jwt
 import pytest
@@ -14,7 +15,12 @@ from starlette.requests import Request
 from werkzeug.wrappers import Request as WerkzeugRequest
 from werkzeug.wrappers import Response as WerkzeugResponse
 
-from api.authentication import auth_check
+from api.authentication import (
+    AuthCheckCache,
+    auth_check,
+    close_session,
+    get_auth_check_cache_key,
+)
 from api.utils import (
     AuthCheckHubRequestError,
     ExternalAuthenticatedError,
@@ -31,18 +37,28 @@ from .test_jwt_token import (
 from .utils import auth_callback
 
 
+def run_auth_check(**kwargs: Any) -> Literal[True]:
+    async def main() -> Literal[True]:
+        try:
+            return await auth_check(**kwargs)
+        finally:
+            await close_session()
+
+    return asyncio.run(main())
+
+
 def test_no_auth_check() -> None:
-    assert auth_check("dataset")
+    assert run_auth_check(dataset="dataset")
 
 
 def test_invalid_auth_check_url() -> None:
     with pytest.raises(ValueError):
-        auth_check("dataset", external_auth_url="https://auth.check/")
+        run_auth_check(dataset="dataset", external_auth_url="https://auth.check/")
 
 
 def test_unreachable_external_auth_check_service() -> None:
     with pytest.raises(AuthCheckHubRequestError):
-        auth_check("dataset", external_auth_url="https://auth.check/%s")
+        run_auth_check(dataset="dataset", external_auth_url="https://auth.check/%s")
 
 
 @pytest.mark.parametrize(
@@ -66,7 +82,7 @@ def test_external_auth_responses_without_request(
     external_auth_url = hf_endpoint + hf_auth_path
     httpserver.expect_request(hf_auth_path % dataset).respond_with_data(status=status_code)
     with expectation:
-        auth_check(dataset, external_auth_url=external_auth_url)
+        run_auth_check(dataset=dataset, external_auth_url=external_auth_url)
 
 
 TIMEOUT_TIME = 0.2
@@ -96,7 +112,7 @@ def test_hf_timeout_seconds(
     external_auth_url = hf_endpoint + hf_auth_path
     httpserver.expect_request(hf_auth_path % dataset).respond_with_handler(func=sleeping)
     with expectation:
-        auth_check(dataset, external_auth_url=external_auth_url, hf_timeout_seconds=hf_timeout_seconds)
+        run_auth_check(dataset=dataset, external_auth_url=external_auth_url, hf_timeout_seconds=hf_timeout_seconds)
 
 
 def create_request(headers: Mapping[str, str]) -> Request:
@@ -133,8 +149,8 @@ def test_valid_responses_with_request(
     external_auth_url = hf_endpoint + hf_auth_path
     httpserver.expect_request(hf_auth_path % dataset).respond_with_handler(auth_callback)
     with expectation:
-        auth_check(
-            dataset,
+        run_auth_check(
+            dataset=dataset,
             external_auth_url=external_auth_url,
             request=create_request(headers=headers),
         )
@@ -168,10 +184,65 @@ def test_bypass_auth_public_key(
     httpserver.expect_request(hf_auth_path % dataset_ok).respond_with_handler(raise_value_error)
     headers = {header: jwt.encode(payload, private_key, algorithm=algorithm_rs256)} if header else {}
     with expectation:
-        auth_check(
+        run_auth_check(
             dataset=dataset_ok,
             external_auth_url=external_auth_url,
             request=create_request(headers=headers),
             hf_jwt_public_key=hf_jwt_public_key,
             hf_jwt_algorithm=algorithm_rs256,
         )
+
+
+def test_auth_check_cache() -> None:
+    auth_check_cache = AuthCheckCache(ttl_seconds=0.2, negative_ttl_seconds=0.1, max_entries=2)
+    key = get_auth_check_cache_key(dataset="dataset", auth_headers={"cookie": "some cookie"})
+    assert "some cookie" not in str(key)
+    assert key != get_auth_check_cache_key(dataset="dataset", auth_headers={})
+    assert auth_check_cache.get(key) is None
+    auth_check_cache.set(key, 200)
+    assert auth_check_cache.get(key) == 200
+    time.sleep(0.2)
+    assert auth_check_cache.get(key) is None
+    auth_check_cache.set(key, 404)
+    assert auth_check_cache.get(key) == 404
+    time.sleep(0.1)
+    assert auth_check_cache.get(key) is None
+    # the unexpected answers are not cached
+    auth_check_cache.set(key, 500)
+    assert auth_check_cache.get(key) is None
+    # the oldest entries are evicted
+    for dataset in ["a", "b", "c"]:
+        auth_check_cache.set(get_auth_check_cache_key(dataset=dataset, auth_headers={}), 200)
+    assert len(auth_check_cache) == 2
+    assert auth_check_cache.get(get_auth_check_cache_key(dataset="a", auth_headers={})) is None
+
+
+@pytest.mark.parametrize(
+    "headers,expectation",
+    [
+        ({"Cookie": "some cookie"}, pytest.raises(ExternalUnauthenticatedError)),
+        ({"Authorization": "Bearer invalid"}, pytest.raises(ExternalAuthenticatedError)),
+        ({}, does_not_raise()),
+    ],
+)
+def test_auth_check_with_cache(
+    httpserver: HTTPServer,
+    hf_endpoint: str,
+    hf_auth_path: str,
+    headers: Mapping[str, str],
+    expectation: Any,
+) -> None:
+    dataset = "dataset"
+    external_auth_url = hf_endpoint + hf_auth_path
+    httpserver.expect_request(hf_auth_path % dataset).respond_with_handler(auth_callback)
+    auth_check_cache = AuthCheckCache(ttl_seconds=60, negative_ttl_seconds=60)
+    for _ in range(2):
+        with expectation:
+            run_auth_check(
+                dataset=dataset,
+                external_auth_url=external_auth_url,
+                request=create_request(headers=headers),
+                auth_check_cache=auth_check_cache,
+            )
+    # the second answer came from the cache
+    assert len(httpserver.log) == 1
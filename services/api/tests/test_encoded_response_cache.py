@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import gzip
+from typing import Any, Dict, Optional
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from api.encoded_response_cache import EncodedResponseCache
+
+
+@pytest.mark.parametrize(
+    "content,accept_encoding,expected_content_encoding",
+    [
+        ({"a": "b" * 1_000}, "gzip, deflate", "gzip"),
+        ({"a": "b" * 1_000}, None, None),
+        ({"a": "b" * 1_000}, "br", None),
+        # too small to be compressed
+        ({"a": "b"}, "gzip", None),
+    ],
+)
+def test_encoded_response_cache_get(
+    content: Dict[str, Any], accept_encoding: Optional[str], expected_content_encoding: Optional[str]
+) -> None:
+    encoded_response_cache = EncodedResponseCache(max_bytes=1_000_000)
+    body, content_encoding = encoded_response_cache.get(key="key", content=content, accept_encoding=accept_encoding)
+    assert content_encoding == expected_content_encoding
+    assert orjson.loads(gzip.decompress(body) if content_encoding == "gzip" else body) == content
+
+
+def test_encoded_response_cache_memoizes() -> None:
+    encoded_response_cache = EncodedResponseCache(max_bytes=1_000_000)
+    content = {"a": "b" * 1_000}
+    with patch("api.encoded_response_cache.orjson_dumps", wraps=orjson.dumps) as dumps:
+        body, _ = encoded_response_cache.get(key="key", content=content, accept_encoding="gzip")
+        assert encoded_response_cache.get(key="key", content=content, accept_encoding="gzip")[0] is body
+        assert encoded_response_cache.get(key="key", content=content)[0] == orjson.dumps(content)
+        assert dumps.call_count == 1
+        # another object (an updated response) is encoded again, even if the key is the same
+        updated_content = {"a": "c" * 1_000}
+        body, _ = encoded_response_cache.get(key="key", content=updated_content, accept_encoding="gzip")
+        assert orjson.loads(gzip.decompress(body)) == updated_content
+        assert dumps.call_count == 2
+
+
+def test_encoded_response_cache_disabled() -> None:
+    encoded_response_cache = EncodedResponseCache(max_bytes=0)
+    content = {"a": "b" * 1_000}
+    body, content_encoding = encoded_response_cache.get(key="key", content=content, accept_encoding="gzip")
+    assert content_encoding == "gzip"
+    assert orjson.loads(gzip.decompress(body)) == content
+    assert len(encoded_response_cache.cache) == 0
@@ -4,11 +4,12 @@
 import datetime
 from contextlib import nullcontext as does_not_raise
 from typing import Any, Dict, Optional
+from unittest.mock import patch
 
 import jwt
 import pytest
 
-from api.jwt_token import is_jwt_valid, parse_jwt_public_key
+from api.jwt_token import VerifiedJwtCache, is_jwt_valid, parse_jwt_public_key
 
 HUB_JWT_KEYS = [{"crv": "Ed25519", "x": "-RBhgyNluwaIL5KFJb6ZOL2H1nmyI8mW4Z2EHGDGCXM", "kty": "OKP"}]
 HUB_JWT_ALGORITHM = "EdDSA"
@@ -123,3 +124,56 @@ algorithm_rs256 = "RS256"
 def test_is_jwt_valid(public_key: Optional[str], payload: Dict[str, str], expected: bool) -> None:
     token = jwt.encode(payload, private_key, algorithm=algorithm_rs256)
     assert is_jwt_valid(dataset=dataset_ok, token=token, public_key=public_key, algorithm=algorithm_rs256) is expected
+
+
+def test_is_jwt_valid_with_cache() -> None:
+    verified_jwt_cache = VerifiedJwtCache(max_entries=2)
+    token = jwt.encode(payload_ok, private_key, algorithm=algorithm_rs256)
+    expired_token = jwt.encode(
+        {"sub": sub_ok, "read": read_ok, "exp": wrong_exp_1}, private_key, algorithm=algorithm_rs256
+    )
+    with patch("api.jwt_token.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(2):
+            assert is_jwt_valid(
+                dataset=dataset_ok,
+                token=token,
+                public_key=public_key,
+                algorithm=algorithm_rs256,
+                verified_jwt_cache=verified_jwt_cache,
+            )
+        # the signature has been verified only once
+        assert decode.call_count == 1
+        # the claims are still checked against the dataset
+        assert not is_jwt_valid(
+            dataset=wrong_dataset,
+            token=token,
+            public_key=public_key,
+            algorithm=algorithm_rs256,
+            verified_jwt_cache=verified_jwt_cache,
+        )
+        # the token is only trusted with the key that verified it
+        assert not is_jwt_valid(
+            dataset=dataset_ok,
+            token=token,
+            public_key=other_public_key,
+            algorithm=algorithm_rs256,
+            verified_jwt_cache=verified_jwt_cache,
+        )
+        assert decode.call_count == 2
+    # the expired tokens are not cached
+    assert is_jwt_valid(
+        dataset=dataset_ok,
+        token=expired_token,
+        public_key=public_key,
+        algorithm=algorithm_rs256,
+        verify_exp=False,
+        verified_jwt_cache=verified_jwt_cache,
+    )
+    assert not is_jwt_valid(
+        dataset=dataset_ok,
+        token=expired_token,
+        public_key=public_key,
+        algorithm=algorithm_rs256,
+        verified_jwt_cache=verified_jwt_cache,
+    )
+    assert len(verified_jwt_cache) == 1
@@ -0,0 +1,39 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+from typing import Tuple
+
+from api.memory_cache import MemoryCache
+
+
+def test_memory_cache() -> None:
+    cache: MemoryCache[str, int] = MemoryCache(max_bytes=10)
+    assert cache.get("a") is None
+    cache.set("a", 1, nbytes=4)
+    cache.set("b", 2, nbytes=4)
+    assert cache.get("a") == 1
+    assert cache.nbytes == 8
+    # "b" is the least recently used entry
+    cache.set("c", 3, nbytes=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.nbytes == 8
+    # replacing an entry updates its size
+    cache.set("c", 4, nbytes=2)
+    assert cache.get("c") == 4
+    assert cache.nbytes == 6
+    # an entry bigger than the budget is not stored
+    cache.set("d", 5, nbytes=11)
+    assert cache.get("d") is None
+    assert cache.nbytes == 6
+
+
+def test_memory_cache_delete() -> None:
+    cache: MemoryCache[Tuple[str, int], int] = MemoryCache(max_bytes=100)
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        cache.set(key, key[1], nbytes=10)
+    cache.delete(lambda key: key[0] == "a")
+    assert len(cache) == 1
+    assert ("b", 1) in cache
+    assert cache.nbytes == 10
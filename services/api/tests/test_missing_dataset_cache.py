@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import time
+
+from api.missing_dataset_cache import MissingDatasetCache
+
+
+def test_missing_dataset_cache() -> None:
+    missing_dataset_cache = MissingDatasetCache(
+        not_found_ttl_seconds=0.1, set_revision_debounce_seconds=10, max_entries=2
+    )
+    assert missing_dataset_cache.get("a") is None
+    missing_dataset_cache.set("a", "not_found")
+    missing_dataset_cache.set("b", "revision_set")
+    assert missing_dataset_cache.get("a") == "not_found"
+    assert missing_dataset_cache.get("b") == "revision_set"
+    # the least recently set entry is evicted
+    missing_dataset_cache.set("c", "not_found")
+    assert len(missing_dataset_cache) == 2
+    assert missing_dataset_cache.get("a") is None
+    # the entries expire
+    time.sleep(0.2)
+    assert missing_dataset_cache.get("c") is None
+    assert missing_dataset_cache.get("b") == "revision_set"
+
+
+def test_missing_dataset_cache_disabled() -> None:
+    missing_dataset_cache = MissingDatasetCache(not_found_ttl_seconds=0, set_revision_debounce_seconds=10)
+    missing_dataset_cache.set("a", "not_found")
+    missing_dataset_cache.set("b", "revision_set")
+    assert missing_dataset_cache.get("a") is None
+    assert missing_dataset_cache.get("b") == "revision_set"
@@ -0,0 +1,29 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.parquet_metadata_cache import read_parquet_metadata
+
+
+def test_read_parquet_metadata(tmp_path: Path) -> None:
+    path = tmp_path / "ds.parquet"
+    pq.write_table(pa.table({"text": [str(i) for i in range(10)]}), path, row_group_size=4)
+
+    parquet_file_metadata = read_parquet_metadata(path)
+    assert parquet_file_metadata.metadata.num_rows == 10
+    assert parquet_file_metadata.row_group_offsets.tolist() == [4, 8, 10]
+    # the second call is served by the cache
+    assert read_parquet_metadata(path) is parquet_file_metadata
+
+    # a rewritten file is parsed again
+    pq.write_table(pa.table({"text": [str(i) for i in range(3)]}), path, row_group_size=4)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    new_parquet_file_metadata = read_parquet_metadata(path)
+    assert new_parquet_file_metadata is not parquet_file_metadata
+    assert new_parquet_file_metadata.row_group_offsets.tolist() == [3]
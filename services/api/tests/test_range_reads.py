@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+from pathlib import Path
+from typing import List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from libcommon.viewer_utils.parquet_metadata import create_row_groups_index
+
+from api.range_reads import (
+    ByteRange,
+    fetch_ranges,
+    get_column_chunk_ranges,
+    get_column_chunk_ranges_from_index,
+    get_column_ids,
+    merge_ranges,
+)
+
+
+@pytest.mark.parametrize(
+    "ranges,expected",
+    [
+        ([], []),
+        ([(0, 10)], [(0, 10)]),
+        ([(20, 30), (0, 10)], [(0, 10), (20, 30)]),
+        ([(0, 10), (5, 15)], [(0, 15)]),
+        ([(0, 10), (12, 20)], [(0, 20)]),
+        ([(0, 10), (12, 200)], [(0, 10), (12, 200)]),
+    ],
+)
+def test_merge_ranges(ranges: List[ByteRange], expected: List[ByteRange]) -> None:
+    assert merge_ranges(ranges, hole_size_limit=5, range_size_limit=100) == expected
+
+
+def test_fetch_ranges(tmp_path: Path) -> None:
+    path = tmp_path / "ds.parquet"
+    pa_table = pa.table({"text": [str(i) for i in range(100)], "label": list(range(100))})
+    pq.write_table(pa_table, path, row_group_size=10)
+    metadata = pq.read_metadata(path)
+    ranges = merge_ranges(get_column_chunk_ranges(metadata=metadata, row_group_ids=[2, 3], columns=["text"]))
+    assert len(ranges) == 1
+
+    with open(path, "rb") as source:
+        [ranges_file] = fetch_ranges([(source, ranges)])
+        # the reads are served from the fetched ranges
+        source.close()
+        assert (
+            pq.ParquetFile(ranges_file, metadata=metadata).read_row_groups([2, 3], columns=["text"]).to_pydict()
+            == pa_table.slice(20, 20).select(["text"]).to_pydict()
+        )
+
+
+def test_get_column_chunk_ranges_from_index(tmp_path: Path) -> None:
+    path = tmp_path / "ds.parquet"
+    pa_table = pa.table(
+        {"text": [str(i) for i in range(100)], "nested": [{"a": i, "b": [i]} for i in range(100)], "label": [0] * 100}
+    )
+    pq.write_table(pa_table, path, row_group_size=10)
+    metadata = pq.read_metadata(path)
+    column_ids = get_column_ids(metadata.schema, ["nested", "label"])
+    assert column_ids == [1, 2, 3]
+    row_groups_index = create_row_groups_index([metadata])
+    assert sorted(get_column_chunk_ranges_from_index(row_groups_index[[2, 5]], column_ids=column_ids)) == sorted(
+        get_column_chunk_ranges(metadata=metadata, row_group_ids=[2, 5], columns=["nested", "label"])
+    )
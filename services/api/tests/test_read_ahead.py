@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api.read_ahead import ReadAhead
+from api.thread_pool import ThreadPoolStage
+
+
+def test_read_ahead_submit() -> None:
+    stage = ThreadPoolStage(name="test", executor=ThreadPoolExecutor(max_workers=1), max_tasks=1)
+    read_ahead = ReadAhead(name="test", max_bytes=100, max_tasks=2, stages=[stage])
+    assert read_ahead.executor is not None
+    release = threading.Event()
+    done = threading.Event()
+
+    def task() -> None:
+        release.wait()
+        done.set()
+
+    assert read_ahead.submit(key="a", func=task, nbytes=60)
+    # a task with the same key is already running
+    assert not read_ahead.submit(key="a", func=task, nbytes=10)
+    # the byte budget would be exceeded
+    assert not read_ahead.submit(key="b", func=task, nbytes=50)
+    assert read_ahead.submit(key="b", func=task, nbytes=40)
+    # all the read-ahead threads are busy
+    assert not read_ahead.submit(key="c", func=task, nbytes=0)
+    release.set()
+    assert done.wait(timeout=5)
+    read_ahead.executor.shutdown(wait=True)
+    # the budget has been released
+    assert read_ahead._nbytes == 0
+    assert not read_ahead._keys
+
+
+def test_read_ahead_under_load() -> None:
+    stage = ThreadPoolStage(name="test", executor=ThreadPoolExecutor(max_workers=1), max_tasks=1)
+    read_ahead = ReadAhead(name="test", max_bytes=100, max_tasks=2, stages=[stage])
+    stage.num_tasks = 1
+    assert stage.is_busy
+    assert not read_ahead.submit(key="a", func=lambda: None, nbytes=0)
+    stage.num_tasks = 0
+    assert read_ahead.submit(key="a", func=lambda: None, nbytes=0)
+
+
+def test_read_ahead_disabled() -> None:
+    read_ahead = ReadAhead(name="test", max_bytes=0, max_tasks=2, stages=[])
+    assert not read_ahead.is_enabled
+    assert read_ahead.executor is None
+    assert not read_ahead.submit(key="a", func=lambda: None, nbytes=0)
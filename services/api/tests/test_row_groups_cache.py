@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import os
+from pathlib import Path
+from typing import Callable, List
+
+import pyarrow as pa
+
+from api.row_groups_cache import RowGroupKey, RowGroupsCache, get_row_group_file_path
+
+
+def get_key(row_group_id: int = 0) -> RowGroupKey:
+    return RowGroupKey(
+        dataset="ds",
+        revision="revision",
+        config="plain_text",
+        split="train",
+        filename="ds-train.parquet",
+        row_group_id=row_group_id,
+        columns=("text",),
+    )
+
+
+def get_reader(pa_table: pa.Table, calls: List[int]) -> Callable[[], pa.Table]:
+    def reader() -> pa.Table:
+        calls.append(1)
+        return pa_table
+
+    return reader
+
+
+def test_row_groups_cache_read(tmp_path: Path) -> None:
+    cache = RowGroupsCache(directory=tmp_path, max_bytes=1_000_000)
+    pa_table = pa.table({"text": ["Hello there", "General Kenobi"]})
+    calls: List[int] = []
+    key = get_key()
+
+    assert cache.get(key) is None
+    assert cache.read(key=key, reader=get_reader(pa_table, calls)) == pa_table
+    assert len(calls) == 1
+    assert get_row_group_file_path(key=key, directory=tmp_path).is_file()
+    # the second read is served by the cache
+    assert cache.read(key=key, reader=get_reader(pa_table, calls)) == pa_table
+    assert len(calls) == 1
+    # another process (another instance) shares the same cache
+    assert RowGroupsCache(directory=tmp_path, max_bytes=1_000_000).get(key) == pa_table
+    # the columns are part of the key
+    assert cache.get(key._replace(columns=("text", "label"))) is None
+    # the revision is part of the key
+    assert cache.get(key._replace(revision="other")) is None
+
+
+def test_row_groups_cache_clean(tmp_path: Path) -> None:
+    pa_table = pa.table({"text": ["Hello there", "General Kenobi"] * 100})
+    cache = RowGroupsCache(directory=tmp_path, max_bytes=1_000_000)
+    for row_group_id in range(3):
+        cache.set(key=get_key(row_group_id), pa_table=pa_table)
+    paths = [get_row_group_file_path(key=get_key(row_group_id), directory=tmp_path) for row_group_id in range(3)]
+    for mtime, path in enumerate(paths):
+        os.utime(path, (mtime, mtime))
+    file_size = paths[0].stat().st_size
+
+    RowGroupsCache(directory=tmp_path, max_bytes=3 * file_size).clean()
+    assert all(path.is_file() for path in paths)
+
+    RowGroupsCache(directory=tmp_path, max_bytes=2 * file_size).clean()
+    # the least recently used file has been removed
+    assert not paths[0].is_file()
+    assert paths[1].is_file()
+    assert paths[2].is_file()
@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+
+import pytest
+
+from api.single_flight import SingleFlight
+
+
+def test_single_flight_do() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight(name="test")
+    calls: List[int] = [0]
+    lock = threading.Lock()
+
+    def func() -> int:
+        with lock:
+            calls[0] += 1
+        time.sleep(0.1)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: single_flight.do("key", func), range(4)))
+    assert results == [42] * 4
+    assert calls[0] == 1
+    assert len(single_flight) == 0
+    # the result is not kept once the call has finished
+    assert single_flight.do("key", func) == 42
+    assert calls[0] == 2
+
+
+def test_single_flight_run() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight(name="test")
+    calls: List[int] = [0]
+
+    async def func() -> int:
+        calls[0] += 1
+        call = calls[0]
+        await asyncio.sleep(0.1)
+        return call
+
+    async def main() -> List[int]:
+        return list(
+            await asyncio.gather(
+                single_flight.run("a", func), single_flight.run("a", func), single_flight.run("b", func)
+            )
+        )
+
+    assert asyncio.run(main()) == [1, 1, 2]
+    assert calls[0] == 2
+    assert len(single_flight) == 0
+
+
+def test_single_flight_run_exception() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight(name="test")
+
+    async def func() -> int:
+        await asyncio.sleep(0.1)
+        raise ValueError("error")
+
+    async def main() -> List[Union[int, BaseException]]:
+        return list(
+            await asyncio.gather(single_flight.run("a", func), single_flight.run("a", func), return_exceptions=True)
+        )
+
+    errors = asyncio.run(main())
+    assert len(errors) == 2
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len(single_flight) == 0
+    with pytest.raises(ValueError):
+        asyncio.run(single_flight.run("a", func))
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+
+from api.thread_pool import ThreadPoolStage
+
+
+def test_thread_pool_stage_max_tasks() -> None:
+    executor = ThreadPoolExecutor(max_workers=8)
+    stage = ThreadPoolStage(name="test", executor=executor, max_tasks=2)
+    lock = threading.Lock()
+    running: List[int] = [0]
+    max_running: List[int] = [0]
+
+    def task() -> str:
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return threading.current_thread().name
+
+    async def main() -> List[str]:
+        return await asyncio.gather(*[stage.run(task) for _ in range(6)])
+
+    thread_names = asyncio.run(main())
+    assert max_running[0] == 2
+    # the tasks have not been run in the thread of the event loop
+    assert threading.current_thread().name not in thread_names
+    executor.shutdown()
+
+
+def test_thread_pool_stage_exception() -> None:
+    executor = ThreadPoolExecutor(max_workers=1)
+    stage = ThreadPoolStage(name="test", executor=executor, max_tasks=1)
+
+    def task() -> None:
+        raise ValueError("error")
+
+    with pytest.raises(ValueError):
+        asyncio.run(stage.run(task))
+    # the slot has been released
+    assert asyncio.run(stage.run(lambda: 1)) == 1
+    executor.shutdown()
+
+
+def test_thread_pool_stage_invalid_max_tasks() -> None:
+    with pytest.raises(ValueError):
+        ThreadPoolStage(name="test", executor=ThreadPoolExecutor(max_workers=1), max_tasks=0)
+
+
+def test_thread_pool_stage_is_busy() -> None:
+    executor = ThreadPoolExecutor(max_workers=2)
+    stage = ThreadPoolStage(name="test", executor=executor, max_tasks=1)
+    event = threading.Event()
+    busy: List[bool] = []
+
+    async def main() -> None:
+        task = asyncio.ensure_future(stage.run(event.wait))
+        await asyncio.sleep(0.05)
+        busy.append(stage.is_busy)
+        event.set()
+        await task
+
+    assert not stage.is_busy
+    asyncio.run(main())
+    assert busy == [True]
+    assert not stage.is_busy
+    executor.shutdown()
@@ -0,0 +1,40 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2023 The HuggingFace Authors.
+
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+from api.utils import get_encoded_etag, get_etag, is_etag_matching
+
+UPDATED_AT = datetime(2023, 1, 1)
+ETAG = get_etag(kind="kind", dataset_git_revision="revision", updated_at=UPDATED_AT, job_runner_version=1)
+
+
+def test_get_etag() -> None:
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert ETAG == get_etag(kind="kind", dataset_git_revision="revision", updated_at=UPDATED_AT, job_runner_version=1)
+    assert ETAG != get_etag(
+        kind="kind", dataset_git_revision="revision", updated_at=datetime(2023, 1, 2), job_runner_version=1
+    )
+    assert ETAG != get_etag(kind="kind", dataset_git_revision="revision", updated_at=UPDATED_AT, job_runner_version=2)
+    assert get_encoded_etag(etag=ETAG) == ETAG
+    assert get_encoded_etag(etag=ETAG, content_encoding="gzip") == f'{ETAG[:-1]}-gzip"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match,expected",
+    [
+        (None, False),
+        ("*", True),
+        (ETAG, True),
+        (f"W/{ETAG}", True),
+        (get_encoded_etag(etag=ETAG, content_encoding="gzip"), True),
+        (f'"other", {ETAG}', True),
+        ('"other"', False),
+        (ETAG[1:-1], False),
+    ],
+)
+def test_is_etag_matching(if_none_match: Optional[str], expected: bool) -> None:
+    assert is_etag_matching(if_none_match=if_none_match, etag=ETAG) is expected
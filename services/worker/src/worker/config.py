@@ -14,19 +14,27 @@ from libcommon.config import (
     ProcessingGraphConfig,
     QueueConfig,
 )
+from libcommon.utils import SchedulingPolicy
 
 WORKER_CONTENT_MAX_BYTES = 10_000_000
 WORKER_ENDPOINT = "/config-names"
 WORKER_HEARTBEAT_INTERVAL_SECONDS = 60
 WORKER_KILL_LONG_JOB_INTERVAL_SECONDS = 60
 WORKER_KILL_ZOMBIES_INTERVAL_SECONDS = 10 * 60
+WORKER_LOOP_NUM_THREADS = 1
 WORKER_MAX_DISK_USAGE_PCT = 90
 WORKER_MAX_JOB_DURATION_SECONDS = 20 * 60
 WORKER_MAX_LOAD_PCT = 70
 WORKER_MAX_MEMORY_PCT = 80
+WORKER_MAX_WAIT_SECONDS_FOR_NEW_JOBS = 60
 WORKER_MAX_MISSING_HEARTBEATS = 5
+WORKER_NUM_LIGHT_THREADS = 0
+WORKER_NUM_PROCESSES = 1
+WORKER_RECONCILE_STARTED_JOBS_COUNTS_INTERVAL_SECONDS = 10 * 60
+WORKER_SCHEDULING_POLICY = SchedulingPolicy.FIFO
 WORKER_SLEEP_SECONDS = 15
 WORKER_STATE_FILE_PATH = None
+WORKER_WAIT_FOR_NEW_JOBS = True
 
 
 def get_empty_str_list() -> List[str]:
@@ -41,14 +49,22 @@ class WorkerConfig:
     job_types_only: list[str] = field(default_factory=get_empty_str_list)
     kill_long_job_interval_seconds: int = WORKER_KILL_LONG_JOB_INTERVAL_SECONDS
     kill_zombies_interval_seconds: int = WORKER_KILL_ZOMBIES_INTERVAL_SECONDS
+    light_job_types: list[str] = field(default_factory=get_empty_str_list)
+    loop_num_threads: int = WORKER_LOOP_NUM_THREADS
     max_disk_usage_pct: int = WORKER_MAX_DISK_USAGE_PCT
     max_job_duration_seconds: int = WORKER_MAX_JOB_DURATION_SECONDS
     max_load_pct: int = WORKER_MAX_LOAD_PCT
     max_memory_pct: int = WORKER_MAX_MEMORY_PCT
     max_missing_heartbeats: int = WORKER_MAX_MISSING_HEARTBEATS
+    max_wait_seconds_for_new_jobs: int = WORKER_MAX_WAIT_SECONDS_FOR_NEW_JOBS
+    num_light_threads: int = WORKER_NUM_LIGHT_THREADS
+    num_processes: int = WORKER_NUM_PROCESSES
+    reconcile_started_jobs_counts_interval_seconds: int = WORKER_RECONCILE_STARTED_JOBS_COUNTS_INTERVAL_SECONDS
+    scheduling_policy: SchedulingPolicy = WORKER_SCHEDULING_POLICY
     sleep_seconds: int = WORKER_SLEEP_SECONDS
     state_file_path: Optional[str] = WORKER_STATE_FILE_PATH
     storage_paths: List[str] = field(default_factory=get_empty_str_list)
+    wait_for_new_jobs: bool = WORKER_WAIT_FOR_NEW_JOBS
 
     @classmethod
     def from_env(cls) -> "WorkerConfig":
@@ -67,6 +83,10 @@ class WorkerConfig:
                 kill_zombies_interval_seconds=env.int(
                     name="KILL_ZOMBIES_INTERVAL_SECONDS", default=WORKER_KILL_ZOMBIES_INTERVAL_SECONDS
                 ),
+                light_job_types=env.list(name="LIGHT_JOB_TYPES", default=get_empty_str_list()),
+                loop_num_threads=env.int(
+                    name="LOOP_NUM_THREADS", default=WORKER_LOOP_NUM_THREADS
+                ),  # this environment variable is not expected to be set explicitly, it's set by the worker executor
                 max_disk_usage_pct=env.int(name="MAX_DISK_USAGE_PCT", default=WORKER_MAX_DISK_USAGE_PCT),
                 max_job_duration_seconds=env.int(
                     name="MAX_JOB_DURATION_SECONDS", default=WORKER_MAX_JOB_DURATION_SECONDS
@@ -74,11 +94,24 @@ class WorkerConfig:
                 max_load_pct=env.int(name="MAX_LOAD_PCT", default=WORKER_MAX_LOAD_PCT),
                 max_memory_pct=env.int(name="MAX_MEMORY_PCT", default=WORKER_MAX_MEMORY_PCT),
                 max_missing_heartbeats=env.int(name="MAX_MISSING_HEARTBEATS", default=WORKER_MAX_MISSING_HEARTBEATS),
+                max_wait_seconds_for_new_jobs=env.int(
+                    name="MAX_WAIT_SECONDS_FOR_NEW_JOBS", default=WORKER_MAX_WAIT_SECONDS_FOR_NEW_JOBS
+                ),
+                num_light_threads=env.int(name="NUM_LIGHT_THREADS", default=WORKER_NUM_LIGHT_THREADS),
+                num_processes=env.int(name="NUM_PROCESSES", default=WORKER_NUM_PROCESSES),
+                reconcile_started_jobs_counts_interval_seconds=env.int(
+                    name="RECONCILE_STARTED_JOBS_COUNTS_INTERVAL_SECONDS",
+                    default=WORKER_RECONCILE_STARTED_JOBS_COUNTS_INTERVAL_SECONDS,
+                ),
+                scheduling_policy=SchedulingPolicy(
+                    env.str(name="SCHEDULING_POLICY", default=WORKER_SCHEDULING_POLICY.value)
+                ),
                 sleep_seconds=env.int(name="SLEEP_SECONDS", default=WORKER_SLEEP_SECONDS),
                 state_file_path=env.str(
                     name="STATE_FILE_PATH", default=WORKER_STATE_FILE_PATH
                 ),  # this environment variable is not expected to be set explicitly, it's set by the worker executor
                 storage_paths=env.list(name="STORAGE_PATHS", default=get_empty_str_list()),
+                wait_for_new_jobs=env.bool(name="WAIT_FOR_NEW_JOBS", default=WORKER_WAIT_FOR_NEW_JOBS),
             )
 
 
@@ -4,6 +4,7 @@ import asyncio
 import logging
 import os
 import sys
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Callable, Optional
 
@@ -11,14 +12,14 @@ import orjson
 from filelock import FileLock
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.queue import Queue
-from libcommon.utils import get_datetime
+from libcommon.utils import JobInfo, get_datetime
 from mirakuru import OutputExecutor
 
 from worker import start_worker_loop
 from worker.config import AppConfig
 from worker.job_manager import JobManager
 from worker.job_runner_factory import JobRunnerFactory
-from worker.loop import WorkerState
+from worker.loop import WorkerState, get_thread_state_file_path
 
 START_WORKER_LOOP_PATH = start_worker_loop.__file__
 
@@ -39,30 +40,128 @@ class BadWorkerState(RuntimeError):
     pass
 
 
+@dataclass(frozen=True)
+class WorkerLoopSpec:
+    """
+    A worker loop subprocess started by the executor.
+
+    Args:
+        state_file_path (`str`): The path of the state file of the process. It is printed by the process once
+          started.
+        num_threads (`int`, *optional*, defaults to 1): The number of threads of the process, i.e. the number of jobs
+          it can run concurrently. Each thread has its own state file.
+        envvars (`dict[str, str]`, *optional*): The environment variables that override the configuration of the
+          process.
+    """
+
+    state_file_path: str
+    num_threads: int = 1
+    envvars: dict[str, str] = field(default_factory=dict)
+
+    def get_slot_state_file_paths(self) -> list[str]:
+        return [
+            get_thread_state_file_path(self.state_file_path, thread_index) for thread_index in range(self.num_threads)
+        ]
+
+
 class WorkerExecutor:
+    """
+    Start and watch the worker loop subprocesses.
+
+    Every worker loop process provides one or more job slots:
+
+    - `num_processes` processes run the heavy jobs, one at a time each.
+    - if `num_light_threads` is positive, one more process runs the `light_job_types` jobs (e.g. the aggregation steps,
+      that mostly wait on the database) in as many threads. The heavy processes do not run these jobs.
+
+    The executor sends the heartbeats of the running jobs of all the slots, and kills the processes that run a job for
+    too long: the other jobs of the process are set as crashed, and the process is started again.
+    """
+
     def __init__(self, app_config: AppConfig, job_runner_factory: JobRunnerFactory, state_file_path: str) -> None:
         self.app_config = app_config
         self.job_runner_factory = job_runner_factory
         self.state_file_path = state_file_path
         self.processing_graph = ProcessingGraph(self.app_config.processing_graph.specification)
+        self.worker_loop_specs = self.get_worker_loop_specs()
 
         max_missing_heartbeats = self.app_config.worker.max_missing_heartbeats
         heartbeat_interval_seconds = self.app_config.worker.heartbeat_interval_seconds
         self.max_seconds_without_heartbeat_for_zombies = heartbeat_interval_seconds * max_missing_heartbeats
 
-    def _create_worker_loop_executor(self) -> OutputExecutor:
-        banner = self.state_file_path
+    def get_worker_loop_specs(self) -> list[WorkerLoopSpec]:
+        worker_config = self.app_config.worker
+        light_job_types = (
+            [
+                job_type
+                for job_type in worker_config.light_job_types
+                if job_type not in worker_config.job_types_blocked
+                and (not worker_config.job_types_only or job_type in worker_config.job_types_only)
+            ]
+            if worker_config.num_light_threads > 0
+            else []
+        )
+        worker_loop_specs = []
+        if not worker_config.job_types_only or any(
+            job_type not in light_job_types for job_type in worker_config.job_types_only
+        ):
+            heavy_envvars = (
+                {"WORKER_JOB_TYPES_BLOCKED": ",".join(worker_config.job_types_blocked + light_job_types)}
+                if light_job_types
+                else {}
+            )
+            for process_index in range(max(worker_config.num_processes, 1)):
+                state_file_path = (
+                    self.state_file_path if process_index == 0 else f"{self.state_file_path}.process-{process_index}"
+                )
+                worker_loop_specs.append(
+                    WorkerLoopSpec(
+                        state_file_path=state_file_path,
+                        envvars={
+                            "WORKER_STATE_FILE_PATH": state_file_path,
+                            "WORKER_LOOP_NUM_THREADS": "1",
+                            **heavy_envvars,
+                        },
+                    )
+                )
+        if light_job_types:
+            state_file_path = f"{self.state_file_path}.light"
+            worker_loop_specs.append(
+                WorkerLoopSpec(
+                    state_file_path=state_file_path,
+                    num_threads=worker_config.num_light_threads,
+                    envvars={
+                        "WORKER_STATE_FILE_PATH": state_file_path,
+                        "WORKER_LOOP_NUM_THREADS": str(worker_config.num_light_threads),
+                        "WORKER_JOB_TYPES_ONLY": ",".join(light_job_types),
+                    },
+                )
+            )
+        return worker_loop_specs
+
+    def get_slot_state_file_paths(self) -> list[str]:
+        return [
+            slot_state_file_path
+            for worker_loop_spec in self.worker_loop_specs
+            for slot_state_file_path in worker_loop_spec.get_slot_state_file_paths()
+        ]
+
+    def _create_worker_loop_executor(self, worker_loop_spec: WorkerLoopSpec) -> OutputExecutor:
+        banner = worker_loop_spec.state_file_path
         start_worker_loop_command = [
             sys.executable,
             START_WORKER_LOOP_PATH,
             "--print-worker-state-path",
         ]
-        return OutputExecutor(start_worker_loop_command, banner, timeout=10)
+        return OutputExecutor(start_worker_loop_command, banner, timeout=10, envvars=worker_loop_spec.envvars)
 
     def start(self) -> None:
         exceptions = []
-        worker_loop_executor = self._create_worker_loop_executor()
-        worker_loop_executor.start()  # blocking until the banner is printed
+        worker_loops = []
+        for worker_loop_spec in self.worker_loop_specs:
+            worker_loop_executor = self._create_worker_loop_executor(worker_loop_spec)
+            worker_loop_executor.start()  # blocking until the banner is printed
+            worker_loops.append((worker_loop_spec, worker_loop_executor))
 
         def custom_exception_handler(loop: asyncio.AbstractEventLoop, context: dict[str, Any]) -> None:
             nonlocal exceptions
@@ -81,19 +180,23 @@ class WorkerExecutor:
         loop.create_task(every(self.kill_zombies, seconds=self.app_config.worker.kill_zombies_interval_seconds))
         loop.create_task(
             every(
-                self.kill_long_job,
-                worker_loop_executor=worker_loop_executor,
-                seconds=self.app_config.worker.kill_long_job_interval_seconds,
+                self.reconcile_started_jobs_counts,
+                seconds=self.app_config.worker.reconcile_started_jobs_counts_interval_seconds,
             )
         )
-        loop.run_until_complete(
-            every(self.is_worker_alive, worker_loop_executor=worker_loop_executor, seconds=1, stop_on=False)
+        loop.create_task(
+            every(
+                self.kill_long_jobs,
+                worker_loops=worker_loops,
+                seconds=self.app_config.worker.kill_long_job_interval_seconds,
+            )
         )
+        loop.run_until_complete(every(self.is_worker_alive, worker_loops=worker_loops, seconds=1, stop_on=False))
         if exceptions:
             raise RuntimeError(f"Some async tasks failed: {exceptions}")
 
-    def get_state(self) -> Optional[WorkerState]:
-        worker_state_file_path = self.state_file_path
+    def get_state(self, state_file_path: Optional[str] = None) -> Optional[WorkerState]:
+        worker_state_file_path = self.state_file_path if state_file_path is None else state_file_path
         if not os.path.exists(worker_state_file_path):
             return None
         with FileLock(f"{worker_state_file_path}.lock"):
@@ -107,53 +210,84 @@ class WorkerExecutor:
             except (orjson.JSONDecodeError, KeyError) as err:
                 raise BadWorkerState(f"Failed to read worker state at {worker_state_file_path}") from err
 
+    def delete_state(self, state_file_path: str) -> None:
+        with FileLock(f"{state_file_path}.lock"):
+            if os.path.exists(state_file_path):
+                os.remove(state_file_path)
+
     def heartbeat(self) -> None:
-        worker_state = self.get_state()
-        if worker_state and worker_state["current_job_info"]:
-            Queue().heartbeat(job_id=worker_state["current_job_info"]["job_id"])
+        queue = Queue()
+        for slot_state_file_path in self.get_slot_state_file_paths():
+            worker_state = self.get_state(slot_state_file_path)
+            if worker_state and worker_state["current_job_info"]:
+                queue.heartbeat(job_id=worker_state["current_job_info"]["job_id"])
+
+    def _create_job_manager(self, job_info: JobInfo) -> JobManager:
+        job_runner = self.job_runner_factory.create_job_runner(job_info)
+        return JobManager(
+            job_info=job_info,
+            app_config=self.app_config,
+            job_runner=job_runner,
+            processing_graph=self.processing_graph,
+        )
 
     def kill_zombies(self) -> None:
         queue = Queue()
         zombies = queue.get_zombies(max_seconds_without_heartbeat=self.max_seconds_without_heartbeat_for_zombies)
         message = "Job manager crashed while running this job (missing heartbeats)."
         for zombie in zombies:
-            job_runner = self.job_runner_factory.create_job_runner(zombie)
-            job_manager = JobManager(
-                job_info=zombie,
-                app_config=self.app_config,
-                job_runner=job_runner,
-                processing_graph=self.processing_graph,
-            )
-            job_manager.set_crashed(message=message)
+            self._create_job_manager(zombie).set_crashed(message=message)
             logging.info(f"Killing zombie. Job info = {zombie}")
 
-    def kill_long_job(self, worker_loop_executor: OutputExecutor) -> None:
-        worker_state = self.get_state()
-        if worker_state and worker_state["current_job_info"]:
-            long_job = worker_state["current_job_info"]
-            last_updated = worker_state["last_updated"]
+    def reconcile_started_jobs_counts(self) -> None:
+        num_fixed_counts = Queue().reconcile_started_jobs_counts()
+        if num_fixed_counts:
+            logging.info(f"Fixed {num_fixed_counts} counts of started jobs.")
+
+    def kill_long_jobs(self, worker_loops: list[tuple[WorkerLoopSpec, OutputExecutor]]) -> None:
+        for worker_loop_spec, worker_loop_executor in worker_loops:
+            self.kill_long_job(worker_loop_spec=worker_loop_spec, worker_loop_executor=worker_loop_executor)
+
+    def kill_long_job(self, worker_loop_spec: WorkerLoopSpec, worker_loop_executor: OutputExecutor) -> None:
+        # a thread cannot be killed alone: if a job exceeded the maximum duration, the whole process is stopped and
+        # restarted. Its other running jobs are stopped too, and re-queued as waiting jobs.
+        slot_state_file_paths = worker_loop_spec.get_slot_state_file_paths()
+        running_jobs = []
+        for slot_state_file_path in slot_state_file_paths:
+            worker_state = self.get_state(slot_state_file_path)
+            if worker_state and worker_state["current_job_info"]:
+                running_jobs.append((worker_state["current_job_info"], worker_state["last_updated"]))
+        long_job_ids = set()
+        for job_info, last_updated in running_jobs:
             if last_updated + timedelta(seconds=self.app_config.worker.max_job_duration_seconds) <= get_datetime():
                 _duration_seconds = int((get_datetime() - last_updated).total_seconds())
                 logging.warning(
-                    f"Job {long_job} exceeded maximum duration of"
+                    f"Job {job_info} exceeded maximum duration of"
                     f" {self.app_config.worker.max_job_duration_seconds} seconds ({_duration_seconds} seconds)."
                 )
-                try:
-                    worker_loop_executor.stop()  # raises an error if the worker returned exit code 1
-                finally:
-                    logging.info(f"Killing a long job. Job info = {long_job}")
-                    job_runner = self.job_runner_factory.create_job_runner(long_job)
-                    job_manager = JobManager(
-                        job_info=long_job,
-                        app_config=self.app_config,
-                        job_runner=job_runner,
-                        processing_graph=self.processing_graph,
-                    )
+                long_job_ids.add(job_info["job_id"])
+        if not long_job_ids:
+            return
+        try:
+            worker_loop_executor.stop()  # raises an error if the worker returned exit code 1
+        finally:
+            for job_info, _ in running_jobs:
+                if job_info["job_id"] in long_job_ids:
+                    logging.info(f"Killing a long job. Job info = {job_info}")
                     message = "Job manager was killed while running this job (job exceeded maximum duration)."
-                    job_manager.set_exceeded_maximum_duration(message=message)
+                    self._create_job_manager(job_info).set_exceeded_maximum_duration(message=message)
+                elif Queue().requeue_started_job(job_id=job_info["job_id"]):
+                    # the other jobs of the process have been stopped too, through no fault of their own
+                    logging.info(f"Re-queuing a job of the same worker process as a long job. Job info = {job_info}")
+            for slot_state_file_path in slot_state_file_paths:
+                self.delete_state(slot_state_file_path)
+        logging.info(f"Restarting the worker loop process {worker_loop_spec.state_file_path}.")
+        worker_loop_executor.start()
 
-    def is_worker_alive(self, worker_loop_executor: OutputExecutor) -> bool:
-        if worker_loop_executor.running():
-            return True
-        worker_loop_executor.stop()  # raises an error if the worker returned exit code 1
-        return False
+    def is_worker_alive(self, worker_loops: list[tuple[WorkerLoopSpec, OutputExecutor]]) -> bool:
+        is_alive = True
+        for _, worker_loop_executor in worker_loops:
+            if not worker_loop_executor.running():
+                worker_loop_executor.stop()  # raises an error if the worker returned exit code 1
+                is_alive = False
+        return is_alive
@@ -16,7 +16,10 @@ from libcommon.exceptions import (
 from libcommon.processing_graph import ProcessingStep
 from libcommon.storage import StrPath
 from libcommon.utils import JobInfo
-from libcommon.viewer_utils.parquet_metadata import create_parquet_metadata_file
+from libcommon.viewer_utils.parquet_metadata import (
+    create_parquet_metadata_file,
+    create_row_groups_index_file,
+)
 from pyarrow.parquet import ParquetFile
 from tqdm.contrib.concurrent import thread_map
 
@@ -37,8 +40,16 @@ class ParquetFileMetadataItem(TypedDict):
     parquet_metadata_subpath: str
 
 
+class SplitRowGroupsIndexItem(TypedDict):
+    dataset: str
+    config: str
+    split: str
+    row_groups_index_subpath: str
+
+
 class ConfigParquetMetadataResponse(TypedDict):
     parquet_files_metadata: List[ParquetFileMetadataItem]
+    row_groups_indexes: List[SplitRowGroupsIndexItem]
 
 
 def get_parquet_file(url: str, fs: HTTPFileSystem, hf_token: Optional[str]) -> ParquetFile:
@@ -47,10 +58,18 @@ def get_parquet_file(url: str, fs: HTTPFileSystem, hf_token: Optional[str]) -> P
 
 
 def compute_parquet_metadata_response(
-    dataset: str, config: str, hf_token: Optional[str], parquet_metadata_directory: StrPath
+    dataset: str,
+    config: str,
+    hf_token: Optional[str],
+    parquet_metadata_directory: StrPath,
 ) -> ConfigParquetMetadataResponse:
     """
     Store the config's parquet metadata on the disk and return the list of local metadata files.
+
+    For every split, an index of the row groups (first row, parquet file, byte ranges of the column chunks) is also
+    stored, so that the rows can be located without parsing the parquet metadata. The row groups of the split are
+    indexed in the order of the parquet filenames. The index is skipped if the parquet files of the split don't have
+    the same number of columns.
     Args:
         dataset (`str`):
             A namespace (user or an organization) and a repo name separated
@@ -93,7 +112,11 @@ def compute_parquet_metadata_response(
     desc = f"{dataset}/{config}"
     try:
         parquet_files: List[ParquetFile] = thread_map(
-            partial(get_parquet_file, fs=fs, hf_token=hf_token), source_urls, desc=desc, unit="pq", disable=True
+            partial(get_parquet_file, fs=fs, hf_token=hf_token),
+            source_urls,
+            desc=desc,
+            unit="pq",
+            disable=True,
         )
     except Exception as e:
         raise FileSystemError(f"Could not read the parquet files: {e}") from e
@@ -121,7 +144,41 @@ def compute_parquet_metadata_response(
             )
         )
 
-    return ConfigParquetMetadataResponse(parquet_files_metadata=parquet_files_metadata)
+    row_groups_indexes = []
+    splits = sorted({parquet_file_item["split"] for parquet_file_item in parquet_file_items})
+    for split in splits:
+        split_parquet_files_metadata = [
+            parquet_file.metadata
+            for parquet_file_item, parquet_file in sorted(
+                zip(parquet_file_items, parquet_files),
+                key=lambda item: item[0]["filename"],
+            )
+            if parquet_file_item["split"] == split
+        ]
+        try:
+            row_groups_index_subpath = create_row_groups_index_file(
+                dataset=dataset,
+                config=config,
+                split=split,
+                parquet_files_metadata=split_parquet_files_metadata,
+                parquet_metadata_directory=parquet_metadata_directory,
+            )
+        except ValueError as e:
+            logging.warning(f"Could not create the row groups index of {dataset=} {config=} {split=}: {e}")
+            continue
+        row_groups_indexes.append(
+            SplitRowGroupsIndexItem(
+                dataset=dataset,
+                config=config,
+                split=split,
+                row_groups_index_subpath=row_groups_index_subpath,
+            )
+        )
+
+    return ConfigParquetMetadataResponse(
+        parquet_files_metadata=parquet_files_metadata,
+        row_groups_indexes=row_groups_indexes,
+    )
 
 
 class ConfigParquetMetadataJobRunner(ConfigJobRunner):
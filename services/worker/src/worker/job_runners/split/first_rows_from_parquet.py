@@ -25,7 +25,7 @@ from libcommon.exceptions import (
 from libcommon.processing_graph import ProcessingStep
 from libcommon.storage import StrPath
 from libcommon.utils import JobInfo
-from libcommon.viewer_utils.features import get_cell_value
+from libcommon.viewer_utils.features import transform_rows
 from pyarrow.parquet import ParquetFile
 from tqdm.contrib.concurrent import thread_map
 
@@ -34,8 +34,6 @@ from worker.job_runners.split.split_job_runner import SplitJobRunner
 from worker.utils import (
     CompleteJobResult,
     JobRunnerInfo,
-    Row,
-    RowItem,
     SplitFirstRowsResponse,
     create_truncated_row_items,
     get_json_size,
@@ -44,34 +42,6 @@ from worker.utils import (
 )
 
 
-def transform_rows(
-    dataset: str,
-    config: str,
-    split: str,
-    rows: List[RowItem],
-    features: Features,
-    assets_base_url: str,
-    assets_directory: StrPath,
-) -> List[Row]:
-    return [
-        {
-            featureName: get_cell_value(
-                dataset=dataset,
-                config=config,
-                split=split,
-                row_idx=row_idx,
-                cell=row["row"][featureName] if featureName in row["row"] else None,
-                featureName=featureName,
-                fieldType=fieldType,
-                assets_base_url=assets_base_url,
-                assets_directory=assets_directory,
-            )
-            for (featureName, fieldType) in features.items()
-        }
-        for row_idx, row in enumerate(rows)
-    ]
-
-
 @lru_cache(maxsize=128)
 def get_hf_fs(hf_token: Optional[str]) -> HfFileSystem:
     """Get the Hugging Face filesystem.
@@ -188,24 +158,13 @@ def compute_first_rows_response(
     pa_table = pa.concat_tables([row_group_readers[i]() for i in range(last_row_group_id + 1)])
     result = pa_table.slice(0, num_rows)
 
-    rows = [
-        RowItem(
-            {
-                "row_idx": idx,
-                "row": row,
-                "truncated_cells": [],
-            }
-        )
-        for idx, row in enumerate(result.to_pylist())
-    ]
-
     # transform the rows, if needed (e.g. save the images or audio to the assets, and return their URL)
     try:
         transformed_rows = transform_rows(
             dataset=dataset,
             config=config,
             split=split,
-            rows=rows,
+            pa_table=result,
             features=features,
             assets_base_url=assets_base_url,
             assets_directory=assets_directory,
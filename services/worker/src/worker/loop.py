@@ -3,13 +3,16 @@
 
 import logging
 import random
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime
+from queue import SimpleQueue
 from typing import Optional, TypedDict
 
 import orjson
 from filelock import FileLock
+from libcommon.job_notifications import JobNotificationSubscription, JobNotifier
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.queue import EmptyQueueError, Queue
 from libcommon.utils import JobInfo, get_datetime
@@ -25,6 +28,11 @@ class WorkerState(TypedDict):
     last_updated: datetime
 
 
+def get_thread_state_file_path(state_file_path: str, thread_index: int) -> str:
+    """The path of the state file of a thread of a worker loop process. The first thread uses the process one."""
+    return state_file_path if thread_index == 0 else f"{state_file_path}.thread-{thread_index}"
+
+
 @dataclass
 class Loop:
     """
@@ -43,6 +51,10 @@ class Loop:
             Worker configuration.
         state_file_path (`str`):
             The path of the file where the state of the loop will be saved.
+        job_notifier (`JobNotifier`, *optional*):
+            The channel of the notifications of the creation of jobs. If set, the idle loop blocks until a job it can
+              process is created, and only polls the queue every `max_wait_seconds_for_new_jobs` seconds, in case a
+              notification is lost. If None, the idle loop polls the queue every `sleep_seconds` seconds.
     """
 
     job_runner_factory: BaseJobRunnerFactory
@@ -50,10 +62,12 @@ class Loop:
     app_config: AppConfig
     processing_graph: ProcessingGraph
     state_file_path: str
+    job_notifier: Optional[JobNotifier] = None
     storage_paths: set[str] = field(init=False)
 
     def __post_init__(self) -> None:
-        self.queue = Queue()
+        self.queue = Queue(scheduling_policy=self.app_config.worker.scheduling_policy)
+        self.job_notification_subscription: Optional[JobNotificationSubscription] = None
         self.storage_paths = set(self.app_config.worker.storage_paths).union(self.library_cache_paths)
 
     def has_memory(self) -> bool:
@@ -103,18 +117,40 @@ class Loop:
         logging.debug(f"sleep during {duration:.2f} seconds")
         time.sleep(duration)
 
+    def wait_for_new_jobs(self) -> None:
+        if self.job_notification_subscription is None:
+            self.sleep()
+            return
+        jitter = 0.75 + random.random() / 2  # nosec
+        # ^ between 0.75 and 1.25
+        timeout = self.app_config.worker.max_wait_seconds_for_new_jobs * jitter
+        logging.debug(f"wait for new jobs during at most {timeout:.2f} seconds")
+        if self.job_notification_subscription.wait(timeout=timeout):
+            logging.debug("notified of new jobs")
+
     def run(self) -> None:
         logging.info("Worker loop started")
+        if self.job_notifier is not None:
+            # subscribe before looking for the first job, not to miss the jobs created in between
+            self.job_notification_subscription = self.job_notifier.subscribe(
+                job_types_blocked=self.app_config.worker.job_types_blocked,
+                job_types_only=self.app_config.worker.job_types_only,
+            )
         try:
             while True:
-                if self.has_resources() and self.process_next_job():
-                    # loop immediately to try another job
-                    # see https://github.com/huggingface/datasets-server/issues/265
-                    continue
-                self.sleep()
+                if not self.has_resources():
+                    self.sleep()
+                elif not self.process_next_job():
+                    self.wait_for_new_jobs()
+                # otherwise, loop immediately to try another job
+                # see https://github.com/huggingface/datasets-server/issues/265
         except BaseException:
             logging.exception("quit due to an uncaught error while processing the job")
             raise
+        finally:
+            if self.job_notification_subscription is not None:
+                self.job_notification_subscription.close()
+                self.job_notification_subscription = None
 
     def process_next_job(self) -> bool:
         logging.debug("try to process a job")
@@ -148,3 +184,26 @@ class Loop:
         with FileLock(f"{self.state_file_path}.lock"):
             with open(self.state_file_path, "wb") as worker_state_f:
                 worker_state_f.write(orjson.dumps(worker_state))
+
+
+def run_in_threads(loops: list[Loop]) -> None:
+    """
+    Run the loops concurrently, one per thread, in the current process.
+
+    The loops never return: once one of them raises, the error is raised again in the calling thread, so that the
+    process exits with an error. The other threads are daemon threads, and are interrupted.
+
+    Args:
+        loops (`list[Loop]`): The loops. They must not share a state file.
+    """
+    errors: SimpleQueue[BaseException] = SimpleQueue()
+
+    def run(loop: Loop) -> None:
+        try:
+            loop.run()
+        except BaseException as err:
+            errors.put(err)
+
+    for thread_index, loop in enumerate(loops):
+        threading.Thread(target=run, args=(loop,), name=f"worker-loop-{thread_index}", daemon=True).start()
+    raise errors.get()
@@ -3,6 +3,7 @@
 
 import sys
 
+from libcommon.job_notifications import MongoJobNotifier
 from libcommon.log import init_logging
 from libcommon.processing_graph import ProcessingGraph
 from libcommon.resources import CacheMongoResource, QueueMongoResource
@@ -10,7 +11,7 @@ from libcommon.storage import init_assets_dir, init_parquet_metadata_dir
 
 from worker.config import AppConfig
 from worker.job_runner_factory import JobRunnerFactory
-from worker.loop import Loop
+from worker.loop import Loop, get_thread_state_file_path, run_in_threads
 from worker.resources import LibrariesResource
 
 if __name__ == "__main__":
@@ -54,11 +55,18 @@ if __name__ == "__main__":
             assets_directory=assets_directory,
             parquet_metadata_directory=parquet_metadata_directory,
         )
-        loop = Loop(
-            library_cache_paths=libraries_resource.storage_paths,
-            job_runner_factory=job_runner_factory,
-            state_file_path=state_file_path,
-            app_config=app_config,
-            processing_graph=processing_graph,
-        )
-        loop.run()
+        loops = [
+            Loop(
+                library_cache_paths=libraries_resource.storage_paths,
+                job_runner_factory=job_runner_factory,
+                state_file_path=get_thread_state_file_path(state_file_path, thread_index),
+                app_config=app_config,
+                processing_graph=processing_graph,
+                job_notifier=MongoJobNotifier() if app_config.worker.wait_for_new_jobs else None,
+            )
+            for thread_index in range(max(app_config.worker.loop_num_threads, 1))
+        ]
+        if len(loops) == 1:
+            loops[0].run()
+        else:
+            run_in_threads(loops)
@@ -17,6 +17,7 @@ from libcommon.resources import CacheMongoResource, QueueMongoResource
 from libcommon.simple_cache import CachedArtifactError, upsert_response
 from libcommon.storage import StrPath
 from libcommon.utils import Priority
+from libcommon.viewer_utils.parquet_metadata import load_row_groups_index
 
 from worker.config import AppConfig
 from worker.job_runners.config.parquet import ConfigParquetResponse
@@ -25,6 +26,7 @@ from worker.job_runners.config.parquet_metadata import (
     ConfigParquetMetadataJobRunner,
     ConfigParquetMetadataResponse,
     ParquetFileMetadataItem,
+    SplitRowGroupsIndexItem,
 )
 
 
@@ -92,10 +94,20 @@ def get_job_runner(
             ConfigParquetResponse(
                 parquet_files=[
                     ParquetFileItem(
-                        dataset="ok", config="config_1", split="train", url="url1", filename="filename1", size=0
+                        dataset="ok",
+                        config="config_1",
+                        split="train",
+                        url="url1",
+                        filename="filename1",
+                        size=0,
                     ),
                     ParquetFileItem(
-                        dataset="ok", config="config_1", split="train", url="url2", filename="filename2", size=0
+                        dataset="ok",
+                        config="config_1",
+                        split="train",
+                        url="url2",
+                        filename="filename2",
+                        size=0,
                     ),
                 ],
             ),
@@ -122,7 +134,15 @@ def get_job_runner(
                         num_rows=3,
                         parquet_metadata_subpath="ok/--/config_1/filename2",
                     ),
-                ]
+                ],
+                row_groups_indexes=[
+                    SplitRowGroupsIndexItem(
+                        dataset="ok",
+                        config="config_1",
+                        split="train",
+                        row_groups_index_subpath="ok/--/config_1/train.row_groups_index.npy",
+                    )
+                ],
             ),
             False,
         ),
@@ -176,7 +196,9 @@ def test_compute(
             assert mock_ParquetFile.call_count == len(upstream_content["parquet_files"])
             for parquet_file_item in upstream_content["parquet_files"]:
                 mock_ParquetFile.assert_any_call(
-                    parquet_file_item["url"], fs=HTTPFileSystem(), hf_token=app_config.common.hf_token
+                    parquet_file_item["url"],
+                    fs=HTTPFileSystem(),
+                    hf_token=app_config.common.hf_token,
                 )
         for parquet_file_metadata_item in expected_content["parquet_files_metadata"]:
             assert (
@@ -186,3 +208,10 @@ def test_compute(
                 )
                 == pq.ParquetFile(dummy_parquet_buffer).metadata
             )
+        for row_groups_index_item in expected_content["row_groups_indexes"]:
+            row_groups_index = load_row_groups_index(
+                Path(job_runner.parquet_metadata_directory) / row_groups_index_item["row_groups_index_subpath"]
+            )
+            # one row group of 3 rows per parquet file
+            assert row_groups_index["first_row"].tolist() == [0, 3]
+            assert row_groups_index["file_id"].tolist() == [0, 1]
@@ -1,11 +1,12 @@
 import os
 import sys
 import time
+from dataclasses import replace
 from datetime import timedelta
 from http import HTTPStatus
 from pathlib import Path
 from typing import Callable, Iterator
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import orjson
 import pytest
@@ -21,7 +22,7 @@ from mirakuru import ProcessExitedWithError, TimeoutExpired
 from pytest import fixture
 
 from worker.config import AppConfig
-from worker.executor import WorkerExecutor
+from worker.executor import WorkerExecutor, WorkerLoopSpec
 from worker.job_runner_factory import JobRunnerFactory
 from worker.loop import WorkerState
 from worker.resources import LibrariesResource
@@ -227,6 +228,85 @@ def test_executor_get_empty_state(
     assert executor.get_state() is None
 
 
+@pytest.mark.parametrize(
+    "job_types_only,num_processes,num_light_threads,expected_worker_loop_specs",
+    [
+        ([], 1, 0, [WorkerLoopSpec(state_file_path="state", envvars={"WORKER_LOOP_NUM_THREADS": "1"})]),
+        (
+            [],
+            2,
+            0,
+            [
+                WorkerLoopSpec(state_file_path="state", envvars={"WORKER_LOOP_NUM_THREADS": "1"}),
+                WorkerLoopSpec(state_file_path="state.process-1", envvars={"WORKER_LOOP_NUM_THREADS": "1"}),
+            ],
+        ),
+        (
+            [],
+            1,
+            4,
+            [
+                WorkerLoopSpec(
+                    state_file_path="state",
+                    envvars={"WORKER_LOOP_NUM_THREADS": "1", "WORKER_JOB_TYPES_BLOCKED": "blocked,light"},
+                ),
+                WorkerLoopSpec(
+                    state_file_path="state.light",
+                    num_threads=4,
+                    envvars={"WORKER_LOOP_NUM_THREADS": "4", "WORKER_JOB_TYPES_ONLY": "light"},
+                ),
+            ],
+        ),
+        (
+            ["light"],
+            1,
+            4,
+            [
+                WorkerLoopSpec(
+                    state_file_path="state.light",
+                    num_threads=4,
+                    envvars={"WORKER_LOOP_NUM_THREADS": "4", "WORKER_JOB_TYPES_ONLY": "light"},
+                ),
+            ],
+        ),
+        (["heavy"], 1, 4, [WorkerLoopSpec(state_file_path="state", envvars={"WORKER_LOOP_NUM_THREADS": "1"})]),
+    ],
+)
+def test_executor_get_worker_loop_specs(
+    app_config: AppConfig,
+    job_runner_factory: JobRunnerFactory,
+    job_types_only: list[str],
+    num_processes: int,
+    num_light_threads: int,
+    expected_worker_loop_specs: list[WorkerLoopSpec],
+) -> None:
+    app_config = replace(
+        app_config,
+        worker=replace(
+            app_config.worker,
+            job_types_blocked=["blocked"],
+            job_types_only=job_types_only,
+            light_job_types=["light", "blocked"],
+            num_processes=num_processes,
+            num_light_threads=num_light_threads,
+        ),
+    )
+    executor = WorkerExecutor(app_config, job_runner_factory, state_file_path="state")
+    expected_worker_loop_specs = [
+        replace(
+            worker_loop_spec,
+            envvars={"WORKER_STATE_FILE_PATH": worker_loop_spec.state_file_path, **worker_loop_spec.envvars},
+        )
+        for worker_loop_spec in expected_worker_loop_specs
+    ]
+    assert executor.worker_loop_specs == expected_worker_loop_specs
+    assert executor.get_slot_state_file_paths() == [
+        slot_state_file_path
+        for worker_loop_spec in expected_worker_loop_specs
+        for slot_state_file_path in worker_loop_spec.get_slot_state_file_paths()
+    ]
+
+
 def test_executor_heartbeat(
     executor: WorkerExecutor,
     set_just_started_job_in_queue: Job,
@@ -366,6 +446,60 @@ def test_executor_stops_on_long_job(
         CachedResponse.objects().delete()
 
 
+def test_executor_kill_long_job_requeues_the_other_jobs_of_the_process(
+    executor: WorkerExecutor,
+    queue_mongo_resource: QueueMongoResource,
+    cache_mongo_resource: CacheMongoResource,
+    tmp_dataset_repo_factory: Callable[[str], str],
+    set_long_running_job_in_queue: Job,
+    set_just_started_job_in_queue: Job,
+    tmp_path: Path,
+) -> None:
+    if not queue_mongo_resource.is_available():
+        raise RuntimeError("Mongo resource is not available")
+    long_job = set_long_running_job_in_queue
+    sibling_job = set_just_started_job_in_queue
+    tmp_dataset_repo_factory(long_job.dataset)
+    tmp_dataset_repo_factory(sibling_job.dataset)
+    # the two jobs run in the threads of the same worker loop process
+    worker_loop_spec = WorkerLoopSpec(state_file_path=str(tmp_path / "worker_state.json"), num_threads=2)
+    long_job_state_file_path, sibling_job_state_file_path = worker_loop_spec.get_slot_state_file_paths()
+    write_worker_state(
+        WorkerState(current_job_info=get_job_info("long"), last_updated=pytz.UTC.localize(long_job.started_at)),
+        long_job_state_file_path,
+    )
+    write_worker_state(
+        WorkerState(current_job_info=get_job_info(), last_updated=get_datetime()), sibling_job_state_file_path
+    )
+    worker_loop_executor = MagicMock()
+    try:
+        executor.kill_long_job(worker_loop_spec=worker_loop_spec, worker_loop_executor=worker_loop_executor)
+
+        # the whole process is killed and restarted
+        worker_loop_executor.stop.assert_called_once()
+        worker_loop_executor.start.assert_called_once()
+        assert not os.path.exists(long_job_state_file_path)
+        assert not os.path.exists(sibling_job_state_file_path)
+
+        long_job.reload()
+        assert long_job.status in [Status.ERROR, Status.CANCELLED, Status.SUCCESS], "must be finished because too long"
+        # the sibling job has been stopped through no fault of its own: it's put back in the queue, without error
+        sibling_job.reload()
+        assert sibling_job.status == Status.CANCELLED
+        requeued_job = Job.objects(dataset=sibling_job.dataset, status=Status.WAITING).get()
+        assert requeued_job.type == sibling_job.type
+        assert requeued_job.revision == sibling_job.revision
+        assert requeued_job.config == sibling_job.config
+        assert requeued_job.split == sibling_job.split
+        assert requeued_job.priority == sibling_job.priority
+
+        error_codes = {response.dataset: response.error_code for response in CachedResponse.objects()}
+        assert error_codes == {long_job.dataset: "JobManagerExceededMaximumDurationError"}
+    finally:
+        CachedResponse.objects().delete()
+        Job.objects(dataset=sibling_job.dataset, status=Status.WAITING).delete()
+
+
 if __name__ == "__main__":
     worker_loop_type = os.environ.get("WORKER_LOOP_TYPE", "start_worker_loop")
     if worker_loop_type == "start_worker_loop_that_crashes":
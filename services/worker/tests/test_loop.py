@@ -1,5 +1,10 @@
+import threading
+import time
 from dataclasses import replace
+from unittest.mock import patch
 
+import pytest
+from libcommon.job_notifications import LocalJobNotifier
 from libcommon.processing_graph import ProcessingGraph, ProcessingStep
 from libcommon.resources import CacheMongoResource, QueueMongoResource
 from libcommon.utils import JobInfo
@@ -7,7 +12,7 @@ from libcommon.utils import JobInfo
 from worker.config import AppConfig
 from worker.job_runner import JobRunner
 from worker.job_runner_factory import BaseJobRunnerFactory
-from worker.loop import Loop
+from worker.loop import Loop, get_thread_state_file_path, run_in_threads
 from worker.resources import LibrariesResource
 from worker.utils import CompleteJobResult
 
@@ -77,3 +82,71 @@ def test_process_next_job(
     assert not loop.queue.is_job_in_process(
         job_type=job_type, dataset=dataset, revision=revision, config=config, split=split
     )
+
+
+def test_run_in_threads(
+    test_processing_graph: ProcessingGraph,
+    test_processing_step: ProcessingStep,
+    app_config: AppConfig,
+    libraries_resource: LibrariesResource,
+    worker_state_file_path: str,
+) -> None:
+    factory = DummyJobRunnerFactory(
+        processing_step=test_processing_step, processing_graph=test_processing_graph, app_config=app_config
+    )
+    loops = [
+        Loop(
+            job_runner_factory=factory,
+            library_cache_paths=libraries_resource.storage_paths,
+            app_config=app_config,
+            state_file_path=get_thread_state_file_path(worker_state_file_path, thread_index),
+            processing_graph=test_processing_graph,
+        )
+        for thread_index in range(3)
+    ]
+    assert len({loop.state_file_path for loop in loops}) == 3
+    assert loops[0].state_file_path == worker_state_file_path
+
+    def run(loop: Loop) -> None:
+        if loop is loops[-1]:
+            raise RuntimeError("bad loop")
+        time.sleep(10)
+
+    # the error of any thread is raised, without waiting for the other threads
+    with patch.object(Loop, "run", autospec=True, side_effect=run):
+        with pytest.raises(RuntimeError, match="bad loop"):
+            run_in_threads(loops)
+
+
+def test_wait_for_new_jobs(
+    test_processing_graph: ProcessingGraph,
+    test_processing_step: ProcessingStep,
+    app_config: AppConfig,
+    libraries_resource: LibrariesResource,
+    worker_state_file_path: str,
+) -> None:
+    job_type = test_processing_step.job_type
+    app_config = replace(
+        app_config,
+        worker=replace(app_config.worker, job_types_only=[job_type], max_wait_seconds_for_new_jobs=20),
+    )
+    factory = DummyJobRunnerFactory(
+        processing_step=test_processing_step, processing_graph=test_processing_graph, app_config=app_config
+    )
+    job_notifier = LocalJobNotifier()
+    loop = Loop(
+        job_runner_factory=factory,
+        library_cache_paths=libraries_resource.storage_paths,
+        app_config=app_config,
+        state_file_path=worker_state_file_path,
+        processing_graph=test_processing_graph,
+        job_notifier=job_notifier,
+    )
+    loop.job_notification_subscription = job_notifier.subscribe(job_types_only=[job_type])
+    # the loop is woken up as soon as a job is created, instead of waiting for the next poll
+    timer = threading.Timer(0.1, job_notifier.publish, args=([job_type],))
+    timer.start()
+    started_at = time.monotonic()
+    loop.wait_for_new_jobs()
+    assert time.monotonic() - started_at < 10
+    timer.join()